@@ -0,0 +1 @@
+"""Benchmarks of the CVEjob pipeline, with offline fixtures."""
@@ -0,0 +1,54 @@
+"""This script compares two benchmark results.
+
+Usage: python -m benchmarks.compare <baseline.json> <results.json>
+
+Prints throughput and peak memory of every stage in both results, and their ratio.
+"""
+
+import json
+import sys
+
+
+def compare(baseline, results):
+    """Compare stages of two benchmark results.
+
+    :return: list, (stage, metric, baseline value, new value, ratio) tuples
+    """
+    old_stages = {x['stage']: x for x in baseline['stages']}
+
+    rows = []
+    for stage in results['stages']:
+        old = old_stages.get(stage['stage'])
+        if old is None:
+            continue
+        for metric in ('throughput', 'peak_memory_bytes'):
+            old_value, new_value = old.get(metric), stage.get(metric)
+            ratio = new_value / old_value if old_value and new_value is not None else None
+            rows.append((stage['stage'], metric, old_value, new_value, ratio))
+    return rows
+
+
+def main(argv):
+    """Print comparison of two benchmark results."""
+    if len(argv) != 3:
+        print(__doc__)
+        return 1
+
+    with open(argv[1]) as f:
+        baseline = json.load(f)
+    with open(argv[2]) as f:
+        results = json.load(f)
+
+    print('{b} -> {r}'.format(b=baseline.get('commit'), r=results.get('commit')))
+    for stage, metric, old, new, ratio in compare(baseline, results):
+        print('{s:<14} {m:<18} {o:>14} {n:>14} {r:>8}'.format(
+            s=stage, m=metric,
+            o='-' if old is None else '{x:.1f}'.format(x=old),
+            n='-' if new is None else '{x:.1f}'.format(x=new),
+            r='-' if ratio is None else '{x:.2f}x'.format(x=ratio)
+        ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
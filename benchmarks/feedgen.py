@@ -0,0 +1,272 @@
+"""This module generates synthetic, but realistic, NVD feeds and matching package universes.
+
+Usage: PYTHONPATH=. python -m benchmarks.feedgen [--count N] [--ecosystem E] [--seed S] <outdir>
+
+Writes `nvdcve.json` (gzipped if --gzip), `<ecosystem>-packages` and `universe.json`
+(package versions and GitHub repository languages, as served by the stub servers).
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+
+from cvejob.outputs.sink import atomic_write
+
+
+_WORDS = (
+    'auth', 'cache', 'crypto', 'json', 'yaml', 'http', 'rest', 'mail', 'image', 'pdf',
+    'admin', 'upload', 'session', 'token', 'query', 'template', 'markdown', 'socket',
+    'proxy', 'router', 'form', 'storage', 'queue', 'search', 'logger', 'config', 'parser',
+    'archive', 'graph', 'media', 'shell', 'sandbox', 'serializer', 'validator', 'wiki'
+)
+
+_PREFIXES = ('', 'py', 'node-', 'easy', 'simple', 'fast', 'open', 'micro', 'super')
+
+_IMPACTS = (
+    'execute arbitrary code', 'cause a denial of service (memory consumption)',
+    'read arbitrary files', 'inject arbitrary web script or HTML',
+    'bypass authentication', 'obtain sensitive information', 'conduct SSRF attacks'
+)
+
+_VECTORS = (
+    'a crafted request', 'a malicious archive', 'a long header value', 'crafted YAML input',
+    'a specially crafted URL', 'the name parameter', 'deeply nested JSON objects'
+)
+
+_LANGUAGES = {
+    'python': 'Python',
+    'javascript': 'JavaScript',
+    'java': 'Java'
+}
+
+_QUALIFIER_RE = re.compile(r'[.-](Final|RELEASE|GA)$')
+
+# shares of synthetic CVEs that end in each verdict, roughly
+_KINDS = (
+    ('match', 60),
+    ('unknown-version', 10),
+    ('php', 10),
+    ('under-analysis', 5),
+    ('os', 5),
+    ('foreign-repo', 10)
+)
+
+
+def _make_versions(rng, ecosystem):
+    versions = set()
+    for major in range(rng.randint(1, 4)):
+        for minor in range(rng.randint(1, 8)):
+            for patch in range(rng.randint(0, 5)):
+                version = '{a}.{b}.{c}'.format(a=major, b=minor, c=patch)
+                if ecosystem == 'java' and rng.random() < 0.5:
+                    version += rng.choice(('.Final', '.RELEASE', '-GA'))
+                versions.add(version)
+    return sorted(versions) or ['1.0.0']
+
+
+def _make_name(rng, ecosystem, taken):
+    while True:
+        name = '{p}{a}'.format(p=rng.choice(_PREFIXES), a=rng.choice(_WORDS))
+        if rng.random() < 0.6:
+            name += '-' + rng.choice(_WORDS)
+        if ecosystem == 'java':
+            name = 'org.{v}.{g}:{n}'.format(v=rng.choice(_WORDS), g=rng.choice(_WORDS), n=name)
+        if name not in taken:
+            taken.add(name)
+            return name
+
+
+def generate_universe(packages=2000, ecosystem='python', seed=0):
+    """Generate package universe: names, versions and GitHub repositories.
+
+    :return: dict, with 'ecosystem', 'packages' (name -> versions), 'repos'
+        ('owner/repo' -> languages) and 'package_repos' (name -> 'owner/repo')
+    """
+    rng = random.Random(seed)
+    taken = set()
+
+    universe = {'ecosystem': ecosystem, 'packages': {}, 'repos': {}, 'package_repos': {}}
+    for i in range(packages):
+        name = _make_name(rng, ecosystem, taken)
+        universe['packages'][name] = _make_versions(rng, ecosystem)
+
+        repo = '{o}{i}/{r}'.format(o=rng.choice(_WORDS), i=i, r=name.split(':')[-1])
+        universe['package_repos'][name] = repo
+        universe['repos'][repo] = {
+            _LANGUAGES[ecosystem]: rng.randint(10000, 900000),
+            'Shell': rng.randint(0, 5000)
+        }
+
+    for i in range(max(packages // 10, 1)):
+        universe['repos']['native/lib{i}'.format(i=i)] = {'C': 500000, 'PHP': 1000}
+
+    return universe
+
+
+def _cpe(part, vendor, product, version):
+    return {
+        'vulnerable': True,
+        'cpe22Uri': 'cpe:/{p}:{v}:{r}:{n}'.format(p=part, v=vendor, r=product, n=version),
+        'cpe23Uri': 'cpe:2.3:{p}:{v}:{r}:{n}:*:*:*:*:*:*:*'.format(
+            p=part, v=vendor, r=product, n=version
+        )
+    }
+
+
+def _make_item(rng, number, year, universe, names):
+    kind = rng.choices([k for k, _ in _KINDS], weights=[w for _, w in _KINDS])[0]
+
+    name = rng.choice(names)
+    group_id, _, product = name.rpartition(':')
+    vendor = group_id.split('.')[1] if group_id else rng.choice(_WORDS)
+    versions = universe['packages'][name]
+    # NVD doesn't know about version qualifiers
+    version = _QUALIFIER_RE.sub('', rng.choice(versions))
+    if kind == 'unknown-version':
+        version = '{a}.{b}.{c}'.format(a=rng.randint(50, 99), b=rng.randint(0, 9), c=0)
+
+    title = product[0].upper() + product[1:]
+    description = '{t} before {v} allows remote attackers to {i} via {x}.'.format(
+        t=title, v=version, i=rng.choice(_IMPACTS), x=rng.choice(_VECTORS)
+    )
+    if kind == 'php':
+        description = 'SQL injection vulnerability in admin/{p}.php in {t} allows ' \
+                      'remote attackers to {i} via {x}.'.format(
+                          p=product, t=title, i=rng.choice(_IMPACTS), x=rng.choice(_VECTORS))
+    if rng.random() < 0.3:
+        description += ' NOTE: this vulnerability exists because of an incomplete fix ' \
+                       'for CVE-{y}-{n}.'.format(y=year - 1, n=rng.randint(1000, 20000))
+
+    references = [
+        'https://example.com/advisories/{y}/{n}'.format(y=year, n=number),
+        'http://www.securityfocus.com/bid/{n}'.format(n=rng.randint(100000, 110000))
+    ]
+    if kind == 'foreign-repo':
+        references.append('https://github.com/native/lib{i}/issues/{n}'.format(
+            i=rng.randrange(max(len(names) // 10, 1)), n=rng.randint(1, 500)
+        ))
+    elif rng.random() < 0.4:
+        references.append('https://github.com/{r}/commit/{h:040x}'.format(
+            r=universe['package_repos'][name], h=rng.getrandbits(160)
+        ))
+
+    if kind == 'under-analysis':
+        nodes = []
+    elif kind == 'os':
+        nodes = [{'operator': 'OR', 'cpe': [_cpe('o', 'linux', 'linux_kernel', version)]}]
+    else:
+        cpes = [_cpe('a', vendor, product.replace('-', '_'), version)]
+        if rng.random() < 0.3:
+            cpe = _cpe('a', vendor, product.replace('-', '_'), '-')
+            cpe['versionEndExcluding'] = version
+            cpes.append(cpe)
+        nodes = [{'operator': 'OR', 'cpe': cpes}]
+        if rng.random() < 0.2:
+            # vulnerable only when running on specific platform
+            nodes = [{'operator': 'AND', 'children': nodes + [
+                {'operator': 'OR', 'cpe': [dict(_cpe('o', 'microsoft', 'windows', '-'),
+                                                vulnerable=False)]}
+            ]}]
+
+    date = '{y}-{m:02d}-{d:02d}T{h:02d}:29Z'.format(
+        y=year, m=rng.randint(1, 12), d=rng.randint(1, 28), h=rng.randint(0, 23)
+    )
+
+    return {
+        'cve': {
+            'data_type': 'CVE',
+            'data_format': 'MITRE',
+            'data_version': '4.0',
+            'CVE_data_meta': {'ID': 'CVE-{y}-{n}'.format(y=year, n=number)},
+            'problemtype': {'problemtype_data': [
+                {'description': [{'lang': 'en', 'value': 'CWE-{n}'.format(
+                    n=rng.choice((20, 22, 79, 89, 400, 502, 611))
+                )}]}
+            ]},
+            'references': {'reference_data': [{'url': x} for x in references]},
+            'description': {'description_data': [{'lang': 'en', 'value': description}]}
+        },
+        'configurations': {'CVE_data_version': '4.0', 'nodes': nodes},
+        'impact': {'baseMetricV2': {
+            'cvssV2': {'version': '2.0', 'baseScore': round(rng.uniform(2.0, 10.0), 1)},
+            'severity': 'MEDIUM'
+        }},
+        'publishedDate': date,
+        'lastModifiedDate': date
+    }
+
+
+def generate_items(count, universe, year=2018, seed=0):
+    """Generate synthetic `CVE_Items`, for packages from given universe.
+
+    :return: generator of dicts
+    """
+    rng = random.Random(seed)
+    names = sorted(universe['packages'])
+
+    for i in range(count):
+        yield _make_item(rng, 1000 + i, year, universe, names)
+
+
+def write_feed(path, items):
+    """Write NVD feed with given items; gzipped if the path ends with '.gz'."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt') as f:
+        f.write('{"CVE_data_type": "CVE", "CVE_data_format": "MITRE", '
+                '"CVE_data_version": "4.0", "CVE_Items": [\n')
+        for i, item in enumerate(items):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(item))
+        f.write('\n]}\n')
+
+
+def write_pkgfile(path, universe):
+    """Write package list file for given universe, in the format cpe2pkg expects."""
+    lines = ['{e} {n}\n'.format(e=universe['ecosystem'], n=x) for x in sorted(universe['packages'])]
+    atomic_write(path, ''.join(lines).encode('utf-8'))
+
+
+def generate(outdir, count=5000, packages=2000, ecosystem='python', seed=0, gzipped=False):
+    """Generate all fixtures into given directory.
+
+    :return: dict, paths to 'feed', 'pkgfile' and 'universe' files
+    """
+    os.makedirs(outdir, exist_ok=True)
+    universe = generate_universe(packages=packages, ecosystem=ecosystem, seed=seed)
+
+    paths = {
+        'feed': os.path.join(outdir, 'nvdcve.json' + ('.gz' if gzipped else '')),
+        'pkgfile': os.path.join(outdir, '{e}-packages'.format(e=ecosystem)),
+        'universe': os.path.join(outdir, 'universe.json')
+    }
+
+    write_feed(paths['feed'], generate_items(count, universe, seed=seed))
+    write_pkgfile(paths['pkgfile'], universe)
+    atomic_write(paths['universe'], json.dumps(universe).encode('utf-8'))
+
+    return paths
+
+
+def main():
+    """Generate benchmark fixtures."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('outdir')
+    parser.add_argument('--count', type=int, default=5000, help='number of CVEs')
+    parser.add_argument('--packages', type=int, default=2000, help='number of packages')
+    parser.add_argument('--ecosystem', default='python', choices=sorted(_LANGUAGES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--gzip', action='store_true', help='gzip the feed')
+    args = parser.parse_args()
+
+    paths = generate(args.outdir, count=args.count, packages=args.packages,
+                     ecosystem=args.ecosystem, seed=args.seed, gzipped=args.gzip)
+    print(json.dumps(paths, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""This script benchmarks the CVEjob pipeline on synthetic, fully offline fixtures.
+
+Usage: PYTHONPATH=. python -m benchmarks.run_benchmarks [--count N] [--output results.json]
+
+Stages (validate_cve, identify, pick_winner, VictimsYamlOutput.write) are measured
+in-process, one after another, on the CVEs that made it through the previous stage.
+Whole `run()` is then measured in a fresh process, with cold caches. Registries and
+GitHub are served by stub servers and cpe2pkg is replaced by the native backend.
+Results are printed (or written) as JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import feedgen
+from benchmarks.stubs import StubServer
+from cvejob.config import Config
+
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_commit():
+    """Get commit the benchmarks run on, or None if unknown."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=_REPO_DIR, universal_newlines=True,
+            stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(stage, func, items, trace_memory=True):
+    """Call given function on all items and measure throughput and peak memory.
+
+    :return: tuple, (stage results dict, list of (item, return value) tuples)
+    """
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    results = [(item, func(item)) for item in items]
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'stage': stage,
+        'items': len(results),
+        'seconds': elapsed,
+        'throughput': len(results) / elapsed if elapsed else None,
+        'peak_memory_bytes': peak
+    }, results
+
+
+def get_config(workdir, paths, server, ecosystem):
+    """Get CVEjob configuration for the benchmarks."""
+    config = {
+        'ecosystem': ecosystem,
+        'feed_path': paths['feed'],
+        'pkgfile_dir': os.path.dirname(paths['pkgfile']),
+        'cpe2pkg_backend': 'native',
+        'cache_dir': os.path.join(workdir, 'cache')
+    }
+    config.update(server.get_config())
+    return config
+
+
+def benchmark_stages(config, trace_memory=True):
+    """Benchmark individual stages in this process.
+
+    :return: list, stage results
+    """
+    from cvejob.feed import iter_cves
+    from cvejob.filters.input import validate_cve
+    from cvejob.identifiers import get_identifier
+    from cvejob.outputs.victims import VictimsYamlOutput
+    from cvejob.selectors.basic import VersionExistsSelector
+
+    for name, value in config.items():
+        Config.set(name, value)
+
+    stages = []
+
+    result, loaded = measure('load', lambda x: x, iter_cves(config['feed_path']), trace_memory)
+    stages.append(result)
+    cves = [cve for cve, _ in loaded]
+
+    result, validated = measure('validate_cve', validate_cve, cves, trace_memory)
+    stages.append(result)
+    accepted = [cve for cve, verdict in validated if verdict]
+
+    result, identified = measure(
+        'identify', lambda cve: get_identifier(cve).identify(), accepted, trace_memory
+    )
+    stages.append(result)
+    identified = [(cve, candidates) for cve, candidates in identified if candidates]
+
+    result, selected = measure(
+        'pick_winner', lambda x: VersionExistsSelector(*x).pick_winner(), identified, trace_memory
+    )
+    stages.append(result)
+    selected = [(cve, candidates, winner) for (cve, candidates), winner in selected if winner]
+
+    result, _ = measure(
+        'write', lambda x: VictimsYamlOutput(x[0], x[2], x[1]).write(), selected, trace_memory
+    )
+    stages.append(result)
+
+    return stages
+
+
+def benchmark_run(config, count, workdir, workers=1):
+    """Benchmark whole run in a fresh process, with cold caches.
+
+    :return: dict, stage results
+    """
+    rundir = tempfile.mkdtemp(prefix='run-', dir=workdir)
+    metrics_path = os.path.join(rundir, 'metrics.json')
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = _REPO_DIR
+    for name, value in config.items():
+        env['CVEJOB_' + name.upper()] = str(value)
+    env['CVEJOB_CACHE_DIR'] = os.path.join(rundir, 'cache')
+    env['CVEJOB_METRICS_PATH'] = metrics_path
+
+    start = time.perf_counter()
+    subprocess.check_call(
+        [sys.executable, os.path.join(_REPO_DIR, 'run.py'), '--workers', str(workers)],
+        cwd=rundir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    elapsed = time.perf_counter() - start
+
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+
+    # ru_maxrss is in kilobytes on Linux; it covers the run and its workers
+    peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+    return {
+        'stage': 'run',
+        'items': count,
+        'seconds': elapsed,
+        'throughput': count / elapsed if elapsed else None,
+        'peak_memory_bytes': peak_rss,
+        'workers': workers,
+        'verdicts': {
+            k[len('verdict.'):]: v for k, v in metrics['counters'].items()
+            if k.startswith('verdict.')
+        }
+    }
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=2000, help='number of CVEs')
+    parser.add_argument('--packages', type=int, default=2000, help='number of packages')
+    parser.add_argument('--ecosystem', default='python')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='simulated latency of the stub servers, in seconds')
+    parser.add_argument('--workers', type=int, default=1, help='workers for the whole run')
+    parser.add_argument('--no-tracemalloc', dest='trace_memory', action='store_false',
+                        help='measure stages without tracing memory allocations')
+    parser.add_argument('--skip-run', action='store_true', help="don't benchmark whole run")
+    parser.add_argument('--output', help='write results to this file instead of stdout')
+    parser.add_argument('--workdir', help='keep fixtures and outputs in this directory')
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='cvejob-bench-')
+    try:
+        results = run_benchmarks(args, os.path.abspath(workdir))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir)
+
+    data = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+
+
+def run_benchmarks(args, workdir):
+    """Generate fixtures, start stub servers and run all benchmarks.
+
+    :return: dict, results
+    """
+    paths = feedgen.generate(os.path.join(workdir, 'fixtures'), count=args.count,
+                             packages=args.packages, ecosystem=args.ecosystem, seed=args.seed)
+    with open(paths['universe']) as f:
+        universe = json.load(f)
+
+    with StubServer(universe, latency=args.latency) as server:
+        config = get_config(workdir, paths, server, args.ecosystem)
+
+        # outputs are written relative to the working directory
+        cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp(prefix='stages-', dir=workdir))
+        try:
+            stages = benchmark_stages(config, trace_memory=args.trace_memory)
+        finally:
+            os.chdir(cwd)
+
+        if not args.skip_run:
+            stages.append(benchmark_run(config, args.count, workdir, workers=args.workers))
+
+        requests = server.requests
+
+    return {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'count': args.count,
+            'packages': args.packages,
+            'ecosystem': args.ecosystem,
+            'seed': args.seed,
+            'latency': args.latency
+        },
+        'stub_requests': requests,
+        'stages': stages
+    }
+
+
+if __name__ == '__main__':
+    main()
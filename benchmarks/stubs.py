@@ -0,0 +1,145 @@
+"""This module contains stub PyPI, npm, Maven and GitHub servers, serving a generated universe.
+
+All registries are served by single HTTP server, under different path prefixes:
+`/pypi/<name>/json`, `/npm/<name>`, `/maven2/<group>/<artifact>/maven-metadata.xml`
+and `/github/repos/<owner>/<repo>/languages`.
+"""
+
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import unquote
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubRegistryHandler(BaseHTTPRequestHandler):
+    """Request handler of the stub server."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _route(self, path):
+        universe = self.server.universe
+        parts = [unquote(x) for x in path.strip('/').split('/')]
+
+        if parts[0] == 'pypi' and len(parts) == 3 and parts[2] == 'json':
+            versions = universe['packages'].get(parts[1])
+            if versions is not None:
+                return 'application/json', json.dumps(
+                    {'info': {'name': parts[1]}, 'releases': {v: [] for v in versions}}
+                )
+        elif parts[0] == 'npm' and len(parts) >= 2:
+            versions = universe['packages'].get('/'.join(parts[1:]))
+            if versions is not None:
+                return 'application/json', json.dumps(
+                    {'name': parts[1], 'versions': {v: {} for v in versions}}
+                )
+        elif parts[0] == 'maven2' and len(parts) >= 4 and parts[-1] == 'maven-metadata.xml':
+            name = '{g}:{a}'.format(g='.'.join(parts[1:-2]), a=parts[-2])
+            versions = universe['packages'].get(name)
+            if versions is not None:
+                return 'text/xml', '<metadata><versioning><versions>{v}</versions>' \
+                                   '</versioning></metadata>'.format(
+                                       v=''.join('<version>{x}</version>'.format(x=x)
+                                                 for x in versions))
+        elif parts[0] == 'github' and len(parts) == 5 and parts[-1] == 'languages':
+            languages = universe['repos'].get('{o}/{r}'.format(o=parts[2], r=parts[3]))
+            if languages is not None:
+                return 'application/json', json.dumps(languages)
+
+        return None
+
+    def do_GET(self):
+        """Handle GET request."""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.requests += 1
+
+        routed = self._route(self.path.split('?')[0])
+        if routed is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        content_type, body = routed
+        body = body.encode('utf-8')
+        etag = '"{h:08x}"'.format(h=zlib.crc32(body))
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Be quiet."""
+
+
+class StubServer(object):
+    """Stub registries and GitHub API, running in a background thread."""
+
+    def __init__(self, universe, latency=0.0):
+        """Constructor.
+
+        :param universe: dict, as generated by benchmarks.feedgen.generate_universe()
+        :param latency: float, seconds to wait before answering each request
+        """
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), StubRegistryHandler)
+        self._server.universe = universe
+        self._server.latency = latency
+        self._server.requests = 0
+        self._server.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        """Get base URL of the server."""
+        return 'http://127.0.0.1:{p}'.format(p=self._server.server_address[1])
+
+    @property
+    def requests(self):
+        """Get number of requests served so far."""
+        return self._server.requests
+
+    def get_config(self):
+        """Get CVEjob configuration options which point to this server."""
+        return {
+            'pypi_url': self.url + '/pypi',
+            'npm_url': self.url + '/npm',
+            'maven_url': self.url + '/maven2',
+            'github_api_url': self.url + '/github'
+        }
+
+    def start(self):
+        """Start serving requests."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        """Enter the runtime context."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the server."""
+        self.stop()
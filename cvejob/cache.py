@@ -0,0 +1,122 @@
+"""This module contains in-memory and persistent caches."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+
+CacheEntry = namedtuple('CacheEntry', ['value', 'timestamp', 'meta'])
+
+
+class LruCache(object):
+    """Thread-safe in-memory cache which drops least recently used entries when full."""
+
+    def __init__(self, max_size):
+        """Constructor.
+
+        :param max_size: int, maximum number of entries
+        """
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get value stored under given key and mark it as recently used.
+
+        :return: cached value, or None if there is none
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store given value under given key, dropping least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        """Get number of cached entries."""
+        return len(self._entries)
+
+    def __iter__(self):
+        """Iterate over keys, least recently used first."""
+        with self._lock:
+            return iter(list(self._entries))
+
+
+class DiskCache(object):
+    """Key/value cache stored in SQLite database.
+
+    Values (and optional metadata, like HTTP validators) are stored as JSON.
+    Entries are never expired by the cache itself, callers decide what is fresh enough.
+    """
+
+    def __init__(self, path, table='cache'):
+        """Constructor.
+
+        :param path: str, path to the database file, or None for a throw-away in-memory cache
+        """
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._table = table
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS {t} '
+                '(key TEXT PRIMARY KEY, value TEXT, timestamp REAL, meta TEXT)'.format(t=table)
+            )
+
+    def get(self, key, ttl=None):
+        """Get cached entry for given key.
+
+        :param ttl: int, maximum age of the entry in seconds, or None for no limit
+        :return: CacheEntry, or None if there is no (fresh enough) entry
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, timestamp, meta FROM {t} WHERE key = ?'.format(t=self._table),
+                (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, timestamp, meta = row
+        if ttl is not None and time.time() - timestamp > ttl:
+            return None
+
+        return CacheEntry(json.loads(value), timestamp, json.loads(meta) if meta else None)
+
+    def set(self, key, value, meta=None, timestamp=None):
+        """Store given value under given key."""
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO {t} (key, value, timestamp, meta) '
+                'VALUES (?, ?, ?, ?)'.format(t=self._table),
+                (key, json.dumps(value), timestamp, json.dumps(meta) if meta else None)
+            )
+
+    def delete(self, key):
+        """Remove entry for given key, if any."""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM {t} WHERE key = ?'.format(t=self._table), (key,))
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
@@ -1,6 +1,7 @@
 """Global configuration for the project."""
 
 import os
+from contextlib import contextmanager
 
 
 class Config(object):
@@ -8,14 +9,44 @@ class Config(object):
 
     _config = {
         'ecosystem': os.environ.get('CVEJOB_ECOSYSTEM') or 'python',
+        'ecosystems': os.environ.get('CVEJOB_ECOSYSTEMS') or None,
         'cve_age': int(os.environ.get('CVEJOB_CVE_AGE', 0)),
         'feed_path': os.environ.get('CVEJOB_FEED_PATH') or 'nvdcve.json',
+        'nvd_feed_url': os.environ.get('CVEJOB_NVD_FEED_URL') or
+        'https://static.nvd.nist.gov/feeds/json/cve/1.0/nvdcve-1.0-{feed}.json.gz',
+        'output_dir': os.environ.get('CVEJOB_OUTPUT_DIR') or 'database/',
+        'shard': os.environ.get('CVEJOB_SHARD') or None,
         'cve_id': os.environ.get('CVEJOB_CVE_ID') or None,
         'cpe2pkg_path': os.environ.get('CVEJOB_CPE2PKG_PATH') or 'cpe2pkg.jar',
+        'cpe2pkg_backend': os.environ.get('CVEJOB_CPE2PKG_BACKEND') or 'java',
+        'cpe2pkg_cache_size': int(os.environ.get('CVEJOB_CPE2PKG_CACHE_SIZE', 4096)),
         'pkgfile_dir': os.environ.get('CVEJOB_PKGFILE_DIR') or 'data/',
         'use_nvdtoolkit': os.environ.get(
             'CVEJOB_USE_NVD_TOOLKIT', 'false').lower() in ('true', '1', 'yes'),
-        'nvdtoolkit_export_dir': os.environ.get('CVEJOB_NVD_TOOLKIT_EXPORT_DIR') or 'export/'
+        'identify_batch_size': int(os.environ.get('CVEJOB_IDENTIFY_BATCH_SIZE', 32)),
+        'nvdtoolkit_export_dir': os.environ.get('CVEJOB_NVD_TOOLKIT_EXPORT_DIR') or 'export/',
+        'cache_dir': os.environ.get('CVEJOB_CACHE_DIR', '.cache/'),
+        'github_api_url': os.environ.get('CVEJOB_GITHUB_API_URL') or 'https://api.github.com',
+        'github_cache_ttl': int(os.environ.get('CVEJOB_GITHUB_CACHE_TTL', 7 * 24 * 3600)),
+        'github_concurrency': int(os.environ.get('CVEJOB_GITHUB_CONCURRENCY', 8)),
+        'pypi_url': os.environ.get('CVEJOB_PYPI_URL') or 'https://pypi.python.org/pypi',
+        'npm_url': os.environ.get('CVEJOB_NPM_URL') or 'https://registry.npmjs.org',
+        'maven_url': os.environ.get('CVEJOB_MAVEN_URL') or 'http://repo1.maven.org/maven2',
+        'pypi_simple_url': os.environ.get('CVEJOB_PYPI_SIMPLE_URL') or 'https://pypi.org/simple/',
+        'npm_replicate_url': os.environ.get('CVEJOB_NPM_REPLICATE_URL') or
+        'https://replicate.npmjs.com',
+        'maven_search_url': os.environ.get('CVEJOB_MAVEN_SEARCH_URL') or
+        'https://search.maven.org/solrsearch/select',
+        'version_cache_ttl': int(os.environ.get('CVEJOB_VERSION_CACHE_TTL', 24 * 3600)),
+        'version_cache_negative_ttl': int(
+            os.environ.get('CVEJOB_VERSION_CACHE_NEGATIVE_TTL', 3600)),
+        'version_cache_size': int(os.environ.get('CVEJOB_VERSION_CACHE_SIZE', 1024)),
+        'selector_concurrency': int(os.environ.get('CVEJOB_SELECTOR_CONCURRENCY', 1)),
+        'versions_backend': os.environ.get('CVEJOB_VERSIONS_BACKEND') or 'registry',
+        'mirror_path': os.environ.get('CVEJOB_MIRROR_PATH') or 'data/mirror.sqlite',
+        'state_path': os.environ.get('CVEJOB_STATE_PATH') or None,
+        'metrics_path': os.environ.get('CVEJOB_METRICS_PATH') or None,
+        'metrics_textfile': os.environ.get('CVEJOB_METRICS_TEXTFILE') or None
     }
 
     @staticmethod
@@ -23,6 +54,11 @@ class Config(object):
         """Get config value by name."""
         return Config._config.get(name)
 
+    @staticmethod
+    def get_all():
+        """Get copy of all config values."""
+        return dict(Config._config)
+
     @staticmethod
     def set(name, value):
         """Set config value."""
@@ -30,3 +66,54 @@ class Config(object):
             Config._config[name] = value
         else:
             raise ValueError('Invalid configuration option: {n}'.format(n=name))
+
+    @staticmethod
+    @contextmanager
+    def override(**values):
+        """Temporarily set config values, e.g. ecosystem for single branch of a run."""
+        previous = {name: Config.get(name) for name in values}
+        for name, value in values.items():
+            Config.set(name, value)
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                Config.set(name, value)
+
+
+def get_cherry_picked_ids():
+    """Get IDs of CVEs cherry-picked by user.
+
+    `cve_id` configuration option can hold single CVE ID, or comma-separated list of them.
+
+    :return: list, CVE IDs, or None if no CVEs were cherry-picked
+    """
+    cve_id = Config.get('cve_id')
+    if cve_id is None:
+        return None
+    return [x.strip() for x in cve_id.split(',') if x.strip()]
+
+
+def get_ecosystems():
+    """Get ecosystems to process CVEs for.
+
+    `ecosystems` configuration option can hold comma-separated list of ecosystems,
+    which are then all processed in single pass over the feed.
+
+    :return: list, ecosystems; just the `ecosystem` configuration option by default
+    """
+    ecosystems = Config.get('ecosystems')
+    if not ecosystems:
+        return [Config.get('ecosystem')]
+    return list(dict.fromkeys(x.strip() for x in ecosystems.split(',') if x.strip()))
+
+
+def get_feed_paths():
+    """Get paths to NVD feed files to process.
+
+    `feed_path` configuration option can hold single path, or comma-separated list
+    of them, e.g. one feed per year.
+
+    :return: list, paths
+    """
+    return [x.strip() for x in Config.get('feed_path').split(',') if x.strip()]
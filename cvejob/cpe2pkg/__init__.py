@@ -0,0 +1,71 @@
+"""This package contains cpe2pkg backends.
+
+Backends are responsible for turning vendor/product hints into ranked package name candidates.
+
+`java` starts new cpe2pkg process for every query. `native` builds the package index
+only once and keeps it in memory for the whole run.
+"""
+
+import atexit
+import threading
+
+from cvejob.config import Config
+from cvejob.cpe2pkg.jvm import Cpe2PkgCommand
+from cvejob.cpe2pkg.native import PackageNameIndex
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_pkgfile(ecosystem=None):
+    """Get path to the package list file for given ecosystem."""
+    return '{pkgfile_dir}/{e}-packages'.format(
+        pkgfile_dir=Config.get('pkgfile_dir'),
+        e=ecosystem or Config.get('ecosystem')
+    )
+
+
+def read_package_names(pkgfile):
+    """Read package names from given package list file.
+
+    Lines are `<ecosystem> <name>`, or just names.
+
+    :return: generator of str
+    """
+    with open(pkgfile) as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                yield parts[-1]
+
+
+def get_backend(pkgfile):
+    """Get cpe2pkg backend for given package list file.
+
+    Backends are created on first use and then reused for the rest of the run.
+    """
+    name = Config.get('cpe2pkg_backend')
+    key = (name, pkgfile)
+
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if name == 'java':
+                backend = Cpe2PkgCommand(Config.get('cpe2pkg_path'), pkgfile)
+            elif name == 'native':
+                backend = PackageNameIndex(pkgfile)
+            else:
+                raise ValueError('Unsupported cpe2pkg backend {b}'.format(b=name))
+            _backends[key] = backend
+
+    return backend
+
+
+@atexit.register
+def close_backends():
+    """Stop all running backends."""
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
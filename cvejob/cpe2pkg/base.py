@@ -0,0 +1,56 @@
+"""This module contains base class for cpe2pkg backends."""
+
+import abc
+
+
+def build_query(vendor, product):
+    """Build cpe2pkg query from given vendor and product hints.
+
+    :return: str, query in cpe2pkg (Lucene) syntax
+    """
+    query_template = 'product:( {product} )  AND  vendor:( {vendor} )'
+    p = ' '.join(product).replace(':', ' ')
+    v = ' '.join(vendor).replace(':', ' ')
+    # queries are sent line by line to long-running backends
+    p = ' '.join(p.split())
+    v = ' '.join(v.split())
+    return query_template.format(product=p, vendor=v)
+
+
+def parse_output(lines):
+    """Parse cpe2pkg output lines.
+
+    :return: list, (score, package) tuples
+    """
+    results = []
+    for line in lines:
+        if not line.strip():
+            continue
+
+        score, package = line.split()
+        results.append((score, package))
+
+    return results
+
+
+class Cpe2PkgBackend(object, metaclass=abc.ABCMeta):
+    """Base class for all cpe2pkg backends."""
+
+    def __init__(self, pkgfile):
+        """Constructor."""
+        self._pkgfile = pkgfile
+
+    @property
+    def pkgfile(self):
+        """Get path to the package list file this backend searches in."""
+        return self._pkgfile
+
+    @abc.abstractmethod
+    def search(self, vendor, product):
+        """Search for package names matching given vendor and product hints.
+
+        :return: list, up to 10 (score, package) tuples, best match first
+        """
+
+    def close(self):
+        """Release all resources held by the backend."""
@@ -0,0 +1,106 @@
+"""This module contains cache of cpe2pkg results.
+
+Many CVEs in a feed are for the same product, so the same cpe2pkg query is
+answered over and over again. Results are cached by the normalized query and by
+identity of the package list file, so a refreshed package list invalidates them.
+"""
+
+import json
+import os
+import threading
+
+from cvejob.cache import DiskCache, LruCache
+from cvejob.config import Config
+from cvejob.metrics import get_metrics
+
+
+def normalize_tokens(hints):
+    """Normalize vendor or product hints into sorted, unique, lowercase tokens.
+
+    The order of hints doesn't matter to the backends, neither do duplicates or case.
+    """
+    return sorted(set(' '.join(hints).replace(':', ' ').lower().split()))
+
+
+def get_pkgfile_id(pkgfile):
+    """Get identity of given package list file, which changes whenever the file does."""
+    stat = os.stat(pkgfile)
+    return [os.path.abspath(pkgfile), stat.st_size, stat.st_mtime_ns]
+
+
+class Cpe2PkgCache(object):
+    """Cache of cpe2pkg results, optionally backed by a store shared across runs."""
+
+    def __init__(self, disk=None, max_size=4096):
+        """Constructor.
+
+        :param disk: DiskCache, persistent store, or None to cache in memory only
+        """
+        self._disk = disk
+        self._memory = LruCache(max_size)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(backend, vendor, product):
+        return json.dumps([
+            type(backend).__name__,
+            get_pkgfile_id(backend.pkgfile),
+            normalize_tokens(vendor),
+            normalize_tokens(product)
+        ])
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        get_metrics().incr('cache.cpe2pkg.hit' if hit else 'cache.cpe2pkg.miss')
+
+    def search(self, backend, vendor, product):
+        """Search for package names with given backend, unless the answer is cached.
+
+        :return: list, (score, package) tuples, best match first
+        """
+        key = self._key(backend, vendor, product)
+
+        matches = self._memory.get(key)
+
+        if matches is None and self._disk is not None:
+            entry = self._disk.get(key)
+            if entry is not None:
+                matches = [tuple(x) for x in entry.value]
+                self._memory.put(key, matches)
+
+        if matches is not None:
+            self._count(hit=True)
+            return list(matches)
+
+        self._count(hit=False)
+        matches = [tuple(x) for x in backend.search(vendor, product)]
+
+        if self._disk is not None:
+            self._disk.set(key, matches)
+        self._memory.put(key, matches)
+
+        return list(matches)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cpe2pkg_cache():
+    """Get process-wide cache of cpe2pkg results."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = Config.get('cache_dir')
+            disk = None
+            if cache_dir:
+                disk = DiskCache(os.path.join(cache_dir, 'cpe2pkg.sqlite'), table='cpe2pkg')
+
+            _cache = Cpe2PkgCache(disk=disk, max_size=Config.get('cpe2pkg_cache_size'))
+
+    return _cache
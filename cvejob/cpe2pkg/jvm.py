@@ -0,0 +1,24 @@
+"""This module contains cpe2pkg backend which runs the cpe2pkg Java tool."""
+
+import subprocess
+
+from cvejob.cpe2pkg.base import Cpe2PkgBackend, build_query, parse_output
+
+
+class Cpe2PkgCommand(Cpe2PkgBackend):
+    """Backend which starts new cpe2pkg process for every query."""
+
+    def __init__(self, cpe2pkg_path, pkgfile):
+        """Constructor."""
+        super().__init__(pkgfile)
+        self._cpe2pkg_path = cpe2pkg_path
+
+    def search(self, vendor, product):
+        """Search for package names matching given vendor and product hints."""
+        query = build_query(vendor, product)
+
+        cpe2pkg_output = subprocess.check_output(
+            ['java', '-jar', self._cpe2pkg_path, '--pkgfile', self._pkgfile, query],
+            universal_newlines=True
+        )
+        return parse_output(cpe2pkg_output.split('\n'))
@@ -0,0 +1,207 @@
+"""This module contains pure-Python replacement for the cpe2pkg tool."""
+
+import heapq
+import logging
+import math
+import re
+from array import array
+
+from cvejob.cpe2pkg.base import Cpe2PkgBackend
+from cvejob.pkglist import load_package_list
+
+logger = logging.getLogger(__name__)
+
+
+_token_re = re.compile('[a-z0-9]+')
+
+
+def tokenize(text):
+    """Split given text into lowercase alphanumeric tokens."""
+    return _token_re.findall(text.lower())
+
+
+class PackageNameIndex(Cpe2PkgBackend):
+    """In-process package name matcher.
+
+    Package list file is loaded into an inverted token index. Queries are scored
+    similarly to what cpe2pkg (Lucene) does: a package has to match at least one product
+    token and at least one vendor token, and rare tokens matching short names score highest.
+
+    Vendor of a package is its ecosystem, plus groupId tokens for Maven-style
+    `groupId:artifactId` names; product is the (artifact) name.
+    """
+
+    def __init__(self, pkgfile):
+        """Constructor."""
+        super().__init__(pkgfile)
+        self._names = []
+        self._norms = array('d')
+        self._vendors = []
+        self._postings = {}
+        self._vendor_df = {}
+        self._load()
+
+    def __len__(self):
+        """Get number of indexed packages."""
+        return len(self._names)
+
+    def _iter_packages(self):
+        # binary package list, if there is an up-to-date one, is cheaper to read
+        package_list = load_package_list(self._pkgfile, build=False)
+        if package_list is not None and package_list.ecosystem is not None:
+            try:
+                for name in package_list:
+                    yield package_list.ecosystem, name
+            finally:
+                package_list.close()
+            return
+
+        with open(self._pkgfile) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    yield parts[0], parts[1]
+
+    def _load(self):
+        tmp_postings = {}
+        shared_vendors = {}
+
+        for ecosystem, name in self._iter_packages():
+            self._add(ecosystem, name, tmp_postings, shared_vendors)
+
+        # freeze posting lists into compact arrays
+        self._postings = {t: array('I', ids) for t, ids in tmp_postings.items()}
+
+        logger.info('Indexed {n} packages from {f}'.format(n=len(self._names), f=self._pkgfile))
+
+    def _add(self, ecosystem, name, postings, shared_vendors):
+        doc_id = len(self._names)
+        self._names.append('{e}:{n}'.format(e=ecosystem, n=name))
+
+        if ':' in name:
+            group_id, _, product = name.rpartition(':')
+            vendor = frozenset([ecosystem] + tokenize(group_id))
+        else:
+            product = name
+            vendor = frozenset([ecosystem])
+
+        # most packages share the same vendor token set, so keep only one copy of it
+        vendor = shared_vendors.setdefault(vendor, vendor)
+        self._vendors.append(vendor)
+        for token in vendor:
+            self._vendor_df[token] = self._vendor_df.get(token, 0) + 1
+
+        product_tokens = tokenize(product)
+        self._norms.append(1.0 / math.sqrt(len(product_tokens) or 1))
+        for token in set(product_tokens):
+            postings.setdefault(token, []).append(doc_id)
+
+    def _idf(self, df):
+        return 1.0 + math.log(len(self._names) / (df + 1.0))
+
+    def search(self, vendor, product, limit=10):
+        """Search for package names matching given vendor and product hints."""
+        product_tokens = set(tokenize(' '.join(product)))
+        vendor_tokens = set(tokenize(' '.join(vendor)))
+        if not product_tokens or not vendor_tokens:
+            return []
+
+        scores = {}
+        matched = {}
+        for token in product_tokens:
+            doc_ids = self._postings.get(token)
+            if not doc_ids:
+                continue
+            weight = self._idf(len(doc_ids)) ** 2
+            for doc_id in doc_ids:
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * self._norms[doc_id]
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        vendor_weights = {
+            t: self._idf(self._vendor_df[t]) ** 2 for t in vendor_tokens if t in self._vendor_df
+        }
+
+        results = []
+        for doc_id, score in scores.items():
+            hits = [w for t, w in vendor_weights.items() if t in self._vendors[doc_id]]
+            if not hits:
+                continue
+
+            # coordination factors reward packages matching more of the query
+            score *= matched[doc_id] / len(product_tokens)
+            score += sum(hits) * len(hits) / len(vendor_tokens)
+            results.append((score, self._names[doc_id]))
+
+        # ties are broken alphabetically
+        best = heapq.nsmallest(limit, results, key=lambda x: (-x[0], x[1]))
+        return [('{s:.6f}'.format(s=s), name) for s, name in best]
+
+
+def rank_correlation(expected, actual):
+    """Get Kendall rank correlation of packages ranked by both given rankings.
+
+    :return: float, 1.0 if common packages are in the same order, -1.0 if reversed
+    """
+    position = {p: i for i, p in enumerate(actual)}
+    common = [p for p in expected if p in position]
+    if len(common) < 2:
+        return 1.0
+
+    concordant = discordant = 0
+    for i, first in enumerate(common):
+        for second in common[i + 1:]:
+            if position[first] < position[second]:
+                concordant += 1
+            else:
+                discordant += 1
+
+    return (concordant - discordant) / (concordant + discordant)
+
+
+def compare_rankings(expected_backend, actual_backend, queries, limit=10):
+    """Compare rankings of two backends on given queries.
+
+    Every query whose ranking differs, in membership or order, is reported
+    in `mismatches`, with positions at which the rankings differ.
+
+    :param queries: iterable, (vendor, product) tuples
+    :return: dict, summary of differences
+    """
+    summary = {
+        'queries': 0, 'top1_agreement': 0, 'exact_agreement': 0, 'overlap': 0.0,
+        'rank_correlation': 0.0, 'mismatches': []
+    }
+
+    for vendor, product in queries:
+        expected = [p for _, p in expected_backend.search(vendor, product)][:limit]
+        actual = [p for _, p in actual_backend.search(vendor, product)][:limit]
+
+        summary['queries'] += 1
+        if expected[:1] == actual[:1]:
+            summary['top1_agreement'] += 1
+
+        if expected == actual:
+            summary['exact_agreement'] += 1
+        else:
+            positions = [
+                i for i in range(max(len(expected), len(actual)))
+                if expected[i:i + 1] != actual[i:i + 1]
+            ]
+            summary['mismatches'].append({
+                'vendor': vendor, 'product': product, 'expected': expected, 'actual': actual,
+                'positions': positions
+            })
+
+        if expected or actual:
+            common = set(expected) & set(actual)
+            summary['overlap'] += len(common) / max(len(expected), len(actual))
+        else:
+            summary['overlap'] += 1.0
+
+        summary['rank_correlation'] += rank_correlation(expected, actual)
+
+    if summary['queries']:
+        summary['overlap'] /= summary['queries']
+        summary['rank_correlation'] /= summary['queries']
+
+    return summary
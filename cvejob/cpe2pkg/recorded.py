@@ -0,0 +1,56 @@
+"""This module contains replay of recorded rankings.
+
+Rankings recorded from cpe2pkg by `scripts/compare_cpe2pkg.py --record` let the native
+matcher be compared with cpe2pkg where no JVM is available. Any other expected
+rankings in the same format can be replayed too, e.g. in tests.
+"""
+
+import json
+
+from cvejob.cpe2pkg.base import Cpe2PkgBackend, build_query
+
+
+def record_rankings(backend, queries, limit=10):
+    """Record rankings of given backend on given queries.
+
+    Only the order of packages is recorded, scores of different backends
+    are not comparable anyway.
+
+    :param queries: iterable, (vendor, product) tuples
+    :return: list, {"vendor": [...], "product": [...], "packages": [...]} dicts
+    """
+    return [
+        {
+            'vendor': list(vendor),
+            'product': list(product),
+            'packages': [p for _, p in backend.search(vendor, product)][:limit]
+        }
+        for vendor, product in queries
+    ]
+
+
+class RecordedRankings(Cpe2PkgBackend):
+    """Backend which answers queries from recorded or otherwise expected rankings."""
+
+    def __init__(self, rankings_file, pkgfile=None):
+        """Constructor.
+
+        :param rankings_file: str, JSON file written by `record_rankings()`
+        """
+        super().__init__(pkgfile)
+
+        with open(rankings_file) as f:
+            rankings = json.load(f)
+
+        self.queries = [(x['vendor'], x['product']) for x in rankings]
+        self._rankings = {
+            build_query(x['vendor'], x['product']): x['packages'] for x in rankings
+        }
+
+    def search(self, vendor, product):
+        """Look up recorded ranking for given vendor and product hints.
+
+        :return: list, (None, package) tuples, best match first
+        :raises KeyError: if the query wasn't recorded
+        """
+        return [(None, p) for p in self._rankings[build_query(vendor, product)]]
@@ -0,0 +1,163 @@
+"""This module contains extraction of CPEs from NVD configuration nodes.
+
+Configuration trees are flattened iteratively, and every CPE URI is parsed only once
+per process: parsed names are kept in a memo table shared by all CVEs, as the same
+URIs come up over and over again in a feed.
+"""
+
+import functools
+import re
+from collections import namedtuple
+from urllib.parse import unquote
+
+
+CpeName = namedtuple('CpeName', ['part', 'vendor', 'product', 'version'])
+
+_unescaped_colon_re = re.compile(r'(?<!\\):')
+_escape_re = re.compile(r'\\(.)')
+
+# values which stand for "any version" or "not applicable", not for a version
+_NOT_VERSIONS = ('', '*', '-')
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_uri(uri):
+    """Parse CPE URI, either 2.2 URI or 2.3 formatted string.
+
+    Components are unquoted, so that both forms of the same CPE give the same name.
+    Version is None if the CPE matches any version.
+
+    :return: CpeName
+    """
+    if uri.startswith('cpe:/'):
+        fields = [unquote(x) for x in uri[len('cpe:/'):].split(':')]
+    elif uri.startswith('cpe:2.3:'):
+        fields = [
+            _escape_re.sub(r'\1', x) for x in _unescaped_colon_re.split(uri[len('cpe:2.3:'):])
+        ]
+    else:
+        raise ValueError('Invalid CPE URI {u}'.format(u=uri))
+
+    fields += [''] * (4 - len(fields))
+    part, vendor, product, version = fields[:4]
+    if version in _NOT_VERSIONS:
+        version = None
+
+    return CpeName(part, vendor, product, version)
+
+
+class AffectedCpe(object):
+    """CPE from CVE's configurations, with optional version bounds."""
+
+    __slots__ = ('uri', 'name', 'version_start_including', 'version_start_excluding',
+                 'version_end_including', 'version_end_excluding')
+
+    def __init__(self, uri, name, version_start_including=None, version_start_excluding=None,
+                 version_end_including=None, version_end_excluding=None):
+        """Constructor.
+
+        :param name: CpeName, parsed URI
+        """
+        self.uri = uri
+        self.name = name
+        self.version_start_including = version_start_including
+        self.version_start_excluding = version_start_excluding
+        self.version_end_including = version_end_including
+        self.version_end_excluding = version_end_excluding
+
+    @property
+    def vendor(self):
+        """Get vendor."""
+        return self.name.vendor
+
+    @property
+    def product(self):
+        """Get product."""
+        return self.name.product
+
+    @property
+    def version(self):
+        """Get version, or None if the CPE matches any version."""
+        return self.name.version
+
+    @property
+    def versions(self):
+        """Get all versions this CPE mentions, i.e. its version bounds and version.
+
+        :return: list, versions, as they appear in the CVE record
+        """
+        return [x for x in (self.version_start_including, self.version_start_excluding,
+                            self.version_end_including, self.version_end_excluding,
+                            self.version) if x is not None]
+
+    def __repr__(self):
+        """Get printable representation."""
+        return 'AffectedCpe({u!r})'.format(u=self.uri)
+
+
+def iter_cpe_dicts(nodes):
+    """Iterate over `cpe` elements of given configuration nodes, including all children.
+
+    The tree is walked without recursion, in the same order as the recursive walk:
+    children of a node come before the node's own CPEs.
+
+    :return: generator of dicts
+    """
+    stack = [(node, False) for node in reversed(nodes)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield from node.get('cpe', ())
+            continue
+
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.get('children', ())))
+
+
+def extract_cpes(nodes, part='a'):
+    """Extract CPEs of given type from configuration nodes.
+
+    :param part: str, 'a' for applications, 'o' for operating systems, 'h' for hardware
+    :return: tuple, AffectedCpe objects
+    """
+    result = []
+    for cpe_dict in iter_cpe_dicts(nodes):
+        uri = cpe_dict.get('cpe22Uri') or cpe_dict.get('cpe23Uri')
+        if not uri:
+            continue
+
+        try:
+            name = parse_uri(uri)
+        except ValueError:
+            continue
+        if name.part != part:
+            continue
+
+        result.append(AffectedCpe(
+            uri, name,
+            version_start_including=cpe_dict.get('versionStartIncluding'),
+            version_start_excluding=cpe_dict.get('versionStartExcluding'),
+            version_end_including=cpe_dict.get('versionEndIncluding'),
+            version_end_excluding=cpe_dict.get('versionEndExcluding')
+        ))
+
+    return tuple(result)
+
+
+def get_versions(cpes):
+    """Get all versions mentioned by given CPEs.
+
+    :return: set, versions
+    """
+    versions = set()
+    for cpe in cpes:
+        versions.update(cpe.versions)
+    return versions
+
+
+def get_vendor_product_pairs(cpes):
+    """Get (vendor, product) pairs of given CPEs.
+
+    :return: set, (vendor, product) tuples
+    """
+    return {(x.vendor, x.product) for x in cpes}
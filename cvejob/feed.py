@@ -0,0 +1,374 @@
+"""This module contains streaming NVD JSON feed reader."""
+
+import gzip
+import io
+import json
+import logging
+import mmap
+import os
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import urlparse
+
+from cvejob.config import Config
+from cvejob.model import CveRecord
+
+
+logger = logging.getLogger(__name__)
+
+
+_CHUNK_SIZE = 1024 * 1024
+_GZIP_MAGIC = b'\x1f\x8b'
+_WHITESPACE = ' \t\n\r,'
+
+
+def open_feed(path):
+    """Open given NVD feed file, plain or gzip-compressed, for reading in binary mode."""
+    with open(path, 'rb') as f:
+        magic = f.read(len(_GZIP_MAGIC))
+
+    if magic == _GZIP_MAGIC:
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+class FeedReader(object):
+    """Read `CVE_Items` elements from NVD JSON feed, one at a time.
+
+    Only a small window of the feed is kept in memory, no matter how big the feed is.
+    """
+
+    def __init__(self, stream, chunk_size=_CHUNK_SIZE):
+        """Constructor.
+
+        :param stream: binary file-like object with the feed
+        """
+        # no newline translation, so that the text maps back to the exact bytes of the feed
+        self._stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        # byte (not character) offset of the buffer position `_mark`, if tracked
+        self._track_offsets = False
+        self._mark = 0
+        self._mark_bytes = 0
+
+    def _fill(self):
+        if self._eof:
+            return False
+
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        if self._pos:
+            if self._track_offsets:
+                self._offset(self._pos)
+                self._mark = 0
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+        self._buffer += chunk
+        return True
+
+    def _seek_items(self):
+        """Move right behind the opening bracket of `CVE_Items` list."""
+        while True:
+            idx = self._buffer.find('"CVE_Items"', self._pos)
+            if idx != -1:
+                bracket = self._buffer.find('[', idx)
+                if bracket != -1:
+                    self._pos = bracket + 1
+                    return True
+            if not self._fill():
+                return False
+
+    def _skip_separators(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _offset(self, pos):
+        """Get byte offset of given buffer position; positions must never go back."""
+        self._mark_bytes += len(self._buffer[self._mark:pos].encode('utf-8'))
+        self._mark = pos
+        return self._mark_bytes
+
+    def items(self, offsets=False):
+        """Iterate over `CVE_Items` elements.
+
+        :param offsets: bool, also yield byte offset and length of each element in the feed
+        :return: generator of dicts, or of (dict, offset, length) tuples
+        """
+        self._track_offsets = offsets
+        if not self._seek_items():
+            return
+
+        while True:
+            self._skip_separators()
+            if self._pos >= len(self._buffer) or self._buffer[self._pos] == ']':
+                return
+
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # the element is not complete yet, read more data
+                if not self._fill():
+                    raise
+                continue
+
+            if offsets:
+                start = self._offset(self._pos)
+                yield item, start, self._offset(end) - start
+            else:
+                yield item
+
+            self._pos = end
+
+
+def iter_cve_items(path, chunk_size=_CHUNK_SIZE):
+    """Iterate over raw `CVE_Items` elements from given NVD feed file.
+
+    :return: generator of dicts
+    """
+    with open_feed(path) as f:
+        yield from FeedReader(f, chunk_size=chunk_size).items()
+
+
+def iter_cves(path, chunk_size=_CHUNK_SIZE):
+    """Iterate over CVEs from given NVD feed file.
+
+    :return: generator of CveRecord objects
+    """
+    for cve_dict in iter_cve_items(path, chunk_size=chunk_size):
+        yield CveRecord.from_dict(cve_dict)
+
+
+def get_index_path(feed_path):
+    """Get path to the index sidecar file of given NVD feed file."""
+    return feed_path + '.idx'
+
+
+def _get_feed_id(feed_path):
+    stat = os.stat(feed_path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def build_index(feed_path):
+    """Build index of given NVD feed file and store it in a sidecar file.
+
+    The index maps CVE IDs to byte offsets and lengths of their items
+    in the (uncompressed) feed. It is a text file with JSON header line,
+    followed by `<CVE ID> <offset> <length>` lines sorted by CVE ID.
+
+    The index pays off fully for uncompressed feeds only, which is how `download_feed()`
+    stores them. Seeking in a gzipped feed still decompresses everything in front
+    of the wanted items, the index just saves parsing it.
+    """
+    items = []
+    with open_feed(feed_path) as f:
+        for item, offset, length in FeedReader(f).items(offsets=True):
+            items.append((item['cve']['CVE_data_meta']['ID'], offset, length))
+    items.sort()
+
+    index_path = get_index_path(feed_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)))
+    with os.fdopen(fd, 'w') as f:
+        f.write(json.dumps({'feed': _get_feed_id(feed_path)}) + '\n')
+        for item in items:
+            f.write('{0} {1} {2}\n'.format(*item))
+    os.replace(tmp_path, index_path)
+
+    logger.info('Indexed {n} CVEs from {f}'.format(n=len(items), f=feed_path))
+
+
+class FeedIndex(object):
+    """Read-only view of NVD feed index sidecar file.
+
+    Lookups are binary searches in the memory-mapped file, the index is never loaded
+    as a whole.
+    """
+
+    def __init__(self, index_path):
+        """Constructor."""
+        with open(index_path, 'rb') as f:
+            self.header = json.loads(f.readline().decode('utf-8'))
+            self._start = f.tell()
+            self._size = os.fstat(f.fileno()).st_size
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b''
+
+    def _line_at(self, pos):
+        """Get the line containing given position, as (start, end, fields)."""
+        start = self._data.rfind(b'\n', self._start, pos) + 1
+        if not start:
+            start = self._start
+        end = self._data.find(b'\n', start)
+        return start, end, self._data[start:end].split()
+
+    def get(self, cve_id):
+        """Get (offset, length) of given CVE's item in the feed, or None."""
+        key = cve_id.encode('utf-8')
+        lo, hi = self._start, self._size
+
+        while lo < hi:
+            start, end, fields = self._line_at((lo + hi) // 2)
+            if fields[0] == key:
+                return int(fields[1]), int(fields[2])
+            if fields[0] < key:
+                lo = end + 1
+            else:
+                hi = start
+
+        return None
+
+    def close(self):
+        """Unmap the index file."""
+        if self._size:
+            self._data.close()
+
+
+def load_index(feed_path):
+    """Load index of given NVD feed file, building it first if needed.
+
+    :return: FeedIndex
+    """
+    index_path = get_index_path(feed_path)
+    try:
+        index = FeedIndex(index_path)
+        if index.header.get('feed') == _get_feed_id(feed_path):
+            return index
+        index.close()
+    except (OSError, ValueError):
+        pass
+
+    # no index yet, or the feed was downloaded again
+    build_index(feed_path)
+    return FeedIndex(index_path)
+
+
+def read_cve_items(feed_path, cve_ids, warn=True):
+    """Read raw `CVE_Items` elements for given CVE IDs, using feed's index.
+
+    Items are yielded in the order in which they appear in the feed. Lookups are
+    fastest in uncompressed feeds, see `build_index()`.
+
+    :param warn: bool, whether to warn about CVEs which are not in the feed
+    :return: generator of dicts
+    """
+    index = load_index(feed_path)
+
+    locations = []
+    for cve_id in cve_ids:
+        location = index.get(cve_id)
+        if location is not None:
+            locations.append(location)
+        elif warn:
+            logger.warning('{cve_id} is not in {f}'.format(cve_id=cve_id, f=feed_path))
+    index.close()
+
+    # seek only forward, gzip streams can't go back cheaply
+    with open_feed(feed_path) as f:
+        for offset, length in sorted(locations):
+            f.seek(offset)
+            yield json.loads(f.read(length).decode('utf-8'))
+
+
+class _Decompressor(object):
+    """Decompress gzip stream chunk by chunk, pass anything else through as it is."""
+
+    def __init__(self):
+        """Constructor."""
+        self._decompressor = None
+        self._started = False
+
+    def decompress(self, chunk):
+        """Get decompressed data for given chunk of the stream."""
+        if not self._started:
+            self._started = True
+            if chunk.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._decompressor is None:
+            return chunk
+
+        data = self._decompressor.decompress(chunk)
+        # gzip files can have several members
+        while self._decompressor.eof and self._decompressor.unused_data:
+            rest = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data += self._decompressor.decompress(rest)
+        return data
+
+    def flush(self):
+        """Get the rest of decompressed data."""
+        return self._decompressor.flush() if self._decompressor is not None else b''
+
+
+def download_feed(feed, directory, session=None, decompress=True):
+    """Download NVD feed (e.g. '2018', or 'recent'), unless the local copy is up to date.
+
+    The feed is decompressed while it's being downloaded, e.g. to `nvdcve-1.0-2018.json`,
+    so that lookups with the feed index can seek in it directly, see `build_index()`.
+    Its modification time is set to the upstream Last-Modified, so that the next
+    download can be conditional. The file is replaced only when the download is complete.
+
+    :param decompress: bool, whether to store the feed decompressed, or gzipped as downloaded
+    :return: tuple, (path to the feed file, bool whether it was downloaded)
+    """
+    if session is None:
+        from cvejob.versions import get_session
+
+        session = get_session()
+
+    url = Config.get('nvd_feed_url').format(feed=feed)
+    filename = os.path.basename(urlparse(url).path)
+    if decompress and filename.endswith('.gz'):
+        filename = filename[:-len('.gz')]
+    path = os.path.join(directory, filename)
+
+    headers = {}
+    if os.path.exists(path):
+        headers['If-Modified-Since'] = formatdate(os.path.getmtime(path), usegmt=True)
+
+    with session.get(url, headers=headers, stream=True) as response:
+        if response.status_code == 304:
+            logger.info('{f} is up to date'.format(f=path))
+            return path, False
+        response.raise_for_status()
+
+        os.makedirs(directory, exist_ok=True)
+        partial_path = path + '.partial'
+        decompressor = _Decompressor() if decompress else None
+        with open(partial_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                f.write(decompressor.decompress(chunk) if decompressor else chunk)
+            if decompressor:
+                f.write(decompressor.flush())
+        os.replace(partial_path, path)
+
+        last_modified = response.headers.get('Last-Modified')
+        if last_modified:
+            timestamp = parsedate_to_datetime(last_modified).timestamp()
+            os.utime(path, (timestamp, timestamp))
+
+    logger.info('Downloaded {f}'.format(f=path))
+    return path, True
+
+
+def download_feeds(feeds, directory, concurrency=4, session=None, decompress=True):
+    """Download several NVD feeds concurrently, see `download_feed()`.
+
+    :return: list, paths to the feed files, in the order of given feeds
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = executor.map(
+            lambda x: download_feed(x, directory, session=session, decompress=decompress), feeds
+        )
+        return [path for path, _ in results]
@@ -1,19 +1,30 @@
 """This module contains input filters."""
 
-import os
 import abc
 import datetime
-import nltk
-import requests
-from urllib.parse import urlparse
+import time
+from collections import OrderedDict
 
-from cvejob.config import Config
+from cvejob import text
+from cvejob.config import Config, get_cherry_picked_ids
+from cvejob.github import get_github_repo, get_language_service
+from cvejob.metrics import get_metrics
 
 
-def validate_cve(cve):
+# check costs, cheaper checks run first
+COST_METADATA = 0
+COST_CPU = 1
+COST_NETWORK = 2
+
+
+def validate_cve(cve, ecosystem_specific=None):
     """Validate given CVE against predefined list of checks.
 
     If any of the checks fail, the CVE should not be further processed.
+
+    :param ecosystem_specific: bool, run only checks whose outcome does (True)
+        or does not (False) depend on the ecosystem; None to run all checks
+    :return: FilterResult, evaluates to False if the CVE was rejected
     """
     checks = (
         NotUnsupportedFileExtensionCheck,
@@ -26,16 +37,91 @@ def validate_cve(cve):
     if Config.get('cve_age') is not None:
         checks += (NotOlderThanCheck,)
 
-    print([x(cve).check() for x in checks])
-    return all(x(cve).check() for x in checks)
+    if ecosystem_specific is not None:
+        checks = tuple(x for x in checks if x.ecosystem_specific == ecosystem_specific)
+
+    return FilterPipeline(checks).run(cve)
+
+
+class FilterResult(object):
+    """Result of running input checks on a CVE."""
+
+    def __init__(self):
+        """Constructor."""
+        self.rejected_by = None
+        self.timings = OrderedDict()
+        # whether the verdict, or the verdict of the following stages if accepted,
+        # can be remembered for subsequent runs
+        self.cacheable = True
+
+    @property
+    def accepted(self):
+        """Check whether the CVE passed all checks."""
+        return self.rejected_by is None
+
+    def __bool__(self):
+        """Evaluate to True if the CVE passed all checks."""
+        return self.accepted
+
+
+class FilterPipeline(object):
+    """Run input checks, cheapest first, until the first rejection."""
+
+    def __init__(self, checks):
+        """Constructor."""
+        # sorted() is stable, so checks with the same cost keep their order
+        self._checks = sorted(checks, key=lambda x: x.cost)
+
+    @property
+    def checks(self):
+        """Get checks in the order in which they run."""
+        return list(self._checks)
+
+    def run(self, cve):
+        """Run all checks on given CVE.
+
+        :return: FilterResult
+        """
+        result = FilterResult()
+        metrics = get_metrics()
+
+        for check in self._checks:
+            start = time.perf_counter()
+            checker = check(cve)
+            passed = checker.check()
+            elapsed = time.perf_counter() - start
+            result.timings[check.__name__] = elapsed
+
+            metrics.observe('check.' + check.__name__, elapsed)
+            metrics.incr('check.{c}.{v}'.format(
+                c=check.__name__, v='accepted' if passed else 'rejected'
+            ))
+
+            if not checker.definite:
+                result.cacheable = False
+
+            if not passed:
+                result.rejected_by = check.__name__
+                result.cacheable = result.cacheable and check.cacheable
+                break
+
+        return result
 
 
 class CveCheck(object, metaclass=abc.ABCMeta):
     """Base class for all input checks."""
 
+    cost = COST_METADATA
+    # False for checks whose results depend on something else than the CVE record
+    cacheable = True
+    # True for checks whose results differ between ecosystems
+    ecosystem_specific = False
+
     def __init__(self, cve):
         """Constructor."""
         self._cve = cve
+        # set to False by the check if it couldn't fully decide, e.g. due to a failed lookup
+        self.definite = True
 
     @abc.abstractmethod
     def check(self):
@@ -45,6 +131,8 @@ class CveCheck(object, metaclass=abc.ABCMeta):
 class NotOlderThanCheck(CveCheck):
     """Check whether given CVE is not older than predefined number of days."""
 
+    cacheable = False
+
     def check(self):
         """Perform the check."""
         config_age = Config.get('cve_age')
@@ -58,9 +146,11 @@ class NotOlderThanCheck(CveCheck):
 class NotUnsupportedFileExtensionCheck(CveCheck):
     """Check whether given CVE doesn't talk about unsupported files in its description."""
 
+    cost = COST_CPU
+
     def check(self):
         """Perform the check."""
-        tokens = nltk.word_tokenize(self._cve.description)
+        tokens = text.word_tokenize(self._cve.description)
         extensions = ('.php', '.c', '.cpp', '.h')
         return not any(x for x in tokens if any(
             y for y in extensions if x.lower().endswith(y)
@@ -72,65 +162,36 @@ class NotUnderAnalysisCheck(CveCheck):
 
     def check(self):
         """Perform the check."""
-        return bool(self._cve.configurations)
+        return self._cve.has_configurations
 
 
 class IsSupportedGitHubLanguageCheck(CveCheck):
-    """Check whether GitHub references don't point to projects written in unsupported languages."""
-
-    def check(self):
-        """Perform the check."""
-        refs = self._cve.references
-
-        def is_github_ref(url):
-            """Check whether given URL points to GitHub.
-
-            :return: tuple, (owner, repo), or None if URL is not GitHub.
-            """
-            parsed = urlparse(url)
-
-            if not parsed.hostname.endswith('github.com'):
-                return None
+    """Check whether GitHub references don't point to projects written in unsupported languages.
 
-            paths = parsed.path.strip('/').split('/')
-            if len(paths) < 2:
-                return None
-
-            return paths[0], paths[1]
-
-        def is_supported_gh_language(owner, repo):
-            """Check whether GitHub's (owner, repo) is written in supported language."""
-            url = 'https://api.github.com/repos/{o}/{r}/languages'.format(
-                o=owner, r=repo
-            )
-
-            headers = {}
-            token = os.environ.get('GITHUB_TOKEN')
-            if token:
-                headers.update({'Authorization': 'token {token}'.format(token=token)})
+    Repositories whose languages could not be looked up are skipped, but then
+    passing the check is not definite.
+    """
 
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                return False
+    cost = COST_NETWORK
+    ecosystem_specific = True
 
-            top_lang = None
-            top_lang_bytes = 0
-            langs = response.json()
-            for lang, lang_bytes in langs.items():
-                if lang_bytes > top_lang_bytes:
-                    top_lang_bytes = lang_bytes
-                    top_lang = lang
-            if top_lang.lower() == Config.get('ecosystem'):
-                return True
-            return False
+    def check(self):
+        """Perform the check."""
+        repos = [get_github_repo(ref) for ref in self._cve.references]
+        repos = [x for x in repos if x]
+        if not repos:
+            return True
 
-        for ref in refs:
-            result = is_github_ref(ref)
+        top_languages = get_language_service().get_top_languages(repos)
+        ecosystem = Config.get('ecosystem')
 
+        for top_lang in top_languages.values():
             # fail here if this is a GitHub reference, but the language is not supported
-            if result and not is_supported_gh_language(result[0], result[1]):
+            if not top_lang or top_lang.lower() != ecosystem:
                 return False
 
+        # repositories which couldn't be looked up might have failed the check
+        self.definite = len(top_languages) == len(set(repos))
         return True
 
 
@@ -142,18 +203,18 @@ class AffectsApplicationCheck(CveCheck):
 
     def check(self):
         """Perform the check."""
-        if self._cve.get_cpe(cpe_type='a'):
-            return True
-        return False
+        return bool(self._cve.cpes)
 
 
 class IsCherryPickedCveCheck(CveCheck):
     """Check whether given CVE was cherry-picked by user."""
 
+    cacheable = False
+
     def check(self):
         """Perform the check."""
-        cve_id = Config.get('cve_id')
-        if cve_id is not None:
-            return cve_id == self._cve.cve_id
+        cve_ids = get_cherry_picked_ids()
+        if cve_ids is not None:
+            return self._cve.cve_id in cve_ids
 
         return True
@@ -0,0 +1,235 @@
+"""This module contains GitHub API helpers."""
+
+import email.utils
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from cvejob.cache import DiskCache
+from cvejob.config import Config
+from cvejob.metrics import get_metrics, timed
+
+logger = logging.getLogger(__name__)
+
+
+class LookupFailed(Exception):
+    """GitHub API could not answer, e.g. because it is not reachable."""
+
+
+class RateLimitExceeded(LookupFailed):
+    """GitHub API rate limit was exceeded and waiting didn't help."""
+
+
+def get_github_repo(url):
+    """Check whether given URL points to GitHub.
+
+    :return: tuple, (owner, repo), or None if URL is not GitHub.
+    """
+    parsed = urlparse(url)
+
+    if not parsed.hostname or not parsed.hostname.endswith('github.com'):
+        return None
+
+    paths = parsed.path.strip('/').split('/')
+    if len(paths) < 2:
+        return None
+
+    return paths[0], paths[1]
+
+
+def get_top_language(languages):
+    """Get language with the most bytes of code from GitHub's languages response."""
+    if not languages:
+        return None
+    return max(languages.items(), key=lambda x: x[1])[0]
+
+
+class GitHubLanguageService(object):
+    """Service which looks up languages of GitHub repositories.
+
+    Lookups share single pooled HTTP session and run with bounded concurrency.
+    Results are cached, both in memory and on disk, including 404s.
+    """
+
+    def __init__(self, api_url='https://api.github.com', token=None, cache=None,
+                 ttl=7 * 24 * 3600, negative_ttl=24 * 3600, concurrency=8,
+                 max_retries=3, max_wait=600, sleep=time.sleep):
+        """Constructor.
+
+        :param cache: DiskCache, persistent cache, or None to cache in memory only
+        :param max_wait: int, maximum number of seconds to wait for rate limit reset, at once
+        """
+        self._api_url = api_url.rstrip('/')
+        self._cache = cache or DiskCache(None, table='github_languages')
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._concurrency = concurrency
+        self._max_retries = max_retries
+        self._max_wait = max_wait
+        self._sleep = sleep
+
+        self._memory = {}
+        self._memory_lock = threading.Lock()
+
+        # requests are slow to import, and not needed by all runs
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        if token:
+            self._session.headers.update({'Authorization': 'token {token}'.format(token=token)})
+
+    @staticmethod
+    def _parse_retry_after(value):
+        """Parse Retry-After header, either number of seconds or HTTP date."""
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            logger.warning('Invalid Retry-After header: {v}'.format(v=value))
+            return 1
+
+        return max(retry_at.timestamp() - time.time(), 1)
+
+    def _get_wait_time(self, response):
+        """Get number of seconds to wait before retrying, or None if not rate limited."""
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            return self._parse_retry_after(retry_after)
+
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset = int(response.headers.get('X-RateLimit-Reset', 0))
+            return max(reset - time.time(), 1)
+
+        return None
+
+    def _fetch(self, owner, repo):
+        import requests
+
+        url = '{api}/repos/{o}/{r}/languages'.format(api=self._api_url, o=owner, r=repo)
+
+        for _ in range(self._max_retries + 1):
+            try:
+                with timed('github'):
+                    response = self._session.get(url)
+            except requests.RequestException as e:
+                # e.g. air-gapped runs, which rely on cached languages only
+                raise LookupFailed('{url}: {e}'.format(url=url, e=e))
+
+            wait = self._get_wait_time(response)
+            if wait is None:
+                break
+
+            logger.warning('GitHub rate limit hit, waiting {s:.0f}s'.format(s=wait))
+            self._sleep(min(wait, self._max_wait))
+        else:
+            raise RateLimitExceeded(url)
+
+        if response.status_code == 404:
+            return None
+
+        if response.status_code != 200:
+            # e.g. 5xx, the repository may very well exist
+            raise LookupFailed('{url}: {s}'.format(url=url, s=response.status_code))
+
+        return response.json()
+
+    def get_languages(self, owner, repo):
+        """Get languages of given GitHub repository.
+
+        :return: dict, language -> number of bytes, or None if the repository doesn't exist
+        """
+        key = '{o}/{r}'.format(o=owner, r=repo).lower()
+
+        with self._memory_lock:
+            if key in self._memory:
+                get_metrics().incr('cache.github.hit')
+                return self._memory[key]
+
+        entry = self._cache.get(key, ttl=self._ttl)
+        if entry is not None and entry.value is None:
+            # 404s are remembered for shorter time
+            if time.time() - entry.timestamp > self._negative_ttl:
+                entry = None
+
+        if entry is not None:
+            get_metrics().incr('cache.github.hit')
+            languages = entry.value
+        else:
+            get_metrics().incr('cache.github.miss')
+            languages = self._fetch(owner, repo)
+            self._cache.set(key, languages)
+
+        with self._memory_lock:
+            self._memory[key] = languages
+
+        return languages
+
+    def get_top_languages(self, repos):
+        """Get top languages of given GitHub repositories, concurrently.
+
+        Repositories for which the lookup was not possible, due to rate limiting
+        or network errors, are not included in the result.
+
+        :param repos: iterable, (owner, repo) tuples
+        :return: dict, (owner, repo) -> top language, or None if unknown
+        """
+        repos = list(dict.fromkeys(repos))
+
+        def lookup(repo):
+            try:
+                return repo, get_top_language(self.get_languages(*repo)), True
+            except LookupFailed:
+                logger.warning('Giving up on languages for {o}/{r}'.format(o=repo[0], r=repo[1]))
+                return repo, None, False
+
+        if len(repos) == 1:
+            results = [lookup(repos[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+                results = list(executor.map(lookup, repos))
+
+        return {repo: lang for repo, lang, ok in results if ok}
+
+    def close(self):
+        """Release the HTTP session."""
+        self._session.close()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_language_service():
+    """Get process-wide GitHub language service."""
+    global _service
+
+    with _service_lock:
+        if _service is None:
+            cache_dir = Config.get('cache_dir')
+            cache = None
+            if cache_dir:
+                cache = DiskCache(os.path.join(cache_dir, 'github.sqlite'),
+                                  table='github_languages')
+
+            _service = GitHubLanguageService(
+                api_url=Config.get('github_api_url'),
+                token=os.environ.get('GITHUB_TOKEN'),
+                cache=cache,
+                ttl=Config.get('github_cache_ttl'),
+                concurrency=Config.get('github_concurrency')
+            )
+
+    return _service
@@ -5,13 +5,18 @@ Identifiers are responsible for identifying package name candidates.
 
 from cvejob.config import Config
 from cvejob.identifiers.basic import NaivePackageNameIdentifier
-from cvejob.identifiers.nvdtoolkit import NvdToolkitPackageNameIdentifier
+
+
+def get_identifier_class():
+    """Get identifier class."""
+    if not Config.get('use_nvdtoolkit'):
+        return NaivePackageNameIdentifier
+
+    # nvd-toolkit pulls in whole sklearn stack, import it only if it is going to be used
+    from cvejob.identifiers.nvdtoolkit import NvdToolkitPackageNameIdentifier
+    return NvdToolkitPackageNameIdentifier
 
 
 def get_identifier(cve):
     """Get identifier object."""
-    if not Config.get('use_nvdtoolkit'):
-        cls = NaivePackageNameIdentifier
-    else:
-        cls = NvdToolkitPackageNameIdentifier
-    return cls(cve)
+    return get_identifier_class()(cve)
@@ -1,11 +1,8 @@
 """This module contains basic (naive) package name identifier."""
 
-import re
-import nltk
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
 from collections import OrderedDict
 
+from cvejob import text
 from cvejob.utils import run_cpe2pkg
 from cvejob.config import Config
 
@@ -21,18 +18,27 @@ class NaivePackageNameIdentifier(object):
         """Constructor."""
         self._cve = cve
 
-    def _get_vendor_product_pairs(self):
+    @classmethod
+    def warm_up(cls):
+        """Prepare per-process state, so that the first identification is not slower."""
+        text.warm_up()
+
+    @classmethod
+    def identify_many(cls, cves):
+        """Identify possible package name candidates for several CVEs at once.
 
-        result = set()
-        for cpe in self._cve.get_cpe(cpe_type='a'):
-            result.add((cpe.vendor, cpe.product))
-        return result
+        :return: list, package name candidates for each given CVE
+        """
+        return [cls(cve).identify() for cve in cves]
+
+    def _get_vendor_product_pairs(self):
+        return self._cve.get_vendor_product_pairs()
 
     def _get_candidates_from_description(self):
         """Try to identify possible package names from the description."""
         pkg_name_candidates = set()
 
-        sentences = sent_tokenize(self._cve.description)
+        sentences = text.sent_tokenize(self._cve.description)
         first_sentence = sentences[0] if sentences else ''
         names = self._guess_from_sentence(first_sentence)
         pkg_name_candidates.update(set(names))
@@ -46,18 +52,8 @@ class NaivePackageNameIdentifier(object):
 
         Returns a list of possible package names, without duplicates.
         """
-        stop_words = set()
-
-        try:
-            # Fails when no downloaded stopwords are available.
-            stop_words.update(stopwords.words('english'))
-        except LookupError:
-            # Download stopwords since they are not available.
-            nltk.download('stopwords')
-            stop_words.update(stopwords.words('english'))
-
-        regexp = re.compile('[A-Z][A-Za-z0-9-:]*')
-        suspects = regexp.findall(sentence)
+        stop_words = text.get_stopwords()
+        suspects = text.find_capitalized_words(sentence)
 
         results = [x.lower() for x in suspects if x.lower() not in stop_words]
         # get rid of duplicates, but keep order
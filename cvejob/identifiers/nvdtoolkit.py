@@ -1,5 +1,7 @@
 """Identifier based on nvd-toolkit."""
 
+import threading
+
 from toolkit import pipelines
 from toolkit.transformers.classifiers import NBClassifier
 from toolkit.transformers import feature_hooks
@@ -9,31 +11,65 @@ from cvejob.config import Config
 from cvejob.utils import run_cpe2pkg
 
 
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_prediction_pipeline():
+    """Get prediction pipeline shared by all identifiers in this process.
+
+    The pretrained classifier is restored from the checkpoint on first use only.
+    """
+    global _pipeline
+
+    with _pipeline_lock:
+        if _pipeline is None:
+            # restored pretrained classifier from the checkpoint
+            clf = NBClassifier.restore(checkpoint=Config.get('nvdtoolkit_export_dir'))
+
+            hooks = [
+                feature_hooks.has_uppercase_hook,
+                feature_hooks.is_alnum_hook,
+                feature_hooks.ver_follows_hook,
+                feature_hooks.word_len_hook
+            ]
+
+            _pipeline = pipelines.get_prediction_pipeline(
+                classifier=clf,
+                feature_hooks=hooks
+            )
+
+    return _pipeline
+
+
 class NvdToolkitPackageNameIdentifier(NaivePackageNameIdentifier):
     """Identifier based on nvd-toolkit."""
 
-    def identify(self):
-        """Identify possible package name candidates."""
-        # restored pretrained classifier from the checkpoint
-        clf = NBClassifier.restore(checkpoint=Config.get('nvdtoolkit_export_dir'))
+    @classmethod
+    def warm_up(cls):
+        """Prepare per-process state, so that the first identification is not slower."""
+        super().warm_up()
+        get_prediction_pipeline()
+
+    @classmethod
+    def identify_many(cls, cves):
+        """Identify possible package name candidates for several CVEs at once.
 
-        hooks = [
-            feature_hooks.has_uppercase_hook,
-            feature_hooks.is_alnum_hook,
-            feature_hooks.ver_follows_hook,
-            feature_hooks.word_len_hook
-        ]
+        Descriptions of all given CVEs go through the prediction pipeline in one batch.
 
-        pipeline = pipelines.get_prediction_pipeline(
-            classifier=clf,
-            feature_hooks=hooks
-        )
+        :return: list, package name candidates for each given CVE
+        """
+        if not cves:
+            return []
 
-        results = pipeline.fit_predict(
-            [self._cve.description], classifier__sample=True
-        ).tolist()[0]
+        results = get_prediction_pipeline().fit_predict(
+            [cve.description for cve in cves], classifier__sample=True
+        ).tolist()
 
-        candidates = [x[0][0] for x in results]
+        return [cls(cve)._find_packages(result) for cve, result in zip(cves, results)]
+
+    def _find_packages(self, prediction):
+        candidates = [x[0][0] for x in prediction]
 
         ecosystem = Config.get('ecosystem')
         if ecosystem == 'java':
@@ -43,3 +79,7 @@ class NvdToolkitPackageNameIdentifier(NaivePackageNameIdentifier):
         product = candidates
 
         return run_cpe2pkg(vendor, product)
+
+    def identify(self):
+        """Identify possible package name candidates."""
+        return self.identify_many([self._cve])[0]
@@ -0,0 +1,194 @@
+"""This module contains run metrics: per-stage timers and counters."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from cvejob.outputs.sink import atomic_write
+
+
+# upper bounds of latency histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class Timer(object):
+    """Summary of latencies of single stage."""
+
+    def __init__(self):
+        """Constructor."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # one extra bucket for everything above the last bound
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        """Record single latency."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def merge(self, data):
+        """Add latencies from given dict, as returned by to_dict()."""
+        self.count += data['count']
+        self.total += data['total']
+        self.max = max(self.max, data['max'])
+        self.buckets = [x + y for x, y in zip(self.buckets, data['buckets'])]
+
+    def to_dict(self):
+        """Get picklable, JSON-serializable form of the timer."""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else 0.0,
+            'buckets': list(self.buckets)
+        }
+
+
+class Metrics(object):
+    """Timers and counters of single run.
+
+    Worker processes collect their own metrics, which are shipped with results
+    and merged into the metrics of the main process.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def observe(self, name, seconds):
+        """Record single latency of given stage."""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = Timer()
+            timer.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Measure how long the wrapped block takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name, value=1):
+        """Increment given counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self, reset=False):
+        """Get picklable copy of all metrics.
+
+        :param reset: bool, whether to start from scratch afterwards
+        """
+        with self._lock:
+            data = {
+                'timers': {k: v.to_dict() for k, v in self._timers.items()},
+                'counters': dict(self._counters)
+            }
+            if reset:
+                self._timers = {}
+                self._counters = {}
+        return data
+
+    def merge(self, snapshot):
+        """Add metrics from given snapshot, e.g. from a worker process."""
+        with self._lock:
+            for name, data in snapshot['timers'].items():
+                self._timers.setdefault(name, Timer()).merge(data)
+            for name, value in snapshot['counters'].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    @staticmethod
+    def _write(path, data):
+        # the textfile collector must never see half-written file
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write(path, data.encode('utf-8'))
+
+    def get_hit_rates(self):
+        """Get hit rates of caches which count '<cache>.hit' and '<cache>.miss'."""
+        with self._lock:
+            counters = dict(self._counters)
+
+        rates = {}
+        for name, hits in counters.items():
+            if not name.endswith('.hit'):
+                continue
+            cache = name[:-len('.hit')]
+            total = hits + counters.get(cache + '.miss', 0)
+            rates[cache] = hits / total if total else 0.0
+        return rates
+
+    def summary(self):
+        """Get JSON-serializable summary of the run."""
+        data = self.snapshot()
+        data['hit_rates'] = self.get_hit_rates()
+        data['duration'] = time.time() - self._started
+        return data
+
+    def write_json(self, path):
+        """Write summary of the run to given path, as JSON."""
+        self._write(path, json.dumps(self.summary(), indent=2, sort_keys=True) + '\n')
+
+    def write_textfile(self, path, prefix='cvejob'):
+        """Write metrics in Prometheus text format, for node exporter's textfile collector."""
+        data = self.snapshot()
+        lines = []
+
+        name = '{p}_stage_seconds'.format(p=prefix)
+        lines.append('# HELP {n} Time spent in pipeline stages.'.format(n=name))
+        lines.append('# TYPE {n} histogram'.format(n=name))
+        for stage, timer in sorted(data['timers'].items()):
+            cumulative = 0
+            bounds = [str(x) for x in BUCKETS] + ['+Inf']
+            for bound, count in zip(bounds, timer['buckets']):
+                cumulative += count
+                lines.append('{n}_bucket{{stage="{s}",le="{b}"}} {c}'.format(
+                    n=name, s=stage, b=bound, c=cumulative
+                ))
+            lines.append('{n}_sum{{stage="{s}"}} {v}'.format(n=name, s=stage, v=timer['total']))
+            lines.append('{n}_count{{stage="{s}"}} {v}'.format(n=name, s=stage, v=timer['count']))
+
+        name = '{p}_events_total'.format(p=prefix)
+        lines.append('# HELP {n} Counted pipeline events.'.format(n=name))
+        lines.append('# TYPE {n} counter'.format(n=name))
+        for event, value in sorted(data['counters'].items()):
+            lines.append('{n}{{event="{e}"}} {v}'.format(n=name, e=event, v=value))
+
+        name = '{p}_cache_hit_ratio'.format(p=prefix)
+        lines.append('# HELP {n} Cache hit ratios.'.format(n=name))
+        lines.append('# TYPE {n} gauge'.format(n=name))
+        for cache, rate in sorted(self.get_hit_rates().items()):
+            lines.append('{n}{{cache="{c}"}} {v}'.format(n=name, c=cache, v=rate))
+
+        self._write(path, '\n'.join(lines) + '\n')
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Get metrics of this process."""
+    return _metrics
+
+
+def timed(name):
+    """Measure how long the wrapped block takes, in metrics of this process."""
+    return _metrics.timer(name)
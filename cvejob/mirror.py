@@ -0,0 +1,184 @@
+"""This module contains local mirror of upstream version metadata.
+
+The mirror is a SQLite database with versions of all packages from the package lists.
+It is filled in bulk by `scripts/sync_mirror.py`, and when `versions_backend` is set
+to 'mirror', all version lookups are served from it, without any network access.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cvejob.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class VersionMirror(object):
+    """Local store of package versions, keyed by ecosystem and package name."""
+
+    def __init__(self, path, readonly=False):
+        """Constructor.
+
+        :param readonly: bool, whether to open existing mirror for lookups only
+        """
+        self._path = path
+        self._lock = threading.Lock()
+
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError('Version mirror {p} does not exist'.format(p=path))
+            self._db = sqlite3.connect(
+                'file:{p}?mode=ro'.format(p=path), uri=True, check_same_thread=False
+            )
+            return
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS versions ('
+                'ecosystem TEXT, package TEXT, versions TEXT, validators TEXT, synced REAL, '
+                'PRIMARY KEY (ecosystem, package)) WITHOUT ROWID'
+            )
+
+    @property
+    def path(self):
+        """Get path to the mirror database."""
+        return self._path
+
+    def get(self, ecosystem, package):
+        """Get versions of given package.
+
+        :return: list, versions, or None if the package is not mirrored
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT versions FROM versions WHERE ecosystem = ? AND package = ?',
+                (ecosystem, package)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return row[0].split('\n') if row[0] else []
+
+    def get_validators(self, ecosystem):
+        """Get validators from the last sync of all packages of given ecosystem.
+
+        :return: dict, package -> validators
+        """
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT package, validators FROM versions WHERE ecosystem = ?', (ecosystem,)
+            ).fetchall()
+        return {package: json.loads(validators) for package, validators in rows if validators}
+
+    def put_many(self, ecosystem, items):
+        """Store versions of many packages at once.
+
+        :param items: iterable, (package, versions, validators) tuples; versions are None
+            if only the validators and sync time should be updated
+        :return: int, number of packages stored
+        """
+        now = time.time()
+        count = 0
+
+        with self._lock, self._db:
+            for package, versions, validators in items:
+                validators = json.dumps(validators) if validators else None
+                if versions is None:
+                    self._db.execute(
+                        'UPDATE versions SET validators = ?, synced = ? '
+                        'WHERE ecosystem = ? AND package = ?',
+                        (validators, now, ecosystem, package)
+                    )
+                else:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?)',
+                        (ecosystem, package, '\n'.join(sorted(versions)), validators, now)
+                    )
+                count += 1
+
+        return count
+
+    def count(self, ecosystem):
+        """Get number of mirrored packages of given ecosystem."""
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM versions WHERE ecosystem = ?', (ecosystem,)
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+
+def sync(mirror, ecosystem, packages, concurrency=8, batch_size=500, fetch=None):
+    """Fetch versions of given packages from the registry and store them in the mirror.
+
+    Packages which were synced before are revalidated with conditional requests,
+    so only changed version lists are downloaded again.
+
+    :param fetch: callable, fetch_versions()-like function, for testing
+    :return: dict, numbers of 'updated', 'unchanged' and 'failed' packages
+    """
+    if fetch is None:
+        from cvejob.versions import fetch_versions as fetch
+
+    validators = mirror.get_validators(ecosystem)
+    stats = {'updated': 0, 'unchanged': 0, 'failed': 0}
+
+    def lookup(package):
+        package_validators = validators.get(package)
+        # versions of unchanged URLs are merged with the changed ones
+        cached_versions = mirror.get(ecosystem, package) if package_validators else None
+        return package, fetch(ecosystem, package, validators=package_validators,
+                              cached_versions=cached_versions)
+
+    def store(batch):
+        items = []
+        for package, result in batch:
+            if result.not_modified:
+                stats['unchanged'] += 1
+                items.append((package, None, result.validators))
+            elif result.versions is None:
+                stats['failed'] += 1
+            else:
+                stats['updated'] += 1
+                items.append((package, result.versions, result.validators))
+        mirror.put_many(ecosystem, items)
+        logger.info('Synced {n} {e} packages'.format(n=sum(stats.values()), e=ecosystem))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        batch = []
+        for item in executor.map(lookup, packages):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                store(batch)
+                batch = []
+        store(batch)
+
+    return stats
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    """Get process-wide read-only version mirror."""
+    global _mirror
+
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = VersionMirror(Config.get('mirror_path'), readonly=True)
+
+    return _mirror
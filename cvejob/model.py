@@ -0,0 +1,75 @@
+"""This module contains compact model of CVE records, as used by all pipeline stages.
+
+Only the parts of NVD feed items which CVEjob actually reads are kept, in objects
+with `__slots__`, so that processing of large feeds doesn't allocate nested objects
+for configurations, impact and references that nobody looks at.
+"""
+
+import datetime
+
+from cvejob.cpes import extract_cpes, get_vendor_product_pairs
+
+
+def _parse_date(value):
+    """Parse NVD date, e.g. '2018-06-07T14:29Z'."""
+    if not value:
+        return None
+    return datetime.datetime.fromisoformat(value.rstrip('Z'))
+
+
+class CveRecord(object):
+    """Compact CVE record, built straight from NVD feed item."""
+
+    __slots__ = ('cve_id', 'description', 'references', 'last_modified_date', 'cvss_v2',
+                 'has_configurations', 'cpes')
+
+    def __init__(self, cve_id, description='', references=(), last_modified_date=None,
+                 cvss_v2=None, has_configurations=False, cpes=()):
+        """Constructor."""
+        self.cve_id = cve_id
+        self.description = description
+        self.references = references
+        self.last_modified_date = last_modified_date
+        self.cvss_v2 = cvss_v2
+        self.has_configurations = has_configurations
+        self.cpes = cpes
+
+    @classmethod
+    def from_dict(cls, cve_dict):
+        """Create CVE record from raw NVD feed item (element of `CVE_Items`)."""
+        cve = cve_dict['cve']
+
+        descriptions = cve.get('description', {}).get('description_data', [])
+        english = [x['value'] for x in descriptions if x.get('lang') == 'en']
+        description = (english or [x['value'] for x in descriptions] or [''])[0]
+
+        references = tuple(
+            x['url'] for x in cve.get('references', {}).get('reference_data', [])
+        )
+
+        cvss_v2 = cve_dict.get('impact', {}).get('baseMetricV2', {}).get(
+            'cvssV2', {}
+        ).get('baseScore')
+
+        nodes = (cve_dict.get('configurations') or {}).get('nodes') or []
+
+        return cls(
+            cve['CVE_data_meta']['ID'],
+            description=description,
+            references=references,
+            last_modified_date=_parse_date(cve_dict.get('lastModifiedDate')),
+            cvss_v2=cvss_v2,
+            has_configurations=bool(nodes),
+            cpes=extract_cpes(nodes)
+        )
+
+    def get_vendor_product_pairs(self):
+        """Get (vendor, product) pairs of all affected applications.
+
+        :return: set, (vendor, product) tuples
+        """
+        return get_vendor_product_pairs(self.cpes)
+
+    def __repr__(self):
+        """Get printable representation."""
+        return 'CveRecord({i!r})'.format(i=self.cve_id)
@@ -0,0 +1,108 @@
+"""This module contains buffered output sink which writes rendered records to disk."""
+
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def _get_hash(data):
+    return hashlib.sha256(data).digest()
+
+
+def is_identical(path, data):
+    """Check whether file on given path already has given content.
+
+    :param data: bytes, the content
+    """
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return _get_hash(f.read()) == _get_hash(data)
+    except OSError:
+        return False
+
+
+def atomic_write(path, data):
+    """Write given content to given path, atomically.
+
+    The content is written to a temporary file in the same directory first, and then
+    renamed, so readers never see truncated file.
+
+    :param data: bytes, the content
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix='.{f}.'.format(f=os.path.basename(path)), suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp() creates files readable only by the owner
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class BufferedOutputSink(object):
+    """Collect rendered records and write them to disk in batches.
+
+    Each output directory is created only once, files which already have the same content
+    are not touched at all and changed files are replaced atomically.
+    """
+
+    def __init__(self, buffer_size=100):
+        """Constructor."""
+        self._buffer_size = buffer_size
+        self._buffer = []
+        self._directories = set()
+        self.written = 0
+        self.skipped = 0
+
+    def add(self, path, data):
+        """Add rendered record which belongs to given path."""
+        self._buffer.append((path, data))
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered records."""
+        for path, data in self._buffer:
+            directory = os.path.dirname(path)
+            if directory and directory not in self._directories:
+                os.makedirs(directory, exist_ok=True)
+                self._directories.add(directory)
+
+            data = data.encode('utf-8')
+            if is_identical(path, data):
+                self.skipped += 1
+                continue
+
+            atomic_write(path, data)
+            self.written += 1
+
+        self._buffer = []
+
+    def close(self):
+        """Write all buffered records and report what was done."""
+        self.flush()
+        logger.info('{w} records written, {s} records unchanged'.format(
+            w=self.written, s=self.skipped
+        ))
+
+    def __enter__(self):
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write all buffered records, even if processing failed."""
+        self.close()
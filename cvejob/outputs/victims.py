@@ -2,6 +2,16 @@
 
 import os
 from cvejob.config import Config
+from cvejob.outputs.sink import atomic_write, is_identical
+
+
+def write_record(path, data):
+    """Write rendered record to given path, unless the file already has the same content."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    data = data.encode('utf-8')
+    if not is_identical(path, data):
+        atomic_write(path, data)
 
 
 class VictimsYamlOutput(object):
@@ -30,46 +40,43 @@ affected:
         self._candidates = candidates
 
         _, year, cid = self._cve.cve_id.split('-')
-        self._year_dir = 'database/{e}/{y}/'.format(
-            e=Config.get('ecosystem'),
-            y=year
-        )
+        self._year_dir = os.path.join(Config.get('output_dir'), Config.get('ecosystem'), year)
         self._cve_no = cid
         self._cve_id = '{y}-{n}'.format(y=year, n=cid)
 
-    def _makedirs(self):
-        # make sure the output directory exists
-        try:
-            os.makedirs(self._year_dir)
-        except FileExistsError:
-            pass
+    @property
+    def path(self):
+        """Get path to the output file."""
+        return os.path.join(self._year_dir, '{id}.yaml'.format(id=self._cve_no))
+
+    def render(self):
+        """Render VictimsDB YAML record.
+
+        :return: str, the record
+        """
+        refs = '    - '.join([x + '\n' for x in self._cve.references])
+        description = self._cve.description
+
+        others = []
+        for result in self._candidates:
+            other_str = "# " + result['score'] + ' ' + result['package']
+            others.append(other_str)
+
+        affected = self._get_affected_section()
+        cvss = self._cve.cvss_v2
+
+        return self.template.format(
+            cve_id=self._cve_id,
+            package_name=self._winner['package'],
+            cvss=cvss,
+            description=description,
+            refs=refs,
+            affected=affected,
+            others='\n'.join(others))
 
     def write(self):
         """Generate VictimsDB YAML file."""
-        self._makedirs()
-
-        with open(os.path.join(self._year_dir, '{id}.yaml'.format(id=self._cve_no)), 'w') as f:
-
-            refs = '    - '.join([x + '\n' for x in self._cve.references])
-            description = self._cve.description
-
-            others = []
-            for result in self._candidates:
-                other_str = "# " + result['score'] + ' ' + result['package']
-                others.append(other_str)
-
-            affected = self._get_affected_section()
-            cvss = self._cve.impact.baseMetricV2.cvssV2.baseScore
-
-            data = self.template.format(
-                cve_id=self._cve_id,
-                package_name=self._winner['package'],
-                cvss=cvss,
-                description=description,
-                refs=refs,
-                affected=affected,
-                others='\n'.join(others))
-            f.write(data)
+        write_record(self.path, self.render())
 
     def _get_affected_section(self):
         if Config.get('ecosystem') == 'java':
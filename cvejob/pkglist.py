@@ -0,0 +1,273 @@
+"""This module contains compact, memory-mapped format of package list files.
+
+Package list files (`data/<ecosystem>-packages`) are plain text with one
+`<ecosystem> <name>` per line. Their binary sidecar (`<pkgfile>.pkglist`) holds
+the same names, sorted, so that they can be looked up without loading the whole
+list. Being memory-mapped read-only, single copy of the file in the page cache
+is shared by all processes.
+
+Layout of the binary file:
+
+- magic bytes and length of the JSON header (little-endian uint32),
+- JSON header: source pkgfile's size and mtime, ecosystem, number of names
+  and positions of the sections below,
+- UTF-8 names, sorted, concatenated, with table of (count + 1) uint32 offsets,
+- normalized names (see normalize_name()), sorted, concatenated, with their own
+  offset table and table of uint32 positions of the original names.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left, bisect_right
+
+from cvejob.outputs.sink import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'CVEJPKG1'
+
+_uint32 = struct.Struct('<I')
+_separators_re = re.compile(r'[-_.]+')
+
+
+def normalize_name(name):
+    """Normalize package name, so that it matches regardless of case and separators.
+
+    PEP 503 style: lowercase, runs of '-', '_' and '.' replaced with single '-'.
+    """
+    return _separators_re.sub('-', name).lower()
+
+
+def get_package_list_path(pkgfile):
+    """Get path to the binary sidecar of given package list file."""
+    return pkgfile + '.pkglist'
+
+
+def _get_source_id(pkgfile):
+    stat = os.stat(pkgfile)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _pack_strings(strings):
+    blob = b''.join(strings)
+    offsets = [0]
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    return blob, struct.pack('<{n}I'.format(n=len(offsets)), *offsets)
+
+
+def write_package_list(path, names, ecosystem=None, source=None):
+    """Write binary package list with given names.
+
+    :param source: dict, identity of the text file the names come from
+    """
+    names = sorted({x.encode('utf-8') for x in names})
+    normalized = sorted(
+        (normalize_name(x.decode('utf-8')).encode('utf-8'), i) for i, x in enumerate(names)
+    )
+
+    names_blob, names_offsets = _pack_strings(names)
+    norm_blob, norm_offsets = _pack_strings([x for x, _ in normalized])
+    norm_ids = struct.pack('<{n}I'.format(n=len(normalized)), *[i for _, i in normalized])
+
+    sections = [names_blob, names_offsets, norm_blob, norm_offsets, norm_ids]
+    header = {
+        'source': source,
+        'ecosystem': ecosystem,
+        'count': len(names),
+        'sections': []
+    }
+
+    # positions depend on the header length, which depends on the positions
+    while True:
+        header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+        position = len(MAGIC) + _uint32.size + len(header_bytes)
+        positions = []
+        for section in sections:
+            # keep tables aligned
+            position += -position % 4
+            positions.append(position)
+            position += len(section)
+        if positions == header['sections']:
+            break
+        header['sections'] = positions
+
+    data = bytearray(MAGIC + _uint32.pack(len(header_bytes)) + header_bytes)
+    for position, section in zip(positions, sections):
+        data.extend(b'\0' * (position - len(data)))
+        data.extend(section)
+
+    atomic_write(path, bytes(data))
+
+
+def convert(pkgfile, path=None):
+    """Convert given text package list file to the binary format.
+
+    :return: str, path to the binary file
+    """
+    path = path or get_package_list_path(pkgfile)
+
+    ecosystems = set()
+    names = []
+    with open(pkgfile) as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) > 1:
+                ecosystems.add(parts[0])
+            names.append(parts[-1])
+
+    if len(ecosystems) > 1:
+        raise ValueError('{f} mixes several ecosystems: {e}'.format(
+            f=pkgfile, e=', '.join(sorted(ecosystems))
+        ))
+
+    ecosystem = ecosystems.pop() if ecosystems else None
+    write_package_list(path, names, ecosystem=ecosystem, source=_get_source_id(pkgfile))
+
+    logger.info('Converted {n} packages from {f}'.format(n=len(names), f=pkgfile))
+    return path
+
+
+class _Strings(object):
+    """Sorted strings stored in the mapped file, as a read-only sequence of bytes."""
+
+    def __init__(self, data, blob, offsets, count):
+        self._data = data
+        self._blob = blob
+        self._offsets = offsets
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        start = _uint32.unpack_from(self._data, self._offsets + 4 * i)[0]
+        end = _uint32.unpack_from(self._data, self._offsets + 4 * i + 4)[0]
+        return self._data[self._blob + start:self._blob + end]
+
+
+class PackageList(object):
+    """Read-only, memory-mapped binary package list.
+
+    Exact and prefix lookups are binary searches, O(log n), on the mapped file.
+    """
+
+    def __init__(self, path):
+        """Constructor."""
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._data[:len(MAGIC)] != MAGIC:
+            self._data.close()
+            raise ValueError('{p} is not a package list file'.format(p=path))
+
+        header_size = _uint32.unpack_from(self._data, len(MAGIC))[0]
+        start = len(MAGIC) + _uint32.size
+        self.header = json.loads(self._data[start:start + header_size].decode('utf-8'))
+
+        count = self.header['count']
+        names, names_offsets, norm, norm_offsets, norm_ids = self.header['sections']
+        self._names = _Strings(self._data, names, names_offsets, count)
+        self._normalized = _Strings(self._data, norm, norm_offsets, count)
+        self._norm_ids = norm_ids
+
+    @property
+    def ecosystem(self):
+        """Get ecosystem of the packages, or None if unknown."""
+        return self.header['ecosystem']
+
+    def __len__(self):
+        """Get number of packages."""
+        return len(self._names)
+
+    def __getitem__(self, i):
+        """Get i-th package name, in sorted order."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._names[i].decode('utf-8')
+
+    def __iter__(self):
+        """Iterate over all package names, in sorted order."""
+        for i in range(len(self)):
+            yield self._names[i].decode('utf-8')
+
+    def __contains__(self, name):
+        """Check whether given package name is in the list, exactly."""
+        return self.find(name) is not None
+
+    def find(self, name):
+        """Get position of given package name, or None."""
+        key = name.encode('utf-8')
+        i = bisect_left(self._names, key)
+        if i < len(self._names) and self._names[i] == key:
+            return i
+        return None
+
+    @staticmethod
+    def _prefix_range(strings, prefix):
+        key = prefix.encode('utf-8')
+        lo = bisect_left(strings, key)
+        # everything starting with the prefix sorts before prefix + highest byte
+        hi = bisect_left(strings, key + b'\xff', lo)
+        return lo, hi
+
+    def startswith(self, prefix, limit=None):
+        """Get package names which start with given prefix, in sorted order."""
+        lo, hi = self._prefix_range(self._names, prefix)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self._names[i].decode('utf-8') for i in range(lo, hi)]
+
+    def _original(self, i):
+        name_id = _uint32.unpack_from(self._data, self._norm_ids + 4 * i)[0]
+        return self._names[name_id].decode('utf-8')
+
+    def find_normalized(self, name):
+        """Get package names which are the same as given one, after normalization.
+
+        :return: list, e.g. ['Django', 'django'] for 'DJANGO'
+        """
+        key = normalize_name(name).encode('utf-8')
+        lo = bisect_left(self._normalized, key)
+        hi = bisect_right(self._normalized, key, lo)
+        return [self._original(i) for i in range(lo, hi)]
+
+    def startswith_normalized(self, prefix, limit=None):
+        """Get package names whose normalized form starts with normalized prefix."""
+        lo, hi = self._prefix_range(self._normalized, normalize_name(prefix))
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self._original(i) for i in range(lo, hi)]
+
+    def close(self):
+        """Unmap the file."""
+        self._data.close()
+
+
+def load_package_list(pkgfile, build=True):
+    """Load binary package list of given text package list file.
+
+    :param build: bool, whether to (re)build the binary file if missing or outdated
+    :return: PackageList, or None if not available and not built
+    """
+    path = get_package_list_path(pkgfile)
+    try:
+        package_list = PackageList(path)
+        if package_list.header.get('source') == _get_source_id(pkgfile):
+            return package_list
+        package_list.close()
+    except (OSError, ValueError):
+        pass
+
+    if not build:
+        return None
+
+    convert(pkgfile, path)
+    return PackageList(path)
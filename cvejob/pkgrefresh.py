@@ -0,0 +1,274 @@
+"""This module contains streaming, resumable refresher of package list files.
+
+Package names are downloaded from the ecosystem's index page by page and appended
+to `<pkgfile>.partial`. After every page, progress is checkpointed to
+`<pkgfile>.refresh.json`, so an interrupted refresh continues where it stopped.
+When all names are downloaded, the partial file atomically replaces the pkgfile.
+"""
+
+import abc
+import json
+import logging
+import os
+import re
+from html import unescape
+
+from cvejob.config import Config
+from cvejob.outputs.sink import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+_CHUNK_SIZE = 256 * 1024
+
+
+class NotModified(Exception):
+    """Package list has not changed since the last refresh."""
+
+
+class PackageSource(object, metaclass=abc.ABCMeta):
+    """Base class for all package name sources."""
+
+    ecosystem = None
+
+    def __init__(self, url):
+        """Constructor."""
+        self.url = url
+        # what identifies current version of the list, e.g. ETag; set by iter_pages()
+        self.fingerprint = None
+
+    @abc.abstractmethod
+    def iter_pages(self, session, cursor=None, fingerprint=None):
+        """Download package names, page by page.
+
+        :param cursor: cursor of the last downloaded page, to resume from
+        :param fingerprint: fingerprint of the list from the last complete refresh;
+            NotModified is raised if the list has not changed since then
+        :return: generator of (names, cursor) tuples
+        """
+
+
+class PyPISource(PackageSource):
+    """Package names from PyPI's simple index (PEP 503).
+
+    The HTML page is parsed incrementally, as it is being downloaded. Interrupted
+    downloads are resumed with range requests, as long as the page has not changed.
+    """
+
+    ecosystem = 'python'
+
+    _anchor_re = re.compile(r'<a\b[^>]*>([^<]*)</a\s*>', re.IGNORECASE)
+
+    def iter_pages(self, session, cursor=None, fingerprint=None):
+        """Download package names, chunk by chunk."""
+        headers = {'Accept': 'text/html'}
+        offset = 0
+        if cursor:
+            offset = cursor['offset']
+            headers['Range'] = 'bytes={o}-'.format(o=offset)
+            headers['If-Range'] = cursor['etag']
+        elif fingerprint:
+            headers['If-None-Match'] = fingerprint
+
+        with session.get(self.url, headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                raise NotModified(self.url)
+            if response.status_code == 200 and offset:
+                # the page has changed, or ranges are not supported
+                raise ValueError('{url} cannot be resumed'.format(url=self.url))
+            response.raise_for_status()
+
+            self.fingerprint = response.headers.get('ETag') or (cursor or {}).get('etag')
+
+            buffer = b''
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                buffer += chunk
+                text = buffer.decode('utf-8', errors='ignore')
+
+                names = []
+                consumed = 0
+                for match in self._anchor_re.finditer(text):
+                    names.append(unescape(match.group(1)).strip())
+                    consumed = match.end()
+
+                # keep the incomplete tail for the next chunk
+                consumed_bytes = len(text[:consumed].encode('utf-8'))
+                buffer = buffer[consumed_bytes:]
+                offset += consumed_bytes
+
+                if names:
+                    yield names, {'offset': offset, 'etag': self.fingerprint}
+
+
+class NpmSource(PackageSource):
+    """Package names from npm registry's CouchDB replica (`_all_docs`), in pages."""
+
+    ecosystem = 'javascript'
+
+    def __init__(self, url, page_size=10000):
+        """Constructor."""
+        super().__init__(url.rstrip('/'))
+        self._page_size = page_size
+
+    def iter_pages(self, session, cursor=None, fingerprint=None):
+        """Download package names, page by page."""
+        if not cursor:
+            # sequence number of the last change in the registry
+            response = session.get(self.url + '/')
+            response.raise_for_status()
+            self.fingerprint = str(response.json().get('update_seq'))
+            if fingerprint and self.fingerprint == fingerprint:
+                raise NotModified(self.url)
+        else:
+            self.fingerprint = cursor['fingerprint']
+
+        last_key = (cursor or {}).get('last_key')
+        while True:
+            params = {'limit': self._page_size}
+            if last_key is not None:
+                params['startkey'] = json.dumps(last_key)
+                params['skip'] = 1
+
+            response = session.get(self.url + '/_all_docs', params=params)
+            response.raise_for_status()
+
+            rows = response.json().get('rows', [])
+            names = [row['id'] for row in rows if not row['id'].startswith('_design/')]
+            if not rows:
+                return
+
+            last_key = rows[-1]['key']
+            yield names, {'last_key': last_key, 'fingerprint': self.fingerprint}
+
+            if len(rows) < self._page_size:
+                return
+
+
+class MavenSource(PackageSource):
+    """groupId:artifactId names from Maven Central's search API, in pages."""
+
+    ecosystem = 'java'
+
+    def __init__(self, url, page_size=200):
+        """Constructor."""
+        super().__init__(url)
+        self._page_size = page_size
+
+    def iter_pages(self, session, cursor=None, fingerprint=None):
+        """Download package names, page by page."""
+        start = (cursor or {}).get('start', 0)
+        self.fingerprint = None
+
+        while True:
+            response = session.get(self.url, params={
+                'q': '*:*', 'rows': self._page_size, 'start': start, 'wt': 'json'
+            })
+            response.raise_for_status()
+
+            result = response.json()['response']
+            docs = result.get('docs', [])
+            if not docs:
+                return
+
+            start += len(docs)
+            yield ['{g}:{a}'.format(g=x['g'], a=x['a']) for x in docs], {'start': start}
+
+            if start >= result.get('numFound', 0):
+                return
+
+
+def get_source(ecosystem):
+    """Get package name source for given ecosystem, as configured."""
+    if ecosystem == 'python':
+        return PyPISource(Config.get('pypi_simple_url'))
+    elif ecosystem == 'javascript':
+        return NpmSource(Config.get('npm_replicate_url'))
+    elif ecosystem == 'java':
+        return MavenSource(Config.get('maven_search_url'))
+    else:
+        raise ValueError('Unsupported ecosystem {e}'.format(e=ecosystem))
+
+
+class PackageListRefresher(object):
+    """Refresh package list file from given source."""
+
+    def __init__(self, source, pkgfile, session=None):
+        """Constructor."""
+        self._source = source
+        self._pkgfile = pkgfile
+        self._partial_path = pkgfile + '.partial'
+        self._state_path = pkgfile + '.refresh.json'
+        self._session = session
+
+    def _load_state(self):
+        try:
+            with open(self._state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        atomic_write(self._state_path, json.dumps(state).encode('utf-8'))
+
+    def refresh(self):
+        """Refresh the package list file.
+
+        :return: int, number of package names in the new file, or None if unchanged
+        """
+        if self._session is None:
+            from cvejob.versions import get_session
+
+            self._session = get_session()
+
+        state = self._load_state()
+        cursor = state.get('cursor')
+        if cursor is not None and not os.path.exists(self._partial_path):
+            cursor = None
+
+        fingerprint = state.get('fingerprint') if os.path.exists(self._pkgfile) else None
+
+        try:
+            count = self._download(cursor, state, fingerprint)
+        except NotModified:
+            logger.info('{f} is up to date'.format(f=self._pkgfile))
+            return None
+        except ValueError:
+            if cursor is None:
+                raise
+            logger.warning('Unable to resume refresh of {f}, starting over'.format(
+                f=self._pkgfile
+            ))
+            count = self._download(None, state, fingerprint)
+
+        os.replace(self._partial_path, self._pkgfile)
+        self._save_state({'fingerprint': self._source.fingerprint, 'count': count})
+
+        logger.info('Refreshed {f}: {n} packages'.format(f=self._pkgfile, n=count))
+        return count
+
+    def _download(self, cursor, state, fingerprint):
+        if cursor is None:
+            size, count = 0, 0
+        else:
+            size, count = state['size'], state['count']
+            logger.info('Resuming refresh of {f} after {n} packages'.format(
+                f=self._pkgfile, n=count
+            ))
+
+        with open(self._partial_path, 'ab') as f:
+            # drop whatever was written after the last checkpoint
+            f.truncate(size)
+
+            pages = self._source.iter_pages(self._session, cursor=cursor, fingerprint=fingerprint)
+            for names, cursor in pages:
+                f.write(''.join(
+                    '{e} {n}\n'.format(e=self._source.ecosystem, n=x) for x in names if x
+                ).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+                count += len([x for x in names if x])
+                self._save_state({'cursor': cursor, 'size': f.tell(), 'count': count,
+                                  'fingerprint': fingerprint})
+
+        return count
@@ -1,13 +1,106 @@
 """This module contains default package name selector."""
 
-from cpe import CPE
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from cvejob.cache import LruCache
 from cvejob.config import Config
-from cvejob.utils import (
-    get_java_versions,
-    get_javascript_versions,
-    get_python_versions
-)
+from cvejob.cpes import get_versions as get_cpe_versions
+from cvejob.metrics import get_metrics
+from cvejob.versions import get_versions
+
+
+class UpstreamVersions(object):
+    """Upstream versions of a package, indexed for matching versions from CVE records.
+
+    Upstream versions sometime contain suffixes like '.Final', '.RELEASE', etc.,
+    but those are ignored by NVD. Every upstream version is therefore also indexed
+    under all its prefixes which are followed by a non-numeric suffix (after optional
+    '.', '-' or '_' separators), e.g. '2.9.8' -> {'2.9.8.Final', '2.9.8.RELEASE'}.
+    """
+
+    def __init__(self, versions):
+        """Constructor."""
+        self._versions = set(versions)
+        self._prefixes = {}
+
+        for version in self._versions:
+            for i in range(1, len(version)):
+                version_suffix = version[i:].lstrip('.-_')
+                if version_suffix and not version_suffix[0].isdigit():
+                    self._prefixes.setdefault(version[:i], set()).add(version)
+
+    def find(self, cpe_version):
+        """Find upstream versions matching given version from a CVE record.
+
+        :return: set, matching upstream versions
+        """
+        result = set(self._prefixes.get(cpe_version, ()))
+        if cpe_version in self._versions:
+            # exact match, great!
+            result.add(cpe_version)
+        return result
+
+    def matches(self, cpe_versions):
+        """Check if at least one of given versions from a CVE record exists upstream."""
+        if not self._versions.isdisjoint(cpe_versions):
+            return True
+        return any(x in self._prefixes for x in cpe_versions)
+
+
+class UpstreamVersionsCache(object):
+    """In-memory LRU cache of UpstreamVersions indexes, by ecosystem and package.
+
+    The same candidates come up for many CVEs, so their indexes are built only once,
+    and rebuilt only when the package's versions change.
+    """
+
+    def __init__(self, max_size=1024):
+        """Constructor."""
+        self._memory = LruCache(max_size)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ecosystem, package, versions):
+        """Get index of given upstream versions of given package.
+
+        :param versions: list, current upstream versions of the package
+        :return: UpstreamVersions
+        """
+        key = (ecosystem, package)
+
+        cached = self._memory.get(key)
+
+        # version cache hands out the same list object until the versions change
+        if cached is not None and (cached[0] is versions or cached[0] == versions):
+            self.hits += 1
+            get_metrics().incr('cache.upstream_versions.hit')
+            return cached[1]
+
+        self.misses += 1
+        get_metrics().incr('cache.upstream_versions.miss')
+        index = UpstreamVersions(versions)
+
+        self._memory.put(key, (versions, index))
+        return index
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_upstream_versions(ecosystem, package):
+    """Get index of upstream versions of given package, built once per process.
+
+    :return: UpstreamVersions
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = UpstreamVersionsCache(max_size=Config.get('version_cache_size'))
+
+    return _cache.get(ecosystem, package, get_versions(ecosystem, package))
 
 
 class VersionExistsSelector(object):
@@ -23,76 +116,60 @@ class VersionExistsSelector(object):
 
         Or no winner, if all candidates fail the version check.
         """
-        cpe_dicts = self._get_cpe_dicts(self._cve.configurations)
+        cpe_dicts = self._get_cpe_dicts(self._cve)
         cpe_versions = self._get_cpe_versions(cpe_dicts)
 
-        if cpe_versions:
-            hit = False
-            for candidate in self._candidates:
-                package = candidate['package']
-
-                # check if at least one version mentioned in the CVE exists
-                # for given package name; if not, this is a false positive
-                upstream_versions = self._get_upstream_versions(package)
-
-                if cpe_versions & set(upstream_versions):
-                    # exact match, great!
-                    hit = True
-                else:
-                    # upstream versions sometime contain suffixes like '.Final', '.RELEASE', etc.,
-                    # but those are ignored by NVD. try to detect such cases here.
-                    # TODO: refactoring needed
-                    for cpe_version in cpe_versions:
-                        for upstream_version in upstream_versions:
-                            if upstream_version.startswith(cpe_version):
-                                if len(upstream_version) > len(cpe_version):
-                                    version_suffix = upstream_version[len(cpe_version):]
-                                    version_suffix = version_suffix.lstrip('.-_')
-                                    if version_suffix and not version_suffix[0].isdigit():
-                                        hit = True
-                                        break
-
-                if hit:
+        if not cpe_versions:
+            return None
+
+        concurrency = Config.get('selector_concurrency')
+        if concurrency > 1 and len(self._candidates) > 1:
+            return self._pick_winner_concurrently(cpe_versions, concurrency)
+
+        for candidate in self._candidates:
+            upstream_versions = self._get_upstream_versions(candidate['package'])
+            if self._versions_match(cpe_versions, upstream_versions):
+                return candidate
+
+        return None
+
+    def _pick_winner_concurrently(self, cpe_versions, concurrency):
+        """Pick single winner, prefetching upstream versions of all candidates concurrently.
+
+        Candidates are still evaluated in score order, so the winner is the same
+        as when picked serially.
+        """
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = [
+                executor.submit(self._get_upstream_versions, candidate['package'])
+                for candidate in self._candidates
+            ]
+
+            for candidate, future in zip(self._candidates, futures):
+                if self._versions_match(cpe_versions, future.result()):
                     return candidate
+        finally:
+            # lookups for lower-ranked candidates are not needed anymore
+            executor.shutdown(wait=False, cancel_futures=True)
 
-    def _get_upstream_versions(self, package):
-        if Config.get('ecosystem') == 'java':
-            return get_java_versions(package)
-        elif Config.get('ecosystem') == 'python':
-            return get_python_versions(package)
-        elif Config.get('ecosystem') == 'javascript':
-            return get_javascript_versions(package)
-        else:
-            raise ValueError('Unsupported ecosystem {e}'.format(e=Config.get('ecosystem')))
+        return None
 
-    def _get_cpe_dicts(self, nodes):
+    @staticmethod
+    def _versions_match(cpe_versions, upstream_versions):
+        """Check if at least one version mentioned in the CVE exists upstream.
 
-        cpe_dicts = []
+        If not, the package name candidate is a false positive.
 
-        for node in nodes:
-            if node.children:
-                cpe_dicts.append(self._get_cpe_dicts(node.children))
+        :param upstream_versions: UpstreamVersions
+        """
+        return upstream_versions.matches(cpe_versions)
 
-            for cpe in node.cpe:
-                if cpe.is_application():
-                    cpe_dicts.append(cpe)
+    def _get_upstream_versions(self, package):
+        return get_upstream_versions(Config.get('ecosystem'), package)
 
-        return cpe_dicts
+    def _get_cpe_dicts(self, cve):
+        return list(cve.cpes)
 
     def _get_cpe_versions(self, cpe_dicts):
-        cpe_versions = set()
-        for cpe in cpe_dicts:
-            if cpe.versionStartIncluding is not None:
-                cpe_versions.add(cpe.versionStartIncluding)
-            if cpe.versionStartExcluding is not None:
-                cpe_versions.add(cpe.versionStartExcluding)
-            if cpe.versionEndIncluding is not None:
-                cpe_versions.add(cpe.versionEndIncluding)
-            if cpe.versionEndExcluding is not None:
-                cpe_versions.add(cpe.versionEndExcluding)
-
-            uri_version = CPE(cpe.cpe22Uri).get_version()
-            if uri_version:
-                cpe_versions.add(uri_version[0])
-
-        return cpe_versions
+        return get_cpe_versions(cpe_dicts)
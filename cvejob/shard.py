@@ -0,0 +1,147 @@
+"""This module contains sharding of runs, so that large backfills can be split across machines.
+
+Shard `i/N` processes only CVEs whose stable hash of ID falls into the i-th of N
+buckets. Every shard writes its outputs, run-state and metrics to its own paths,
+and `scripts/merge_shards.py` then combines them.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import namedtuple
+
+from cvejob.config import Config
+from cvejob.metrics import Metrics
+from cvejob.outputs.sink import atomic_write, is_identical
+
+logger = logging.getLogger(__name__)
+
+
+Shard = namedtuple('Shard', ['index', 'count'])
+
+_shard_re = re.compile(r'^\s*(\d+)\s*/\s*(\d+)\s*$')
+
+# configuration options with paths which every shard needs for itself
+SHARDED_PATHS = ('output_dir', 'state_path', 'metrics_path', 'metrics_textfile')
+
+
+def parse_shard(value):
+    """Parse shard specification, e.g. '2/4' for the second of four shards.
+
+    :return: Shard, or None if the value is empty
+    """
+    if not value:
+        return None
+
+    match = _shard_re.match(value)
+    if not match:
+        raise ValueError('Invalid shard {s}, expected i/N'.format(s=value))
+
+    shard = Shard(int(match.group(1)), int(match.group(2)))
+    if not 1 <= shard.index <= shard.count:
+        raise ValueError('Invalid shard {s}, i must be between 1 and N'.format(s=value))
+
+    return shard
+
+
+def get_shard():
+    """Get shard this run processes, as configured.
+
+    :return: Shard, or None if the run is not sharded
+    """
+    return parse_shard(Config.get('shard'))
+
+
+def in_shard(cve_id, shard):
+    """Check whether given CVE belongs to given shard.
+
+    The hash doesn't depend on the process or platform, so CVEs always land in the same shard.
+    """
+    digest = hashlib.sha1(cve_id.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard.count == shard.index - 1
+
+
+def get_shard_path(path, shard):
+    """Get variant of given file or directory path for given shard.
+
+    E.g. 'database/' -> 'database-shard-2-of-4/', 'state.sqlite' -> 'state-shard-2-of-4.sqlite'.
+    """
+    suffix = '-shard-{i}-of-{n}'.format(i=shard.index, n=shard.count)
+
+    if path.endswith(('/', os.sep)):
+        return path.rstrip('/' + os.sep) + suffix + path[-1]
+
+    root, ext = os.path.splitext(path)
+    return root + suffix + ext
+
+
+def get_shard_config(shard):
+    """Get per-shard values of path configuration options.
+
+    :return: dict, option -> path, for Config.override()
+    """
+    return {
+        name: get_shard_path(Config.get(name), shard)
+        for name in SHARDED_PATHS if Config.get(name)
+    }
+
+
+def merge_outputs(sources, target):
+    """Merge output trees of several shards into one.
+
+    Files which are already in the target tree with the same content are not touched.
+
+    :return: dict, numbers of 'written' and 'unchanged' files
+    """
+    stats = {'written': 0, 'unchanged': 0}
+    seen = {}
+
+    for source in sources:
+        for directory, _, files in os.walk(source):
+            for name in sorted(files):
+                path = os.path.join(directory, name)
+                relpath = os.path.relpath(path, source)
+
+                if relpath in seen:
+                    logger.warning('{p} is in both {a} and {b}, using the latter'.format(
+                        p=relpath, a=seen[relpath], b=source
+                    ))
+                seen[relpath] = source
+
+                with open(path, 'rb') as f:
+                    data = f.read()
+
+                target_path = os.path.join(target, relpath)
+                if is_identical(target_path, data):
+                    stats['unchanged'] += 1
+                    continue
+
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                atomic_write(target_path, data)
+                stats['written'] += 1
+
+    return stats
+
+
+def merge_metrics(paths):
+    """Merge metrics (as written by Metrics.write_json()) of several shards.
+
+    :return: tuple, (Metrics, dict summary of the whole run)
+    """
+    metrics = Metrics()
+    durations = []
+
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        metrics.merge(data)
+        durations.append(data.get('duration', 0.0))
+
+    summary = metrics.summary()
+    # shards run side by side, the run took as long as the slowest of them
+    summary['duration'] = max(durations, default=0.0)
+    summary['shards'] = len(paths)
+
+    return metrics, summary
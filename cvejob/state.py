@@ -0,0 +1,139 @@
+"""This module contains run-state store, which makes incremental runs possible."""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from cvejob.config import Config
+from cvejob.cpe2pkg import get_pkgfile
+
+
+# parts of NVD feed items which can influence the outcome
+_RELEVANT_FIELDS = ('cve', 'configurations', 'impact')
+
+
+def get_cve_id(cve_dict):
+    """Get CVE ID from raw NVD feed item."""
+    return cve_dict['cve']['CVE_data_meta']['ID']
+
+
+def get_content_hash(cve_dict):
+    """Get hash of the parts of raw NVD feed item that matter to CVEjob."""
+    relevant = {x: cve_dict.get(x) for x in _RELEVANT_FIELDS}
+    data = json.dumps(relevant, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def get_config_hash(ecosystem):
+    """Get hash of the configuration that influences results for given ecosystem."""
+    pkgfile = get_pkgfile(ecosystem)
+    try:
+        stat = os.stat(pkgfile)
+        pkgfile_id = [stat.st_size, stat.st_mtime]
+    except OSError:
+        pkgfile_id = None
+
+    relevant = {
+        'ecosystem': ecosystem,
+        'use_nvdtoolkit': Config.get('use_nvdtoolkit'),
+        'cpe2pkg_backend': Config.get('cpe2pkg_backend'),
+        'pkgfile': pkgfile_id
+    }
+    data = json.dumps(relevant, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class RunState(object):
+    """Outcomes of previous runs for single ecosystem, stored in SQLite database.
+
+    CVEs whose NVD record and relevant configuration haven't changed since they were
+    last processed don't need to be processed again.
+    """
+
+    def __init__(self, path, ecosystem, db=None):
+        """Constructor.
+
+        :param db: sqlite3.Connection, already open database to share, see for_ecosystem()
+        """
+        self._path = path
+        self._ecosystem = ecosystem
+        self._config_hash = get_config_hash(ecosystem)
+        self._owns_db = db is None
+
+        if db is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            db = sqlite3.connect(path)
+            with db:
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS state ('
+                    'cve_id TEXT, ecosystem TEXT, last_modified TEXT, content_hash TEXT, '
+                    'config_hash TEXT, verdict TEXT, winner TEXT, '
+                    'PRIMARY KEY (cve_id, ecosystem))'
+                )
+        self._db = db
+
+        # load everything up front, so that lookups are just dict lookups
+        rows = self._db.execute(
+            'SELECT cve_id, last_modified, content_hash, config_hash FROM state '
+            'WHERE ecosystem = ?', (ecosystem,)
+        )
+        self._known = {row[0]: tuple(row[1:]) for row in rows}
+
+    def for_ecosystem(self, ecosystem):
+        """Get run state of another ecosystem, stored in the same database.
+
+        Both states share single connection, so that their uncommitted outcomes
+        don't lock each other out. The database is closed when this state is closed.
+        """
+        return RunState(self._path, ecosystem, db=self._db)
+
+    def _get_fingerprint(self, cve_dict):
+        return (
+            cve_dict.get('lastModifiedDate'),
+            get_content_hash(cve_dict),
+            self._config_hash
+        )
+
+    def is_unchanged(self, cve_dict):
+        """Check whether given NVD feed item was already processed in its current form."""
+        known = self._known.get(get_cve_id(cve_dict))
+        if known is None or known[0] != cve_dict.get('lastModifiedDate'):
+            return False
+        return known == self._get_fingerprint(cve_dict)
+
+    def record(self, cve_dict, verdict, winner=None):
+        """Remember outcome of processing given NVD feed item."""
+        cve_id = get_cve_id(cve_dict)
+        fingerprint = self._get_fingerprint(cve_dict)
+
+        self._db.execute(
+            'INSERT OR REPLACE INTO state (cve_id, ecosystem, last_modified, content_hash, '
+            'config_hash, verdict, winner) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (cve_id, self._ecosystem) + fingerprint + (verdict, winner)
+        )
+        self._known[cve_id] = fingerprint
+
+    def commit(self):
+        """Make recorded outcomes persistent.
+
+        Outcomes are not committed one by one, so that a CVE is never marked
+        as processed before its output is safely on disk.
+        """
+        self._db.commit()
+
+    def get_outcome(self, cve_id):
+        """Get recorded (verdict, winner) for given CVE, or None."""
+        return self._db.execute(
+            'SELECT verdict, winner FROM state WHERE cve_id = ? AND ecosystem = ?',
+            (cve_id, self._ecosystem)
+        ).fetchone()
+
+    def close(self):
+        """Commit recorded outcomes and close the database, if this state opened it."""
+        if self._owns_db:
+            self.commit()
+            self._db.close()
@@ -0,0 +1,109 @@
+"""This module contains text analysis helpers shared by checks and identifiers.
+
+NLTK resources are loaded once per process and tokenization results are memoized,
+so that the same description is not tokenized again by every stage.
+NLTK itself is imported only when it is really needed, as it is slow to import.
+"""
+
+import functools
+import re
+
+
+# NLTK data needed at runtime
+REQUIRED_RESOURCES = ('corpora/stopwords', 'tokenizers/punkt_tab')
+
+# NLTK before 3.8.2 loads pickled punkt models, instead of punkt_tab
+_LEGACY_RESOURCES = {'tokenizers/punkt_tab': 'tokenizers/punkt'}
+
+_capitalized_word_re = re.compile('[A-Z][A-Za-z0-9-:]*')
+
+
+class MissingResourceError(Exception):
+    """Required NLTK data are not available."""
+
+
+def get_required_resources(nltk_version):
+    """Get NLTK data which given version of NLTK loads at runtime.
+
+    :return: tuple, resource names
+    """
+    version = tuple(int(x) for x in re.findall(r'\d+', nltk_version)[:3])
+    if version < (3, 8, 2):
+        return tuple(_LEGACY_RESOURCES.get(x, x) for x in REQUIRED_RESOURCES)
+    return REQUIRED_RESOURCES
+
+
+def check_resources():
+    """Make sure that all NLTK data the installed NLTK needs are available.
+
+    Data are never downloaded in the middle of a run; fail early instead.
+    """
+    import nltk
+
+    missing = []
+    for resource in get_required_resources(nltk.__version__):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(resource)
+
+    if missing:
+        raise MissingResourceError(
+            'Missing NLTK data, install them with: python -m nltk.downloader {r}'.format(
+                r=' '.join(x.split('/')[-1] for x in missing)
+            )
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_stopwords():
+    """Get English stop words.
+
+    :return: frozenset, stop words
+    """
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words('english'))
+
+
+@functools.lru_cache(maxsize=1024)
+def sent_tokenize(text):
+    """Split given text into sentences.
+
+    :return: tuple, sentences
+    """
+    import nltk
+
+    return tuple(nltk.sent_tokenize(text))
+
+
+@functools.lru_cache(maxsize=1024)
+def word_tokenize(text):
+    """Split given text into words.
+
+    :return: tuple, words
+    """
+    import nltk
+
+    return tuple(nltk.word_tokenize(text))
+
+
+def find_capitalized_words(text):
+    """Find all words starting with uppercase letter in given text."""
+    return _capitalized_word_re.findall(text)
+
+
+def warm_up():
+    """Load all NLTK data now, so that the first CVE is not slower.
+
+    Tokenizers are really run, so this fails early even if NLTK looks
+    for different data than `check_resources()` expects.
+    """
+    check_resources()
+    get_stopwords()
+    try:
+        sent_tokenize('Warm up.')
+        word_tokenize('Warm up.')
+    except LookupError as e:
+        # NLTK's message says which data it looked for, and how to install them
+        raise MissingResourceError(str(e))
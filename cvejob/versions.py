@@ -0,0 +1,300 @@
+"""This module contains upstream version lookups, for all supported ecosystems."""
+
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from cvejob.cache import DiskCache, LruCache
+from cvejob.config import Config
+from cvejob.metrics import get_metrics, timed
+
+logger = logging.getLogger(__name__)
+
+
+# not_found is set if the package doesn't exist in the registry
+FetchResult = namedtuple('FetchResult', ['versions', 'validators', 'not_modified', 'not_found'],
+                         defaults=(False,))
+
+
+def _get_urls(ecosystem, package):
+    if ecosystem == 'python':
+        return ['{url}/{pkg_name}/json'.format(url=Config.get('pypi_url'), pkg_name=package)]
+    elif ecosystem == 'javascript':
+        return ['{url}/{pkg_name}'.format(url=Config.get('npm_url'), pkg_name=package)]
+    elif ecosystem == 'java':
+        g, a = package.split(':')
+        g = g.replace('.', '/')
+        return [
+            '{url}/{g}/{a}/{f}'.format(url=Config.get('maven_url'), g=g, a=a, f=filename)
+            for filename in ('maven-metadata.xml', 'maven-metadata-local.xml')
+        ]
+    else:
+        raise ValueError('Unsupported ecosystem {e}'.format(e=ecosystem))
+
+
+def _parse_versions(ecosystem, response):
+    if ecosystem == 'python':
+        return set(response.json().get('releases', {}))
+    elif ecosystem == 'javascript':
+        return set(response.json().get('versions') or {})
+    else:
+        from lxml import etree
+
+        metadata_xml = etree.fromstring(response.content)
+        return {x.text for x in metadata_xml.findall('.//version')}
+
+
+def _get_validators(response):
+    validators = {}
+    if response.headers.get('ETag'):
+        validators['etag'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['last_modified'] = response.headers['Last-Modified']
+    return validators
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Get HTTP session shared by all registry lookups in this process."""
+    global _session
+
+    # requests are slow to import, and not needed by all runs
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=16)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+
+    return _session
+
+
+def fetch_versions(ecosystem, package, validators=None, session=None, cached_versions=None):
+    """Fetch all versions of given package from the ecosystem's registry.
+
+    :param validators: dict, URL -> {'etag', 'last_modified'} from previous fetch,
+        to make conditional requests
+    :param cached_versions: list, versions from previous fetch; merged in for URLs
+        which were not modified, when some other URL was
+    :return: FetchResult; versions is None if the lookup failed or nothing was modified
+    """
+    import requests
+
+    session = session or get_session()
+    validators = validators or {}
+
+    urls = _get_urls(ecosystem, package)
+    versions = set()
+    new_validators = {}
+    ok = False
+    not_modified = True
+    missing = 0
+
+    for url in urls:
+        headers = {}
+        url_validators = validators.get(url, {})
+        if 'etag' in url_validators:
+            headers['If-None-Match'] = url_validators['etag']
+        if 'last_modified' in url_validators:
+            headers['If-Modified-Since'] = url_validators['last_modified']
+
+        try:
+            with timed('registry.' + ecosystem):
+                response = session.get(url, headers=headers)
+        except requests.RequestException as e:
+            logger.warning('Unable to fetch {url}: {e}'.format(url=url, e=e))
+            continue
+
+        if response.status_code == 304:
+            ok = True
+            versions.update(cached_versions or ())
+            new_validators[url] = url_validators
+            continue
+
+        if response.status_code == 404:
+            # Maven: not both XML files have to exist, so don't freak out yet
+            missing += 1
+            continue
+
+        if response.status_code != 200:
+            continue
+
+        ok = True
+        not_modified = False
+        versions |= _parse_versions(ecosystem, response)
+        new_validators[url] = _get_validators(response)
+
+    if missing == len(urls):
+        logger.info('Package {pkg_name} does not exist'.format(pkg_name=package))
+        return FetchResult(None, {}, False, not_found=True)
+
+    if not ok:
+        logger.error('Unable to obtain a list of versions for {pkg_name}'.format(pkg_name=package))
+        return FetchResult(None, {}, False)
+
+    if not_modified:
+        return FetchResult(None, new_validators, True)
+
+    return FetchResult(sorted(versions), new_validators, False)
+
+
+class VersionCache(object):
+    """Cache of upstream versions.
+
+    Recently used entries are kept in memory, all of them in a persistent store keyed
+    by ecosystem and package name. Stale entries are revalidated with conditional requests
+    (ETag/Last-Modified), so unchanged version lists are not downloaded again.
+    Packages which don't exist are remembered too, for shorter time.
+    """
+
+    def __init__(self, disk=None, ttl=24 * 3600, negative_ttl=3600, max_size=1024, session=None):
+        """Constructor.
+
+        :param disk: DiskCache, persistent store, or None to cache in memory only
+        :param ttl: int, number of seconds after which entries need to be revalidated
+        :param negative_ttl: int, number of seconds after which packages which didn't exist
+            are looked up again
+        """
+        self._disk = disk or DiskCache(None, table='versions')
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._session = session
+        self._memory = LruCache(max_size)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(ecosystem, package):
+        return '{e}:{p}'.format(e=ecosystem, p=package)
+
+    def _remember(self, key, versions, timestamp):
+        self._memory.put(key, (versions, timestamp))
+
+    def _is_fresh(self, versions, timestamp):
+        ttl = self._ttl if versions else self._negative_ttl
+        return time.time() - timestamp <= ttl
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        get_metrics().incr('cache.versions.hit' if hit else 'cache.versions.miss')
+
+    def get(self, ecosystem, package):
+        """Get all versions of given package.
+
+        :return: list, versions; empty if the package doesn't exist or the lookup failed
+        """
+        key = self._key(ecosystem, package)
+
+        cached = self._memory.get(key)
+        if cached is not None and self._is_fresh(*cached):
+            self._count(hit=True)
+            return cached[0]
+
+        entry = self._disk.get(key)
+        if entry is not None and self._is_fresh(entry.value, entry.timestamp):
+            self._count(hit=True)
+            self._remember(key, entry.value, entry.timestamp)
+            return entry.value
+
+        self._count(hit=False)
+        result = fetch_versions(
+            ecosystem, package,
+            validators=entry.meta if entry is not None else None,
+            session=self._session,
+            cached_versions=entry.value if entry is not None else None
+        )
+
+        if result.not_modified and entry is not None:
+            versions = entry.value
+        elif result.versions is not None:
+            versions = result.versions
+        elif result.not_found:
+            versions = []
+        elif entry is not None:
+            # the registry is not available, stale data is better than no data
+            return entry.value
+        else:
+            return []
+
+        self.put(ecosystem, package, versions, validators=result.validators)
+        return versions
+
+    def put(self, ecosystem, package, versions, validators=None):
+        """Store versions of given package."""
+        key = self._key(ecosystem, package)
+        timestamp = time.time()
+        versions = sorted(versions)
+
+        self._disk.set(key, versions, meta=validators, timestamp=timestamp)
+        self._remember(key, versions, timestamp)
+
+    def prewarm(self, ecosystem, packages, versions=None):
+        """Fill the cache with versions of given packages.
+
+        :param versions: dict, package -> versions; if given, packages are stored
+            as they are, without any network access
+        :return: int, number of packages stored
+        """
+        count = 0
+        for package in packages:
+            if versions is not None:
+                if package not in versions:
+                    continue
+                self.put(ecosystem, package, versions[package])
+            elif not self.get(ecosystem, package):
+                continue
+            count += 1
+
+        return count
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_version_cache():
+    """Get process-wide version cache."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = Config.get('cache_dir')
+            disk = None
+            if cache_dir:
+                disk = DiskCache(os.path.join(cache_dir, 'versions.sqlite'), table='versions')
+
+            _cache = VersionCache(
+                disk=disk,
+                ttl=Config.get('version_cache_ttl'),
+                negative_ttl=Config.get('version_cache_negative_ttl'),
+                max_size=Config.get('version_cache_size')
+            )
+
+    return _cache
+
+
+def get_versions(ecosystem, package):
+    """Get all versions of given package.
+
+    Versions come from the local mirror if `versions_backend` is 'mirror',
+    otherwise from the registry, through the version cache.
+    """
+    with timed('versions.' + ecosystem):
+        if Config.get('versions_backend') == 'mirror':
+            # imported here, as most runs don't use the mirror
+            from cvejob.mirror import get_mirror
+
+            return get_mirror().get(ecosystem, package) or []
+
+        return get_version_cache().get(ecosystem, package)
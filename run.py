@@ -1,46 +1,398 @@
 """Run CVEjob."""
 
-import json
+import argparse
+import collections
+import itertools
 import logging
+import time
 
-from nvdlib.model import CVE
-
+from cvejob.feed import iter_cve_items, read_cve_items
+from cvejob import text
 from cvejob.filters.input import validate_cve
-from cvejob.config import Config
-from cvejob.identifiers import get_identifier
+from cvejob.config import Config, get_cherry_picked_ids, get_ecosystems, get_feed_paths
+from cvejob.identifiers import get_identifier_class
+from cvejob.metrics import get_metrics, timed
+from cvejob.model import CveRecord
 from cvejob.selectors.basic import VersionExistsSelector
+from cvejob.outputs.sink import BufferedOutputSink
 from cvejob.outputs.victims import VictimsYamlOutput
+from cvejob.shard import get_shard, get_shard_config, in_shard, parse_shard
+from cvejob.state import RunState, get_cve_id
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('cvejob')
 
 
-def run():
-    """Run CVEjob."""
-    with open(Config.get('feed_path')) as f:
-        feed = json.load(f)
-        for cve_dict in feed.get('CVE_Items'):
-            cve = CVE.from_dict(cve_dict)
-            if not validate_cve(cve):
-                logger.info('{cve_id} was filtered out by input checks'.format(cve_id=cve.cve_id))
-                continue
+# outcome of processing single CVE; output is (path, data) of the rendered record, or None
+CveResult = collections.namedtuple('CveResult', ['verdict', 'winner', 'output', 'cacheable'])
+
+
+def process_cves(cves, ecosystems):
+    """Run input checks, identification and selection for given batch of CVEs.
+
+    Checks which don't depend on the ecosystem run only once, everything else
+    runs for each of given ecosystems. Identifier sees all CVEs of the batch
+    which passed the checks at once; each CVE is charged its share of that time
+    in the per-CVE latency.
+
+    :return: list, (ecosystem, CveResult) tuples for each of given CVEs
+    """
+    metrics = get_metrics()
+
+    with timed('batch'):
+        results, spent = _process_cves(cves, ecosystems)
+
+    for seconds in spent:
+        metrics.observe('cve', seconds)
+
+    for cve_results in results:
+        for _, result in cve_results:
+            metrics.incr('verdict.' + result.verdict.split(':')[0])
+    return results
+
+
+def _process_cves(cves, ecosystems):
+    results = [[] for _ in cves]
+    spent = [0.0] * len(cves)
+
+    valid = []
+    for i, cve in enumerate(cves):
+        start = time.perf_counter()
+        with timed('filter'):
+            result = validate_cve(cve, ecosystem_specific=False)
+        spent[i] += time.perf_counter() - start
+        if not result:
+            logger.info('{cve_id} was filtered out by {check}'.format(
+                cve_id=cve.cve_id, check=result.rejected_by
+            ))
+            filtered = CveResult('filtered:' + result.rejected_by, None, None, result.cacheable)
+            results[i] = [(ecosystem, filtered) for ecosystem in ecosystems]
+        else:
+            valid.append((i, result.cacheable))
+
+    for ecosystem in ecosystems:
+        with Config.override(ecosystem=ecosystem):
+            ecosystem_results, ecosystem_spent = _process_cves_for_ecosystem(
+                [cves[i] for i, _ in valid], ecosystem
+            )
+        for (i, cacheable), result, seconds in zip(valid, ecosystem_results, ecosystem_spent):
+            results[i].append((ecosystem, _not_cacheable_unless(cacheable, result)))
+            spent[i] += seconds
+
+    return results, spent
+
+
+def _process_cves_for_ecosystem(cves, ecosystem):
+    """Process CVEs for single ecosystem.
+
+    :return: tuple, (list of CveResult, list of seconds spent on each CVE)
+    """
+    results = [None] * len(cves)
+    spent = [0.0] * len(cves)
+
+    valid = []
+    for i, cve in enumerate(cves):
+        start = time.perf_counter()
+        with timed('filter'):
+            result = validate_cve(cve, ecosystem_specific=True)
+        spent[i] += time.perf_counter() - start
+        if not result:
+            logger.info('{cve_id} was filtered out by {check} for {e}'.format(
+                cve_id=cve.cve_id, check=result.rejected_by, e=ecosystem
+            ))
+            results[i] = CveResult('filtered:' + result.rejected_by, None, None, result.cacheable)
+        else:
+            valid.append((i, result.cacheable))
+
+    if not valid:
+        return results, spent
+
+    metrics = get_metrics()
+    start = time.perf_counter()
+    with timed('identify.batch'):
+        candidates = get_identifier_class().identify_many([cves[i] for i, _ in valid])
+    share = (time.perf_counter() - start) / len(valid)
+
+    for (i, cacheable), cve_candidates in zip(valid, candidates):
+        metrics.observe('identify', share)
+        start = time.perf_counter()
+        result = _select_winner(cves[i], cve_candidates, ecosystem)
+        spent[i] += share + time.perf_counter() - start
+        results[i] = _not_cacheable_unless(cacheable, result)
+
+    return results, spent
+
+
+def _not_cacheable_unless(cacheable, result):
+    """Make result not cacheable, unless the checks it passed gave definite answers."""
+    if cacheable:
+        return result
+    return result._replace(cacheable=False)
+
+
+def _select_winner(cve, candidates, ecosystem):
+    if not candidates:
+        logger.info('{cve_id} no {e} package name candidates found'.format(
+            cve_id=cve.cve_id, e=ecosystem
+        ))
+        return CveResult('no-candidates', None, None, True)
+
+    with timed('select'):
+        selector = VersionExistsSelector(cve, candidates)
+        winner = selector.pick_winner()
+
+    if not winner:
+        logger.info('{cve_id} no {e} package name found'.format(cve_id=cve.cve_id, e=ecosystem))
+        return CveResult('no-winner', None, None, True)
+
+    with timed('output.render'):
+        output = VictimsYamlOutput(cve, winner, candidates)
+        rendered = output.render()
+
+    return CveResult('written', winner['package'], (output.path, rendered), True)
+
+
+def _to_cve(cve_dict):
+    return CveRecord.from_dict(cve_dict)
+
+
+class _BufferingHandler(logging.Handler):
+    """Collect log records in worker processes, so that the main process can emit them in order."""
+
+    def __init__(self):
+        """Constructor."""
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        """Store the record, in picklable form."""
+        if record.exc_info:
+            record.exc_text = self.format(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+_log_buffer = None
+
+
+def _init_worker(config):
+    """Set up per-worker state."""
+    global _log_buffer
+
+    for name, value in config.items():
+        Config.set(name, value)
+
+    _log_buffer = _BufferingHandler()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_log_buffer)
+
+    get_identifier_class().warm_up()
+
+
+def _process_cve_dicts(cve_dicts):
+    """Process batch of CVEs in a worker process.
+
+    :return: tuple, (results of `process_cves()`, log records, metrics snapshot)
+    """
+    _log_buffer.records = []
+    results = process_cves([_to_cve(x) for x in cve_dicts], get_ecosystems())
+    return results, _log_buffer.records, get_metrics().snapshot(reset=True)
+
+
+def _iter_batches(items, size):
+    """Split items into lists of given size; the last one may be shorter."""
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_changed(items, states):
+    """Skip NVD feed items which were already processed in their current form, everywhere."""
+    for cve_dict in items:
+        if all(state.is_unchanged(cve_dict) for state in states):
+            logger.debug('{cve_id} is unchanged since the last run'.format(
+                cve_id=get_cve_id(cve_dict)
+            ))
+            continue
+        yield cve_dict
+
+
+class _ResultHandler(object):
+    """Write outputs and remember outcomes of processed CVEs, in batches."""
+
+    def __init__(self, states, batch_size=100):
+        """Constructor.
+
+        :param states: dict, ecosystem -> RunState; empty if outcomes are not remembered
+        """
+        self._states = states
+        self._sink = BufferedOutputSink(buffer_size=batch_size)
+        self._batch_size = batch_size
+        self._pending = 0
+
+    def __call__(self, cve_dict, results):
+        """Handle results of processing single CVE, for all ecosystems."""
+        for ecosystem, result in results:
+            if result.output is not None:
+                self._sink.add(*result.output)
+
+            state = self._states.get(ecosystem)
+            if state is not None and result.cacheable:
+                state.record(cve_dict, result.verdict, result.winner)
+
+        self._pending += 1
+        if self._pending >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered outputs, and only then commit outcomes."""
+        with timed('output.write'):
+            self._sink.flush()
+        for state in self._states.values():
+            state.commit()
+        self._pending = 0
+
+    def close(self):
+        """Flush everything and release resources."""
+        with timed('output.write'):
+            self._sink.close()
+        for state in self._states.values():
+            state.close()
+
+
+def run(workers=1):
+    """Run CVEjob.
+
+    :param workers: int, number of worker processes; CVEs are still handled in feed order
+    """
+    # fail fast if NLTK data are missing; tokenizers are loaded for real,
+    # as the serial run has no workers which would warm them up
+    text.warm_up()
+
+    shard = get_shard()
+    if shard is None:
+        _run(workers)
+        return
+
+    logger.info('Processing shard {i} of {n}'.format(i=shard.index, n=shard.count))
+    # every shard writes its outputs, run-state and metrics separately
+    with Config.override(**get_shard_config(shard)):
+        _run(workers, shard=shard)
+
+
+def _iter_items(cve_ids, shard=None):
+    """Iterate over raw NVD feed items to process, from all configured feeds."""
+    feed_paths = get_feed_paths()
+    if cve_ids is not None:
+        # jump right to the cherry-picked CVEs
+        items = itertools.chain.from_iterable(
+            read_cve_items(x, cve_ids, warn=len(feed_paths) == 1) for x in feed_paths
+        )
+    else:
+        items = itertools.chain.from_iterable(iter_cve_items(x) for x in feed_paths)
+
+    if shard is not None:
+        items = (x for x in items if in_shard(get_cve_id(x), shard))
+
+    return items
+
+
+def _run(workers, shard=None):
+    cve_ids = get_cherry_picked_ids()
+    items = _iter_items(cve_ids, shard=shard)
+    ecosystems = get_ecosystems()
+
+    states = {}
+    if Config.get('state_path'):
+        state = RunState(Config.get('state_path'), ecosystems[0])
+        states = {e: state.for_ecosystem(e) for e in ecosystems[1:]}
+        states[ecosystems[0]] = state
+        if cve_ids is None:
+            # cherry-picked CVEs are always re-evaluated
+            items = _iter_changed(items, list(states.values()))
+
+    batches = _iter_batches(items, Config.get('identify_batch_size'))
+
+    handle_result = _ResultHandler(states)
+    try:
+        if workers <= 1:
+            for batch in batches:
+                results = process_cves([_to_cve(x) for x in batch], ecosystems)
+                for cve_dict, cve_results in zip(batch, results):
+                    handle_result(cve_dict, cve_results)
+        else:
+            _run_parallel(batches, workers, handle_result)
+    finally:
+        handle_result.close()
+        _report_metrics()
+
+
+def _report_metrics():
+    """Write metrics of the run, if requested."""
+    metrics = get_metrics()
+
+    if Config.get('metrics_path'):
+        metrics.write_json(Config.get('metrics_path'))
+    if Config.get('metrics_textfile'):
+        metrics.write_textfile(Config.get('metrics_textfile'))
+
+    for stage, timer in sorted(metrics.snapshot()['timers'].items()):
+        logger.debug('{s}: {c} calls, {t:.3f}s total, {m:.3f}s max'.format(
+            s=stage, c=timer['count'], t=timer['total'], m=timer['max']
+        ))
+
+
+def _run_parallel(batches, workers, handle_result):
+    import multiprocessing
+
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(Config.get_all(),)) as pool:
+        # keep only a bounded number of batches in flight, results are collected in feed order
+        pending = collections.deque()
+        for batch in batches:
+            pending.append((batch, pool.apply_async(_process_cve_dicts, (batch,))))
+            if len(pending) >= workers * 2:
+                _collect(*pending.popleft(), handle_result=handle_result)
+
+        while pending:
+            _collect(*pending.popleft(), handle_result=handle_result)
+
 
-            identifier = get_identifier(cve)
-            candidates = identifier.identify()
+def _collect(batch, async_result, handle_result):
+    results, records, metrics = async_result.get()
+    for record in records:
+        logging.getLogger(record.name).handle(record)
+    get_metrics().merge(metrics)
+    for cve_dict, cve_results in zip(batch, results):
+        handle_result(cve_dict, cve_results)
 
-            if not candidates:
-                logger.info('{cve_id} no package name candidates found'.format(cve_id=cve.cve_id))
-                continue
 
-            selector = VersionExistsSelector(cve, candidates)
-            winner = selector.pick_winner()
+def main():
+    """Parse command line arguments and run CVEjob."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes (default: 1)')
+    parser.add_argument('--shard',
+                        help='process only i-th of N shards of the CVEs, e.g. 2/4 '
+                             '(default: all CVEs)')
+    args = parser.parse_args()
 
-            if not winner:
-                logger.info('{cve_id} no package name found'.format(cve_id=cve.cve_id))
-                continue
+    if args.shard:
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        Config.set('shard', args.shard)
 
-            VictimsYamlOutput(cve, winner, candidates).write()
+    run(workers=args.workers)
 
 
 if __name__ == '__main__':
-    run()
+    main()
@@ -0,0 +1,58 @@
+"""This script compares rankings of the native package name matcher with cpe2pkg's.
+
+Usage: PYTHONPATH=. python scripts/compare_cpe2pkg.py [--record <rankings.json>]
+           <pkgfile> <queries.json> [cpe2pkg.jar]
+
+Queries file is a JSON list of {"vendor": [...], "product": [...]} objects.
+Summary of differences is printed to stdout, as JSON.
+
+Rankings are compared position by position, see `compare_rankings()`.
+
+With --record, cpe2pkg's rankings are written to the given file instead, so that
+they can be replayed where no JVM is available, with `RecordedRankings`.
+"""
+
+import json
+import sys
+
+from cvejob.cpe2pkg.jvm import Cpe2PkgCommand
+from cvejob.cpe2pkg.native import PackageNameIndex, compare_rankings
+from cvejob.cpe2pkg.recorded import record_rankings
+from cvejob.config import Config
+
+
+def main(argv):
+    """Compare native matcher with cpe2pkg."""
+    record_file = None
+    if len(argv) > 2 and argv[1] == '--record':
+        record_file = argv[2]
+        argv = argv[:1] + argv[3:]
+
+    if len(argv) < 3:
+        print(__doc__)
+        return 1
+
+    pkgfile, queries_file = argv[1], argv[2]
+    cpe2pkg_path = argv[3] if len(argv) > 3 else Config.get('cpe2pkg_path')
+
+    with open(queries_file) as f:
+        queries = [(x['vendor'], x['product']) for x in json.load(f)]
+
+    expected = Cpe2PkgCommand(cpe2pkg_path, pkgfile)
+
+    try:
+        if record_file:
+            with open(record_file, 'w') as f:
+                json.dump(record_rankings(expected, queries), f, indent=4)
+            return 0
+
+        summary = compare_rankings(expected, PackageNameIndex(pkgfile), queries)
+    finally:
+        expected.close()
+
+    print(json.dumps(summary, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,29 @@
+"""This script converts package list files to the binary, memory-mapped format.
+
+Usage: PYTHONPATH=. python scripts/convert_pkgfile.py <pkgfile> [<pkgfile> ...]
+
+Binary package lists are written next to the text files, as `<pkgfile>.pkglist`.
+"""
+
+import sys
+
+from cvejob.pkglist import PackageList, convert
+
+
+def main(argv):
+    """Convert given package list files."""
+    if len(argv) < 2:
+        print(__doc__)
+        return 1
+
+    for pkgfile in argv[1:]:
+        path = convert(pkgfile)
+        package_list = PackageList(path)
+        print('{p}: {n} packages'.format(p=path, n=len(package_list)))
+        package_list.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,54 @@
+"""This script downloads several NVD JSON feeds concurrently.
+
+Usage: PYTHONPATH=. python scripts/get_nvd_feeds.py [--directory DIR] [--concurrency N]
+           [--keep-gzipped] <feed> ...
+
+Feeds are years (e.g. 2018), ranges of years (e.g. 2002-2018), 'recent' or 'modified'.
+Feeds are stored decompressed, unless --keep-gzipped is given, so that CVEs can be
+looked up in them quickly. Feeds which have not changed upstream since the last download
+are not downloaded again.
+Paths to the feeds are printed as comma-separated list, ready for `CVEJOB_FEED_PATH`.
+"""
+
+import argparse
+import logging
+import sys
+
+from cvejob.feed import download_feeds
+
+
+def expand_feeds(feeds):
+    """Expand ranges of years, e.g. '2016-2018' -> ['2016', '2017', '2018']."""
+    result = []
+    for feed in feeds:
+        first, _, last = feed.partition('-')
+        if last and first.isdigit() and last.isdigit():
+            result.extend(str(x) for x in range(int(first), int(last) + 1))
+        else:
+            result.append(feed)
+    return list(dict.fromkeys(result))
+
+
+def main():
+    """Download the feeds."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--directory', default='data/nvd/',
+                        help='where to store the feeds (default: data/nvd/)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='number of concurrent downloads (default: 4)')
+    parser.add_argument('--keep-gzipped', dest='decompress', action='store_false',
+                        help='store the feeds gzipped, as downloaded')
+    parser.add_argument('feeds', nargs='+')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    paths = download_feeds(expand_feeds(args.feeds), args.directory,
+                           concurrency=args.concurrency, decompress=args.decompress)
+    print(','.join(paths))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,19 +1,19 @@
-"""This script prints names of all packages in PyPI to stdout."""
+"""This script prints names of all packages in PyPI to stdout.
 
-from bs4 import BeautifulSoup
-import requests
+The simple index is parsed as it is being downloaded. To maintain a package list file,
+with resumable downloads and conditional requests, use `scripts/refresh_pkgfile.py`.
+"""
+
+from cvejob.config import Config
+from cvejob.pkgrefresh import PyPISource
+from cvejob.versions import get_session
 
 
 def get_package_names():
     """Get names of all packages in PyPI."""
-    pypi_packages_url = 'https://pypi.python.org/simple/'
-    response = requests.get(pypi_packages_url)
-    if response.status_code != 200:
-        raise Exception('Error fetching URL: {url}'.format(url=pypi_packages_url))
-
-    soup = BeautifulSoup(response.content, 'html.parser')
-    for link in soup.find_all('a'):
-        yield link.get('href')
+    source = PyPISource(Config.get('pypi_simple_url'))
+    for names, _ in source.iter_pages(get_session()):
+        yield from names
 
 
 if __name__ == '__main__':
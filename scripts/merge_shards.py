@@ -0,0 +1,59 @@
+"""This script merges outputs and metrics of sharded runs.
+
+Usage: PYTHONPATH=. python scripts/merge_shards.py <shard-dir> [<shard-dir> ...]
+
+Every shard directory is a directory with results of one `run.py --shard i/N` run,
+e.g. collected from a CI node. Output trees (`CVEJOB_OUTPUT_DIR` with shard suffix,
+e.g. `database-shard-2-of-4/`) found in them are merged into `CVEJOB_OUTPUT_DIR`.
+Metrics (`CVEJOB_METRICS_PATH` with shard suffix) are merged into
+`CVEJOB_METRICS_PATH` and, if set, `CVEJOB_METRICS_TEXTFILE`.
+"""
+
+import glob
+import json
+import logging
+import os
+import sys
+
+from cvejob.config import Config
+from cvejob.outputs.sink import atomic_write
+from cvejob.shard import merge_metrics, merge_outputs
+
+
+def _find(directories, path):
+    """Find per-shard variants of given path in given directories."""
+    root, ext = os.path.splitext(os.path.basename(path.rstrip('/' + os.sep)))
+    pattern = '{r}-shard-*-of-*{e}'.format(r=glob.escape(root), e=glob.escape(ext))
+    return sorted(x for d in directories for x in glob.glob(os.path.join(d, pattern)))
+
+
+def main(argv):
+    """Merge the shards."""
+    if len(argv) < 2:
+        print(__doc__)
+        return 1
+
+    logging.basicConfig(level=logging.INFO)
+
+    directories = argv[1:]
+    stats = {}
+
+    output_dirs = _find(directories, Config.get('output_dir'))
+    stats['outputs'] = merge_outputs(output_dirs, Config.get('output_dir'))
+    stats['shards'] = len(output_dirs)
+
+    metrics_path = Config.get('metrics_path')
+    if metrics_path:
+        metrics, summary = merge_metrics(_find(directories, metrics_path))
+        os.makedirs(os.path.dirname(metrics_path) or '.', exist_ok=True)
+        atomic_write(metrics_path, (json.dumps(summary, indent=2, sort_keys=True) + '\n').encode())
+        if Config.get('metrics_textfile'):
+            metrics.write_textfile(Config.get('metrics_textfile'))
+        stats['duration'] = summary['duration']
+
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
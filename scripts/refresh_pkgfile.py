@@ -0,0 +1,33 @@
+"""This script refreshes package list file of given ecosystem.
+
+Usage: PYTHONPATH=. python scripts/refresh_pkgfile.py <ecosystem> [pkgfile]
+
+By default, the package list file cpe2pkg uses for the ecosystem is refreshed.
+Interrupted refreshes are resumed on the next invocation; lists which have not
+changed since the last refresh are not downloaded again.
+"""
+
+import logging
+import sys
+
+from cvejob.cpe2pkg import get_pkgfile
+from cvejob.pkgrefresh import PackageListRefresher, get_source
+
+
+def main(argv):
+    """Refresh the package list file."""
+    if len(argv) < 2:
+        print(__doc__)
+        return 1
+
+    logging.basicConfig(level=logging.INFO)
+
+    ecosystem = argv[1]
+    pkgfile = argv[2] if len(argv) > 2 else get_pkgfile(ecosystem)
+
+    PackageListRefresher(get_source(ecosystem), pkgfile).refresh()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,56 @@
+"""This script syncs the local mirror of upstream versions.
+
+Usage: PYTHONPATH=. python scripts/sync_mirror.py <ecosystem> [pkgfile] [versions.json]
+
+Versions of all packages from the package list file (by default, the one cpe2pkg uses
+for the ecosystem) are fetched from the registry and stored in the mirror
+(`CVEJOB_MIRROR_PATH`). Already mirrored packages are revalidated with conditional
+requests. If a JSON file mapping package names to lists of versions is given,
+versions are imported from it instead, without any network access.
+
+Runs with `CVEJOB_VERSIONS_BACKEND=mirror` then don't need access to the registries.
+"""
+
+import json
+import logging
+import sys
+
+from cvejob.config import Config
+from cvejob.cpe2pkg import get_pkgfile, read_package_names
+from cvejob.mirror import VersionMirror, sync
+
+
+def main(argv):
+    """Sync the mirror."""
+    if len(argv) < 2:
+        print(__doc__)
+        return 1
+
+    logging.basicConfig(level=logging.INFO)
+
+    ecosystem = argv[1]
+    pkgfile = argv[2] if len(argv) > 2 else get_pkgfile(ecosystem)
+    packages = list(dict.fromkeys(read_package_names(pkgfile)))
+
+    mirror = VersionMirror(Config.get('mirror_path'))
+    try:
+        if len(argv) > 3:
+            with open(argv[3]) as f:
+                versions = json.load(f)
+            count = mirror.put_many(
+                ecosystem, ((x, versions[x], None) for x in packages if x in versions)
+            )
+            stats = {'imported': count}
+        else:
+            stats = sync(mirror, ecosystem, packages)
+
+        stats['total'] = mirror.count(ecosystem)
+    finally:
+        mirror.close()
+
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,36 @@
+"""This script fills the upstream version cache ahead of a CVEjob run.
+
+Usage: PYTHONPATH=. python scripts/warm_version_cache.py <ecosystem> <pkgfile> [versions.json]
+
+Package names are read from the package list file (`<ecosystem> <name>` lines,
+or just names). If a JSON file mapping package names to lists of versions is given,
+versions are taken from it and no network access is needed.
+"""
+
+import json
+import sys
+
+from cvejob.cpe2pkg import read_package_names
+from cvejob.versions import get_version_cache
+
+
+def main(argv):
+    """Pre-warm the version cache."""
+    if len(argv) < 3:
+        print(__doc__)
+        return 1
+
+    ecosystem, pkgfile = argv[1], argv[2]
+
+    versions = None
+    if len(argv) > 3:
+        with open(argv[3]) as f:
+            versions = json.load(f)
+
+    count = get_version_cache().prewarm(ecosystem, read_package_names(pkgfile), versions=versions)
+    print('Cached versions of {n} packages'.format(n=count))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
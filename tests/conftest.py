@@ -2,7 +2,10 @@
 
 import pytest
 import json
-from nvdlib.model import CVE
+import threading
+from http.server import HTTPServer
+
+from cvejob.model import CveRecord
 
 
 @pytest.fixture
@@ -10,4 +13,33 @@ def javascript_cve():
     """JavaScript CVE fixture."""
     with open('tests/data/javascript-nvdcve.json') as f:
         nvd_json = json.load(f)
-        return CVE.from_dict(nvd_json['CVE_Items'][0])
+        return CveRecord.from_dict(nvd_json['CVE_Items'][0])
+
+
+@pytest.fixture
+def stub_server():
+    """Stub HTTP server factory fixture.
+
+    `stub_server(handler, **attrs)` starts a server with given request handler class
+    in a background thread. Servers run until the end of the test. Keyword arguments
+    become attributes of the server, for handlers to use; every server also has
+    `requests`, an empty list, and `url`, its base URL.
+    """
+    servers = []
+
+    def start(handler, **attrs):
+        server = HTTPServer(('127.0.0.1', 0), handler)
+        server.requests = []
+        server.url = 'http://127.0.0.1:{p}'.format(p=server.server_address[1])
+        for name, value in attrs.items():
+            setattr(server, name, value)
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1 @@
+"""Tests for cvejob.cpe2pkg modules."""
@@ -0,0 +1,55 @@
+"""Test cvejob.cpe2pkg.cache module."""
+
+import os
+import shutil
+
+from cvejob.cache import DiskCache
+from cvejob.cpe2pkg.cache import Cpe2PkgCache, normalize_tokens
+from cvejob.cpe2pkg.native import PackageNameIndex
+
+
+def test_normalize_tokens():
+    """Test normalize_tokens()."""
+    assert normalize_tokens(['Django', 'djangoproject django']) == ['django', 'djangoproject']
+    assert normalize_tokens(['com.fasterxml:jackson']) == ['com.fasterxml', 'jackson']
+    assert normalize_tokens([]) == []
+
+
+def test_cpe2pkg_cache(tmpdir, mocker):
+    """Test that equivalent queries are answered from the cache."""
+    pkgfile = str(tmpdir.join('python-packages'))
+    shutil.copy('tests/data/python-packages', pkgfile)
+    index = PackageNameIndex(pkgfile)
+    search = mocker.spy(index, 'search')
+    cache = Cpe2PkgCache(disk=DiskCache(str(tmpdir.join('cpe2pkg.sqlite')), table='cpe2pkg'))
+
+    results = cache.search(index, ['python'], ['djangoproject', 'django'])
+    assert results[0] == index.search(['python'], ['django', 'djangoproject'])[0]
+    assert search.call_count == 2
+
+    assert cache.search(index, ['Python'], ['django', 'DjangoProject', 'django']) == results
+    assert search.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # persistent store is shared across runs
+    cache = Cpe2PkgCache(disk=DiskCache(str(tmpdir.join('cpe2pkg.sqlite')), table='cpe2pkg'))
+    assert cache.search(index, ['python'], ['djangoproject', 'django']) == results
+    assert search.call_count == 2
+
+    # refreshed package list invalidates the results
+    stat = os.stat(pkgfile)
+    os.utime(pkgfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.search(index, ['python'], ['djangoproject', 'django']) == results
+    assert search.call_count == 3
+
+
+def test_cpe2pkg_cache_lru(mocker):
+    """Test that in-memory cache doesn't grow over given size."""
+    index = PackageNameIndex('tests/data/python-packages')
+    search = mocker.spy(index, 'search')
+    cache = Cpe2PkgCache(max_size=1)
+
+    cache.search(index, ['python'], ['django'])
+    cache.search(index, ['python'], ['flask'])
+    cache.search(index, ['python'], ['django'])
+    assert search.call_count == 3
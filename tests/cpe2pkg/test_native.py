@@ -0,0 +1,98 @@
+"""Test cvejob.cpe2pkg.native module."""
+
+import json
+
+from cvejob.cpe2pkg.native import (
+    PackageNameIndex, compare_rankings, rank_correlation, tokenize
+)
+from cvejob.cpe2pkg.recorded import RecordedRankings
+
+
+def test_tokenize():
+    """Test tokenize()."""
+    assert tokenize('Jackson-Databind') == ['jackson', 'databind']
+    assert tokenize('com.fasterxml.jackson:jackson_core') == [
+        'com', 'fasterxml', 'jackson', 'jackson', 'core'
+    ]
+
+
+def test_package_name_index_load():
+    """Test PackageNameIndex() loads the package list file."""
+    index = PackageNameIndex('tests/data/python-packages')
+    assert len(index) == 20
+
+
+def test_package_name_index_search():
+    """Test PackageNameIndex.search()."""
+    index = PackageNameIndex('tests/data/python-packages')
+
+    results = index.search(['python'], ['djangoproject', 'django'])
+    assert results[0][1] == 'python:django'
+    assert {p for _, p in results} == {
+        'python:django', 'python:django-rest-framework', 'python:django-debug-toolbar'
+    }
+
+    results = index.search(['python'], ['flask', 'login'])
+    assert results[0][1] == 'python:flask-login'
+
+    # scores are sorted, best match first
+    scores = [float(s) for s, _ in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_package_name_index_search_vendor_mismatch():
+    """Test PackageNameIndex.search() requires vendor match."""
+    index = PackageNameIndex('tests/data/python-packages')
+    assert index.search(['npm'], ['django']) == []
+    assert index.search(['python'], ['nonexistent']) == []
+
+
+def test_compare_rankings():
+    """Test compare_rankings() against expected rankings of the fixture queries.
+
+    Expected rankings were reviewed by hand, they are not cpe2pkg output.
+    """
+    expected = RecordedRankings('tests/data/expected-rankings.json')
+    index = PackageNameIndex('tests/data/python-packages')
+
+    summary = compare_rankings(expected, index, expected.queries)
+    assert summary['queries'] == 7
+    assert summary['top1_agreement'] == 7
+    assert summary['exact_agreement'] == 7
+    assert summary['overlap'] == 1.0
+    assert summary['rank_correlation'] == 1.0
+    assert not summary['mismatches']
+
+
+def test_compare_rankings_order(tmpdir):
+    """Test compare_rankings() reports rankings which differ in order only."""
+    rankings = tmpdir.join('rankings.json')
+    rankings.write(json.dumps([
+        {'vendor': ['python'], 'product': ['flask', 'login'],
+         'packages': ['python:flask-login', 'python:flask-cors', 'python:flask']},
+        {'vendor': ['python'], 'product': ['saltstack', 'salt'],
+         'packages': ['python:salt-api', 'python:salt']}
+    ]))
+    expected = RecordedRankings(str(rankings))
+    index = PackageNameIndex('tests/data/python-packages')
+
+    summary = compare_rankings(expected, index, expected.queries)
+    assert summary['queries'] == 2
+    assert summary['top1_agreement'] == 1
+    assert summary['exact_agreement'] == 0
+    assert summary['overlap'] == 1.0
+    # flask: 2 of 3 pairs in the same order, salt: the only pair reversed
+    assert summary['rank_correlation'] == (1 / 3 - 1) / 2
+
+    flask, salt = summary['mismatches']
+    assert flask['positions'] == [1, 2]
+    assert flask['actual'] == ['python:flask-login', 'python:flask', 'python:flask-cors']
+    assert salt['positions'] == [0, 1]
+
+
+def test_rank_correlation():
+    """Test rank_correlation()."""
+    assert rank_correlation(['a', 'b', 'c'], ['a', 'b', 'c']) == 1.0
+    assert rank_correlation(['a', 'b', 'c'], ['c', 'b', 'a']) == -1.0
+    assert rank_correlation(['a', 'b', 'x'], ['b', 'a', 'y']) == -1.0
+    assert rank_correlation(['a'], ['b']) == 1.0
@@ -1,13 +1,20 @@
 """Test cvejob.filters.input module."""
 
+from cvejob.config import Config
 from cvejob.filters.input import (
+    COST_METADATA,
+    COST_NETWORK,
+    CveCheck,
+    FilterPipeline,
     NotOlderThanCheck,
     NotUnsupportedFileExtensionCheck,
     NotUnderAnalysisCheck,
     IsSupportedGitHubLanguageCheck,
     AffectsApplicationCheck,
-    IsCherryPickedCveCheck
+    IsCherryPickedCveCheck,
+    validate_cve
 )
+from cvejob.model import CveRecord
 
 
 def test_not_older_than_check(javascript_cve, mocker):
@@ -33,11 +40,41 @@ def test_not_under_analysis_check(javascript_cve):
 
 def test_is_supported_github_language_check(javascript_cve, mocker):
     """Test IsSupportedGitHubLanguageCheck()."""
-    config_get = mocker.patch('cvejob.filters.input.Config.get')
-    config_get.return_value = 'javascript'
-
-    check = IsSupportedGitHubLanguageCheck(javascript_cve)
-    assert check.check()
+    service = mocker.patch('cvejob.filters.input.get_language_service').return_value
+    service.get_top_languages.side_effect = lambda repos: {r: 'JavaScript' for r in repos}
+
+    with Config.override(ecosystem='javascript'):
+        check = IsSupportedGitHubLanguageCheck(javascript_cve)
+        assert check.check()
+
+
+def test_is_supported_github_language_check_cacheable(mocker):
+    """Test that only definite outcomes of IsSupportedGitHubLanguageCheck() are cacheable."""
+    cve = CveRecord('CVE-2018-3757', references=(
+        'https://github.com/owner/c-repo/issues/1', 'https://github.com/owner/flaky-repo/pull/2'
+    ))
+    service = mocker.patch('cvejob.filters.input.get_language_service').return_value
+    pipeline = FilterPipeline([IsSupportedGitHubLanguageCheck])
+
+    with Config.override(ecosystem='javascript'):
+        # the project is written in C, no doubt about it
+        service.get_top_languages.return_value = {
+            ('owner', 'c-repo'): 'C', ('owner', 'flaky-repo'): 'JavaScript'
+        }
+        result = pipeline.run(cve)
+        assert result.rejected_by == 'IsSupportedGitHubLanguageCheck'
+        assert result.cacheable
+
+        # lookups which failed, e.g. due to 5xx, are missing from the answer
+        service.get_top_languages.return_value = {('owner', 'c-repo'): 'C'}
+        result = pipeline.run(cve)
+        assert result.rejected_by == 'IsSupportedGitHubLanguageCheck'
+        assert result.cacheable
+
+        service.get_top_languages.return_value = {('owner', 'c-repo'): 'JavaScript'}
+        result = pipeline.run(cve)
+        assert result.accepted
+        assert not result.cacheable
 
 
 def test_affects_application_check(javascript_cve):
@@ -53,3 +90,79 @@ def test_is_cherrypicked_cve_check(javascript_cve, mocker):
 
     check = IsCherryPickedCveCheck(javascript_cve)
     assert check.check()
+
+
+class _PassingCheck(CveCheck):
+    cost = COST_NETWORK
+    calls = []
+
+    def check(self):
+        self.calls.append(type(self).__name__)
+        return True
+
+
+class _RejectingCheck(CveCheck):
+    cost = COST_METADATA
+    calls = []
+
+    def check(self):
+        self.calls.append(type(self).__name__)
+        return False
+
+
+def test_filter_pipeline_order():
+    """Test that FilterPipeline() runs cheap checks first."""
+    pipeline = FilterPipeline([
+        IsSupportedGitHubLanguageCheck,
+        NotUnsupportedFileExtensionCheck,
+        NotOlderThanCheck,
+        IsCherryPickedCveCheck
+    ])
+    assert pipeline.checks == [
+        NotOlderThanCheck,
+        IsCherryPickedCveCheck,
+        NotUnsupportedFileExtensionCheck,
+        IsSupportedGitHubLanguageCheck
+    ]
+
+
+def test_filter_pipeline_short_circuit():
+    """Test that FilterPipeline() stops at the first rejection."""
+    _PassingCheck.calls = []
+    _RejectingCheck.calls = []
+
+    result = FilterPipeline([_PassingCheck, _RejectingCheck]).run(None)
+    assert not result
+    assert result.rejected_by == '_RejectingCheck'
+    assert list(result.timings) == ['_RejectingCheck']
+    assert _RejectingCheck.calls == ['_RejectingCheck']
+    assert _PassingCheck.calls == []
+
+
+def test_filter_pipeline_accepted():
+    """Test FilterPipeline() result when all checks pass."""
+    _PassingCheck.calls = []
+
+    result = FilterPipeline([_PassingCheck]).run(None)
+    assert result
+    assert result.accepted
+    assert result.rejected_by is None
+    assert _PassingCheck.calls == ['_PassingCheck']
+    assert result.timings['_PassingCheck'] >= 0
+
+
+def test_validate_cve_ecosystem_specific(mocker):
+    """Test that validate_cve() can run ecosystem-specific checks separately."""
+    pipeline = mocker.patch('cvejob.filters.input.FilterPipeline')
+
+    validate_cve(None, ecosystem_specific=True)
+    assert pipeline.call_args[0][0] == (IsSupportedGitHubLanguageCheck,)
+
+    validate_cve(None, ecosystem_specific=False)
+    checks = pipeline.call_args[0][0]
+    assert IsSupportedGitHubLanguageCheck not in checks
+    assert NotUnderAnalysisCheck in checks
+    assert AffectsApplicationCheck in checks
+
+    validate_cve(None)
+    assert IsSupportedGitHubLanguageCheck in pipeline.call_args[0][0]
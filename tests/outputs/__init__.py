@@ -0,0 +1 @@
+"""Tests for cvejob.outputs modules."""
@@ -0,0 +1,63 @@
+"""Test cvejob.outputs.sink module."""
+
+import os
+import stat
+
+from cvejob.outputs.sink import BufferedOutputSink, atomic_write, is_identical
+
+
+def test_is_identical(tmpdir):
+    """Test is_identical()."""
+    path = str(tmpdir.join('record.yaml'))
+    assert not is_identical(path, b'data')
+
+    with open(path, 'wb') as f:
+        f.write(b'data')
+
+    assert is_identical(path, b'data')
+    assert not is_identical(path, b'atad')
+    assert not is_identical(path, b'longer data')
+
+
+def test_atomic_write(tmpdir):
+    """Test atomic_write()."""
+    path = str(tmpdir.join('record.yaml'))
+
+    atomic_write(path, b'first')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+    os.chmod(path, 0o600)
+    atomic_write(path, b'second')
+
+    with open(path, 'rb') as f:
+        assert f.read() == b'second'
+    # mode of the replaced file is kept
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    # no temporary files are left behind
+    assert tmpdir.listdir() == [tmpdir.join('record.yaml')]
+
+
+def test_buffered_output_sink(tmpdir):
+    """Test BufferedOutputSink."""
+    path = str(tmpdir.join('python', '2018', '3757.yaml'))
+    other_path = str(tmpdir.join('python', '2018', '3758.yaml'))
+
+    with BufferedOutputSink(buffer_size=10) as sink:
+        sink.add(path, 'cve: 2018-3757\n')
+        # nothing is written until the buffer is flushed
+        assert not os.path.exists(path)
+
+    assert sink.written == 1
+    with open(path) as f:
+        assert f.read() == 'cve: 2018-3757\n'
+
+    mtime = os.stat(path).st_mtime_ns
+    with BufferedOutputSink(buffer_size=1) as sink:
+        sink.add(path, 'cve: 2018-3757\n')
+        sink.add(other_path, 'cve: 2018-3758\n')
+        assert os.path.exists(other_path)
+
+    # unchanged record is not touched at all
+    assert sink.skipped == 1
+    assert sink.written == 1
+    assert os.stat(path).st_mtime_ns == mtime
@@ -0,0 +1 @@
+"""Tests for cvejob.selectors modules."""
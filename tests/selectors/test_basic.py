@@ -0,0 +1,142 @@
+"""Test cvejob.selectors.basic module."""
+
+import threading
+
+import pytest
+
+from cvejob.selectors.basic import UpstreamVersions, UpstreamVersionsCache, VersionExistsSelector
+
+
+CANDIDATES = [
+    {'package': 'first', 'score': '3.0'},
+    {'package': 'second', 'score': '2.0'},
+    {'package': 'third', 'score': '1.0'},
+]
+
+
+@pytest.fixture
+def selector(mocker):
+    """VersionExistsSelector fixture, with CVE mentioning version 1.0."""
+    mocker.patch.object(VersionExistsSelector, '_get_cpe_dicts', return_value=[])
+    mocker.patch.object(VersionExistsSelector, '_get_cpe_versions', return_value={'1.0'})
+    return VersionExistsSelector(mocker.Mock(), CANDIDATES)
+
+
+@pytest.fixture(params=[1, 4])
+def concurrency(request, mocker):
+    """Run with serial and concurrent selection."""
+    config = {
+        'ecosystem': 'python', 'selector_concurrency': request.param, 'version_cache_size': 16
+    }
+    mocker.patch('cvejob.selectors.basic.Config.get', side_effect=config.get)
+    return request.param
+
+
+def test_pick_winner(selector, concurrency, mocker):
+    """Test VersionExistsSelector.pick_winner()."""
+    versions = {'first': ['2.0'], 'second': ['1.0'], 'third': ['1.0']}
+    mocker.patch('cvejob.selectors.basic.get_versions', side_effect=lambda e, p: versions[p])
+
+    assert selector.pick_winner() == CANDIDATES[1]
+
+
+def test_pick_winner_no_winner(selector, concurrency, mocker):
+    """Test VersionExistsSelector.pick_winner() when no candidate matches."""
+    mocker.patch('cvejob.selectors.basic.get_versions', return_value=['3.0'])
+
+    assert selector.pick_winner() is None
+
+
+def test_pick_winner_concurrently_keeps_order(selector, mocker):
+    """Test that lower-ranked candidates can't win, even if their versions come first."""
+    config = {'ecosystem': 'python', 'selector_concurrency': 3, 'version_cache_size': 16}
+    mocker.patch('cvejob.selectors.basic.Config.get', side_effect=config.get)
+
+    first_done = threading.Event()
+
+    def get_versions(ecosystem, package):
+        if package == 'first':
+            first_done.wait(1)
+            return ['1.0']
+        first_done.set()
+        return ['1.0']
+
+    mocker.patch('cvejob.selectors.basic.get_versions', side_effect=get_versions)
+
+    assert selector.pick_winner() == CANDIDATES[0]
+
+
+def test_upstream_versions_cache(mocker):
+    """Test that UpstreamVersionsCache() builds index once, until versions change."""
+    build = mocker.patch('cvejob.selectors.basic.UpstreamVersions', side_effect=UpstreamVersions)
+    cache = UpstreamVersionsCache(max_size=1)
+    versions = ['1.0', '1.1']
+
+    index = cache.get('python', 'first', versions)
+    assert cache.get('python', 'first', versions) is index
+    assert cache.get('python', 'first', list(versions)) is index
+    assert build.call_count == 1
+
+    assert cache.get('python', 'first', ['1.0', '1.1', '1.2']).matches({'1.2'})
+    assert build.call_count == 2
+
+    # only one index fits into the cache
+    cache.get('python', 'second', versions)
+    cache.get('python', 'first', ['1.0', '1.1', '1.2'])
+    assert build.call_count == 4
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_upstream_versions_exact():
+    """Test UpstreamVersions() with exact matches."""
+    versions = UpstreamVersions(['1.0', '1.1', '2.0'])
+    assert versions.matches({'1.1'})
+    assert versions.matches({'3.0', '2.0'})
+    assert not versions.matches({'3.0'})
+    assert not versions.matches(set())
+    assert versions.find('1.0') == {'1.0'}
+
+
+def test_upstream_versions_maven_suffixes():
+    """Test UpstreamVersions() with Maven-style suffixes."""
+    versions = UpstreamVersions([
+        '2.9.8.Final', '2.9.8.RELEASE', '3.0.0-SNAPSHOT', '4.1_beta', '5.0rc1'
+    ])
+    assert versions.find('2.9.8') == {'2.9.8.Final', '2.9.8.RELEASE'}
+    assert versions.find('3.0.0') == {'3.0.0-SNAPSHOT'}
+    assert versions.find('4.1') == {'4.1_beta'}
+    assert versions.find('5.0') == {'5.0rc1'}
+    assert versions.matches({'1.0', '2.9.8'})
+
+
+def test_upstream_versions_numeric_suffixes():
+    """Test that UpstreamVersions() doesn't match numeric suffixes."""
+    versions = UpstreamVersions(['2.9.81', '2.9.8.1', '2.9.8-1', '2.9.8.Final', '5.0rc1'])
+    assert versions.find('2.9') == set()
+    assert versions.find('2.9.8') == {'2.9.8.Final'}
+    assert versions.find('5.0rc') == set()
+    assert not versions.matches({'2.9', '5.0rc'})
+
+
+def test_upstream_versions_same_as_naive_matching():
+    """Test that UpstreamVersions() gives the same results as naive prefix matching."""
+    def naive(cpe_versions, upstream_versions):
+        if cpe_versions & set(upstream_versions):
+            return True
+        for cpe_version in cpe_versions:
+            for upstream_version in upstream_versions:
+                if upstream_version.startswith(cpe_version):
+                    if len(upstream_version) > len(cpe_version):
+                        version_suffix = upstream_version[len(cpe_version):]
+                        version_suffix = version_suffix.lstrip('.-_')
+                        if version_suffix and not version_suffix[0].isdigit():
+                            return True
+        return False
+
+    upstream = ['1.0', '1.0.1', '1.1.Final', '1.2-rc1', '2.0.0.RELEASE', '2.0_1', '3.0a']
+    cpe_candidates = ['1', '1.0', '1.0.', '1.1', '1.1.', '1.1.F', '1.2', '1.2-r', '1.2-rc',
+                      '2.0', '2.0.0', '2.0_', '3', '3.0', '4.0']
+
+    for cpe_version in cpe_candidates:
+        expected = naive({cpe_version}, upstream)
+        assert UpstreamVersions(upstream).matches({cpe_version}) == expected, cpe_version
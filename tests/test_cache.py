@@ -0,0 +1,18 @@
+"""Test cvejob.cache module."""
+
+from cvejob.cache import LruCache
+
+
+def test_lru_cache():
+    """Test that LruCache drops least recently used entries."""
+    cache = LruCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+
+    # 'a' is now more recently used than 'b'
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert list(cache) == ['a', 'c']
+    assert len(cache) == 2
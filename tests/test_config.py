@@ -0,0 +1,32 @@
+"""Test cvejob.config module."""
+
+import pytest
+
+from cvejob.config import Config, get_ecosystems
+
+
+def test_override():
+    """Test Config.override()."""
+    ecosystem = Config.get('ecosystem')
+
+    with Config.override(ecosystem='java'):
+        assert Config.get('ecosystem') == 'java'
+    assert Config.get('ecosystem') == ecosystem
+
+    with pytest.raises(RuntimeError):
+        with Config.override(ecosystem='java'):
+            raise RuntimeError()
+    assert Config.get('ecosystem') == ecosystem
+
+    with pytest.raises(ValueError):
+        with Config.override(no_such_option=1):
+            pass
+
+
+def test_get_ecosystems():
+    """Test get_ecosystems()."""
+    with Config.override(ecosystem='java', ecosystems=None):
+        assert get_ecosystems() == ['java']
+
+    with Config.override(ecosystems='python, javascript,,python'):
+        assert get_ecosystems() == ['python', 'javascript']
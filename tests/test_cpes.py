@@ -0,0 +1,82 @@
+"""Test cvejob.cpes module."""
+
+import pytest
+
+from cvejob.cpes import extract_cpes, get_versions, iter_cpe_dicts, parse_uri
+
+
+def _cpe(uri, **bounds):
+    return dict(bounds, vulnerable=True, cpe23Uri=uri)
+
+
+def test_parse_uri():
+    """Test parse_uri()."""
+    assert parse_uri('cpe:/a:jenkins:script_security:1.46::~~~jenkins~~') == (
+        'a', 'jenkins', 'script_security', '1.46'
+    )
+    assert parse_uri('cpe:2.3:a:jenkins:script_security:1.46:*:*:*:*:jenkins:*:*') == (
+        'a', 'jenkins', 'script_security', '1.46'
+    )
+
+    # both forms of the same CPE give the same name
+    assert parse_uri('cpe:/a:foo%21bar:node.js:1.2') == parse_uri(
+        'cpe:2.3:a:foo\\!bar:node.js:1.2:*:*:*:*:*:*:*'
+    ) == ('a', 'foo!bar', 'node.js', '1.2')
+    assert parse_uri('cpe:2.3:a:vendor:product:1.2\\:3:*:*:*:*:*:*:*').version == '1.2:3'
+
+    # any version, or not applicable
+    assert parse_uri('cpe:/a:vendor:product').version is None
+    assert parse_uri('cpe:/o:linux:linux_kernel:-').version is None
+    assert parse_uri('cpe:2.3:a:vendor:product:*:*:*:*:*:*:*:*').version is None
+
+    with pytest.raises(ValueError):
+        parse_uri('vendor:product')
+
+
+def test_parse_uri_memo():
+    """Test that the same URI is parsed only once."""
+    uri = 'cpe:2.3:a:djangoproject:django:1.11.2:*:*:*:*:*:*:*'
+    assert parse_uri(uri) is parse_uri(uri)
+
+    nodes = [{'operator': 'OR', 'cpe': [_cpe(uri)]}]
+    assert extract_cpes(nodes)[0].name is extract_cpes(nodes)[0].name
+
+
+def test_iter_cpe_dicts_order():
+    """Test that children come before the node's own CPEs, depth first."""
+    nodes = [
+        {'cpe': [_cpe('3')], 'children': [
+            {'cpe': [_cpe('2')], 'children': [{'cpe': [_cpe('1')]}]}
+        ]},
+        {'cpe': [_cpe('4'), _cpe('5')]}
+    ]
+    assert [x['cpe23Uri'] for x in iter_cpe_dicts(nodes)] == ['1', '2', '3', '4', '5']
+
+
+def test_iter_cpe_dicts_deep():
+    """Test that deep configuration trees don't hit the recursion limit."""
+    node = {'cpe': [_cpe('leaf')]}
+    for _ in range(5000):
+        node = {'children': [node]}
+    assert [x['cpe23Uri'] for x in iter_cpe_dicts([node])] == ['leaf']
+
+
+def test_extract_cpes():
+    """Test extract_cpes() and get_versions()."""
+    nodes = [{'operator': 'AND', 'children': [
+        {'operator': 'OR', 'cpe': [
+            _cpe('cpe:2.3:a:fasterxml:jackson-databind:-:*:*:*:*:*:*:*',
+                 versionStartIncluding='2.9.0', versionEndExcluding='2.9.8'),
+            _cpe('cpe:2.3:a:fasterxml:jackson-databind:2.8.11:*:*:*:*:*:*:*'),
+            _cpe('not a CPE')
+        ]},
+        {'operator': 'OR', 'cpe': [_cpe('cpe:2.3:o:redhat:enterprise_linux:7.0:*:*:*:*:*:*:*')]}
+    ]}]
+
+    cpes = extract_cpes(nodes)
+    assert [(x.vendor, x.product, x.version) for x in cpes] == [
+        ('fasterxml', 'jackson-databind', None), ('fasterxml', 'jackson-databind', '2.8.11')
+    ]
+    assert get_versions(cpes) == {'2.9.0', '2.9.8', '2.8.11'}
+
+    assert [x.product for x in extract_cpes(nodes, part='o')] == ['enterprise_linux']
@@ -0,0 +1,212 @@
+"""Test cvejob.feed module."""
+
+import gzip
+import json
+import os
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from cvejob.feed import (
+    FeedReader,
+    download_feeds,
+    get_index_path,
+    iter_cve_items,
+    load_index,
+    open_feed,
+    read_cve_items
+)
+
+
+def _get_feed(n=5):
+    items = []
+    for i in range(n):
+        items.append({
+            'cve': {
+                'CVE_data_meta': {'ID': 'CVE-2018-{n}'.format(n=1000 + i)},
+                'description': {
+                    'description_data': [{'lang': 'en', 'value': 'Ünïcode [desc] {i}'.format(i=i)}]
+                }
+            },
+            'configurations': {'nodes': []},
+            'lastModifiedDate': '2018-06-01T10:00Z'
+        })
+
+    return {
+        'CVE_data_type': 'CVE',
+        'CVE_data_numberOfCVEs': str(n),
+        'CVE_Items': items
+    }
+
+
+@pytest.fixture(params=['plain', 'gzip', 'plain-crlf', 'gzip-crlf'])
+def feed_file(request, tmpdir):
+    """Feed file fixture, plain and gzip-compressed, with LF and CRLF line endings."""
+    feed = _get_feed()
+    data = json.dumps(feed, indent=2, ensure_ascii=False).encode('utf-8')
+    if request.param.endswith('-crlf'):
+        data = data.replace(b'\n', b'\r\n')
+
+    path = str(tmpdir.join('nvdcve.json'))
+    if request.param.startswith('gzip'):
+        path += '.gz'
+        data = gzip.compress(data)
+
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    return path, feed
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024 * 1024])
+def test_iter_cve_items(feed_file, chunk_size):
+    """Test iter_cve_items()."""
+    path, feed = feed_file
+    assert list(iter_cve_items(path, chunk_size=chunk_size)) == feed['CVE_Items']
+
+
+def test_iter_cve_items_is_lazy(feed_file):
+    """Test that iter_cve_items() yields items before reading the whole feed."""
+    path, feed = feed_file
+    items = iter_cve_items(path, chunk_size=64)
+    assert next(items) == feed['CVE_Items'][0]
+    items.close()
+
+
+def test_iter_cve_items_empty(tmpdir):
+    """Test iter_cve_items() with no items in the feed."""
+    path = str(tmpdir.join('nvdcve.json'))
+    with open(path, 'w') as f:
+        json.dump({'CVE_data_type': 'CVE', 'CVE_Items': []}, f)
+
+    assert list(iter_cve_items(path)) == []
+
+
+def test_feed_reader_offsets(feed_file):
+    """Test that FeedReader() reports byte offsets of items."""
+    path, feed = feed_file
+
+    with open_feed(path) as f:
+        raw = f.read()
+
+    with open_feed(path) as f:
+        items = list(FeedReader(f, chunk_size=5).items(offsets=True))
+
+    assert len(items) == len(feed['CVE_Items'])
+    for item, offset, length in items:
+        assert json.loads(raw[offset:offset + length].decode('utf-8')) == item
+
+
+def test_read_cve_items(feed_file):
+    """Test read_cve_items()."""
+    path, feed = feed_file
+
+    items = list(read_cve_items(path, ['CVE-2018-1003', 'CVE-2018-1001', 'CVE-2018-9999']))
+    assert items == [feed['CVE_Items'][1], feed['CVE_Items'][3]]
+    assert os.path.exists(get_index_path(path))
+
+
+def test_load_index_rebuilds_stale_index(feed_file):
+    """Test that load_index() rebuilds the index when the feed changes."""
+    path, feed = feed_file
+    assert load_index(path).get('CVE-2018-1004') is not None
+
+    # simulate downloading new version of the feed
+    data = json.dumps(_get_feed(n=2)).encode('utf-8')
+    if path.endswith('.gz'):
+        data = gzip.compress(data)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    index = load_index(path)
+    assert index.get('CVE-2018-1001') is not None
+    assert index.get('CVE-2018-1004') is None
+
+
+def test_feed_index_lookup(tmpdir):
+    """Test FeedIndex.get() finds every indexed CVE."""
+    path = str(tmpdir.join('nvdcve.json'))
+    with open(path, 'w') as f:
+        json.dump(_get_feed(n=50), f)
+
+    index = load_index(path)
+    for i in range(50):
+        assert index.get('CVE-2018-{n}'.format(n=1000 + i)) is not None
+    assert index.get('CVE-2017-1000') is None
+    assert index.get('CVE-2019-1000') is None
+    assert index.get('CVE-2018-1025x') is None
+
+
+class StubFeedHandler(BaseHTTPRequestHandler):
+    """Stub NVD feed server request handler."""
+
+    def do_GET(self):
+        """Handle GET request."""
+        self.server.requests.append((self.path, self.headers.get('If-Modified-Since')))
+
+        feed = self.path[len('/nvdcve-1.0-'):-len('.json.gz')]
+        if feed not in ('2017', '2018', 'recent'):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if self.headers.get('If-Modified-Since') == formatdate(self.server.mtime, usegmt=True):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = gzip.compress(json.dumps(_get_feed(int(feed) % 10 if feed.isdigit() else 1))
+                             .encode('utf-8'))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', formatdate(self.server.mtime, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Be quiet."""
+
+
+@pytest.fixture
+def feed_server(stub_server, mocker):
+    """Stub NVD feed server fixture."""
+    server = stub_server(StubFeedHandler, mtime=1528000000)
+
+    url = server.url + '/nvdcve-1.0-{feed}.json.gz'
+    mocker.patch('cvejob.feed.Config.get', side_effect={'nvd_feed_url': url}.get)
+    return server
+
+
+def test_download_feeds(feed_server, tmpdir):
+    """Test download_feeds(), including conditional downloads."""
+    directory = str(tmpdir.join('nvd'))
+    session = requests.Session()
+
+    paths = download_feeds(['2018', '2017', 'recent'], directory, session=session)
+    assert [os.path.basename(x) for x in paths] == [
+        'nvdcve-1.0-2018.json', 'nvdcve-1.0-2017.json', 'nvdcve-1.0-recent.json'
+    ]
+    with open(paths[0], 'rb') as f:
+        assert json.load(f) == _get_feed(8)
+    assert not os.path.exists(paths[0] + '.partial')
+    assert os.path.getmtime(paths[0]) == feed_server.mtime
+
+    # nothing has changed
+    assert download_feeds(['2018'], directory, session=session) == paths[:1]
+    assert feed_server.requests[-1][1] is not None
+    assert len(list(iter_cve_items(paths[0]))) == 8
+
+    with pytest.raises(requests.HTTPError):
+        download_feeds(['1999'], directory, session=session)
+
+
+def test_download_feeds_gzipped(feed_server, tmpdir):
+    """Test that download_feeds() can keep the feeds gzipped."""
+    directory = str(tmpdir.join('nvd'))
+
+    paths = download_feeds(['2018'], directory, session=requests.Session(), decompress=False)
+    assert os.path.basename(paths[0]) == 'nvdcve-1.0-2018.json.gz'
+    with open(paths[0], 'rb') as f:
+        assert gzip.decompress(f.read()) == json.dumps(_get_feed(8)).encode('utf-8')
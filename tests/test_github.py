@@ -0,0 +1,167 @@
+"""Test cvejob.github module."""
+
+import email.utils
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+from types import SimpleNamespace
+
+import pytest
+
+from cvejob.cache import DiskCache
+from cvejob.github import GitHubLanguageService, get_github_repo, get_top_language
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Stub GitHub API request handler."""
+
+    languages = {
+        '/repos/expressjs/express/languages': {'JavaScript': 1000, 'HTML': 10},
+        '/repos/django/django/languages': {'Python': 5000, 'JavaScript': 3000},
+    }
+
+    def do_GET(self):
+        """Handle GET request."""
+        self.server.requests.append(self.path)
+
+        if self.path == '/repos/limited/repo/languages' and self.server.limited:
+            self.server.limited -= 1
+            self.send_response(403)
+            self.send_header('X-RateLimit-Remaining', '0')
+            self.send_header('X-RateLimit-Reset', str(int(time.time()) + 30))
+            self.end_headers()
+            return
+
+        if self.path == '/repos/broken/repo/languages':
+            self.send_response(502)
+            self.end_headers()
+            return
+
+        languages = self.languages.get(self.path)
+        if self.path == '/repos/limited/repo/languages':
+            languages = {'Python': 1}
+
+        if languages is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps(languages).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Be quiet."""
+
+
+@pytest.fixture
+def github_server(stub_server):
+    """Stub GitHub API server fixture."""
+    return stub_server(StubGitHubHandler, limited=0)
+
+
+def _get_service(server, **kwargs):
+    return GitHubLanguageService(api_url=server.url, **kwargs)
+
+
+def test_get_github_repo():
+    """Test get_github_repo()."""
+    assert get_github_repo('https://github.com/expressjs/express/issues/1') == (
+        'expressjs', 'express'
+    )
+    assert get_github_repo('https://github.com/expressjs') is None
+    assert get_github_repo('https://example.com/expressjs/express') is None
+    assert get_github_repo('not-a-url') is None
+
+
+def test_get_top_language():
+    """Test get_top_language()."""
+    assert get_top_language({'Python': 5, 'C': 10}) == 'C'
+    assert get_top_language({}) is None
+    assert get_top_language(None) is None
+
+
+def test_get_top_languages(github_server):
+    """Test GitHubLanguageService.get_top_languages()."""
+    service = _get_service(github_server)
+
+    result = service.get_top_languages([
+        ('expressjs', 'express'), ('django', 'django'), ('nobody', 'nothing')
+    ])
+    assert result == {
+        ('expressjs', 'express'): 'JavaScript',
+        ('django', 'django'): 'Python',
+        ('nobody', 'nothing'): None
+    }
+
+    # second lookup is served from cache, including the 404
+    service.get_top_languages([('expressjs', 'express'), ('nobody', 'nothing')])
+    assert len(github_server.requests) == 3
+
+
+def test_server_error(github_server):
+    """Test that repositories are not reported, nor cached, when GitHub fails."""
+    service = _get_service(github_server)
+
+    assert service.get_top_languages([('broken', 'repo')]) == {}
+    assert service.get_top_languages([('broken', 'repo')]) == {}
+    assert len(github_server.requests) == 2
+
+
+def test_persistent_cache(github_server, tmpdir):
+    """Test that lookups are cached on disk."""
+    path = str(tmpdir.join('github.sqlite'))
+
+    service = _get_service(github_server, cache=DiskCache(path))
+    assert service.get_languages('django', 'django') == {'Python': 5000, 'JavaScript': 3000}
+
+    service = _get_service(github_server, cache=DiskCache(path))
+    assert service.get_languages('django', 'django') == {'Python': 5000, 'JavaScript': 3000}
+    assert len(github_server.requests) == 1
+
+    # expired entries are fetched again
+    service = _get_service(github_server, cache=DiskCache(path), ttl=0)
+    time.sleep(0.01)
+    service.get_languages('django', 'django')
+    assert len(github_server.requests) == 2
+
+
+def test_rate_limit_backoff(github_server):
+    """Test that rate limited lookups are retried after waiting."""
+    github_server.limited = 1
+    waits = []
+
+    service = _get_service(github_server, sleep=waits.append)
+    assert service.get_top_languages([('limited', 'repo')]) == {('limited', 'repo'): 'Python'}
+    assert len(waits) == 1
+    assert 0 < waits[0] <= 30
+
+
+def test_retry_after():
+    """Test that both forms of Retry-After header are understood."""
+    service = GitHubLanguageService(api_url='http://127.0.0.1:1')
+
+    def response(retry_after, status_code=429):
+        return SimpleNamespace(status_code=status_code, headers={'Retry-After': retry_after})
+
+    assert service._get_wait_time(response('120')) == 120
+    assert service._get_wait_time(response('120', status_code=500)) is None
+
+    retry_at = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 50 < service._get_wait_time(response(retry_at)) <= 60
+
+    # dates in the past, or garbage, still make the lookup wait a bit
+    assert service._get_wait_time(response('Wed, 21 Oct 2015 07:28:00 GMT')) == 1
+    assert service._get_wait_time(response('soon')) == 1
+
+
+def test_rate_limit_exceeded(github_server):
+    """Test that repositories are not reported when rate limit doesn't reset."""
+    github_server.limited = 10
+
+    service = _get_service(github_server, sleep=lambda x: None, max_retries=2)
+    assert service.get_top_languages([('limited', 'repo')]) == {}
+    assert len(github_server.requests) == 3
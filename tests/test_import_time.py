@@ -0,0 +1,42 @@
+"""Guard fast startup of run.py.
+
+Heavy dependencies must be imported only by the code paths which need them.
+"""
+
+import os
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ('nltk', 'requests', 'lxml', 'cpe', 'nvdlib', 'toolkit', 'sklearn')
+
+
+def _import_run(code=''):
+    """Import run.py in a fresh interpreter and return its stdout."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-c', 'import run\n' + code],
+        cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        check=True
+    )
+    return result.stdout
+
+
+def test_no_heavy_imports():
+    """Test that importing run.py doesn't import heavy dependencies."""
+    stdout = _import_run(
+        'import sys\n'
+        'print(" ".join(m for m in {m!r} if m in sys.modules))'.format(m=HEAVY_MODULES)
+    )
+    assert stdout.split() == []
+
+
+def test_no_heavy_imports_without_nvdtoolkit():
+    """Test that nvd-toolkit is not imported unless it is enabled."""
+    stdout = _import_run(
+        'import sys\n'
+        'from cvejob.identifiers import get_identifier_class\n'
+        'get_identifier_class()\n'
+        'print("toolkit" in sys.modules)'
+    )
+    assert stdout.strip() == 'False'
@@ -0,0 +1,68 @@
+"""Test cvejob.metrics module."""
+
+import json
+
+from cvejob.metrics import Metrics
+
+
+def test_timers_and_counters():
+    """Test recording of latencies and counters."""
+    metrics = Metrics()
+    metrics.observe('cpe2pkg', 0.002)
+    metrics.observe('cpe2pkg', 0.2)
+    with metrics.timer('select'):
+        pass
+    metrics.incr('cache.versions.hit', 3)
+    metrics.incr('cache.versions.miss')
+
+    snapshot = metrics.snapshot()
+    assert snapshot['timers']['cpe2pkg']['count'] == 2
+    assert snapshot['timers']['cpe2pkg']['max'] == 0.2
+    assert sum(snapshot['timers']['cpe2pkg']['buckets']) == 2
+    assert snapshot['timers']['select']['count'] == 1
+    assert snapshot['counters'] == {'cache.versions.hit': 3, 'cache.versions.miss': 1}
+    assert metrics.get_hit_rates() == {'cache.versions': 0.75}
+
+
+def test_merge():
+    """Test merging metrics from worker processes."""
+    worker = Metrics()
+    worker.observe('cpe2pkg', 0.5)
+    worker.incr('check.NotUnderAnalysisCheck.accepted')
+    snapshot = worker.snapshot(reset=True)
+    assert worker.snapshot() == {'timers': {}, 'counters': {}}
+
+    metrics = Metrics()
+    metrics.observe('cpe2pkg', 1.5)
+    metrics.merge(snapshot)
+    metrics.merge(snapshot)
+
+    merged = metrics.snapshot()
+    assert merged['timers']['cpe2pkg']['count'] == 3
+    assert merged['timers']['cpe2pkg']['total'] == 2.5
+    assert merged['counters'] == {'check.NotUnderAnalysisCheck.accepted': 2}
+
+
+def test_write(tmpdir):
+    """Test JSON summary and Prometheus textfile export."""
+    metrics = Metrics()
+    metrics.observe('cpe2pkg', 0.02)
+    metrics.incr('cache.github.hit')
+
+    json_path = str(tmpdir.join('metrics.json'))
+    metrics.write_json(json_path)
+    with open(json_path) as f:
+        summary = json.load(f)
+    assert summary['timers']['cpe2pkg']['count'] == 1
+    assert summary['hit_rates'] == {'cache.github': 1.0}
+
+    textfile_path = str(tmpdir.join('prom', 'cvejob.prom'))
+    metrics.write_textfile(textfile_path)
+    with open(textfile_path) as f:
+        lines = f.read().splitlines()
+    assert 'cvejob_stage_seconds_bucket{stage="cpe2pkg",le="0.01"} 0' in lines
+    assert 'cvejob_stage_seconds_bucket{stage="cpe2pkg",le="0.05"} 1' in lines
+    assert 'cvejob_stage_seconds_bucket{stage="cpe2pkg",le="+Inf"} 1' in lines
+    assert 'cvejob_stage_seconds_count{stage="cpe2pkg"} 1' in lines
+    assert 'cvejob_events_total{event="cache.github.hit"} 1' in lines
+    assert 'cvejob_cache_hit_ratio{cache="cache.github"} 1.0' in lines
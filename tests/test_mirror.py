@@ -0,0 +1,76 @@
+"""Test cvejob.mirror module."""
+
+import pytest
+
+from cvejob import mirror as mirror_module
+from cvejob.mirror import VersionMirror, sync
+from cvejob.versions import FetchResult, get_versions
+
+
+def test_version_mirror(tmpdir):
+    """Test VersionMirror."""
+    path = str(tmpdir.join('data', 'mirror.sqlite'))
+
+    mirror = VersionMirror(path)
+    mirror.put_many('python', [
+        ('django', ['2.0.1', '1.11.3'], {'url': {'etag': '"v1"'}}),
+        ('empty', [], None)
+    ])
+    mirror.close()
+
+    mirror = VersionMirror(path, readonly=True)
+    assert mirror.get('python', 'django') == ['1.11.3', '2.0.1']
+    assert mirror.get('python', 'empty') == []
+    assert mirror.get('python', 'flask') is None
+    assert mirror.get('javascript', 'django') is None
+    assert mirror.get_validators('python') == {'django': {'url': {'etag': '"v1"'}}}
+    assert mirror.count('python') == 2
+    mirror.close()
+
+
+def test_version_mirror_missing(tmpdir):
+    """Test that read-only mirror has to exist."""
+    with pytest.raises(FileNotFoundError):
+        VersionMirror(str(tmpdir.join('mirror.sqlite')), readonly=True)
+
+
+def test_sync(tmpdir):
+    """Test sync()."""
+    mirror = VersionMirror(str(tmpdir.join('mirror.sqlite')))
+    mirror.put_many('python', [('django', ['1.0'], {'url': {'etag': '"v1"'}})])
+
+    calls = []
+
+    def fetch(ecosystem, package, validators=None, cached_versions=None):
+        calls.append((package, validators, cached_versions))
+        if package == 'django':
+            return FetchResult(None, validators, True)
+        if package == 'flask':
+            return FetchResult(['1.0', '0.12'], {'url': {'etag': '"v2"'}}, False)
+        return FetchResult(None, {}, False)
+
+    stats = sync(mirror, 'python', ['django', 'flask', 'missing'], batch_size=2, fetch=fetch)
+
+    assert stats == {'updated': 1, 'unchanged': 1, 'failed': 1}
+    # known packages are revalidated
+    assert ('django', {'url': {'etag': '"v1"'}}, ['1.0']) in calls
+    assert mirror.get('python', 'django') == ['1.0']
+    assert mirror.get('python', 'flask') == ['0.12', '1.0']
+    assert mirror.get('python', 'missing') is None
+
+
+def test_get_versions_from_mirror(tmpdir, mocker):
+    """Test that get_versions() reads only from the mirror, if configured."""
+    path = str(tmpdir.join('mirror.sqlite'))
+    mirror = VersionMirror(path)
+    mirror.put_many('python', [('django', ['2.0.1'], None)])
+    mirror.close()
+
+    config = {'versions_backend': 'mirror', 'mirror_path': path}
+    mocker.patch('cvejob.versions.Config.get', side_effect=config.get)
+    mocker.patch.object(mirror_module, '_mirror', None)
+    fetch = mocker.patch('cvejob.versions.fetch_versions')
+
+    assert get_versions('python', 'django') == ['2.0.1']
+    assert get_versions('python', 'flask') == []
+    fetch.assert_not_called()
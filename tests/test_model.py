@@ -0,0 +1,88 @@
+"""Test cvejob.model module."""
+
+import datetime
+import pickle
+
+from cvejob.cpes import AffectedCpe
+from cvejob.model import CveRecord
+
+
+CVE_DICT = {
+    'cve': {
+        'CVE_data_meta': {'ID': 'CVE-2018-1000001'},
+        'references': {'reference_data': [
+            {'url': 'https://github.com/django/django/commit/abc'},
+            {'url': 'http://www.securityfocus.com/bid/100000'}
+        ]},
+        'description': {'description_data': [
+            {'lang': 'en', 'value': 'Django before 1.11.3 allows XSS.'}
+        ]}
+    },
+    'configurations': {'nodes': [
+        {'operator': 'AND', 'children': [
+            {'operator': 'OR', 'cpe': [
+                {'vulnerable': True,
+                 'cpe22Uri': 'cpe:/a:djangoproject:django:-',
+                 'cpe23Uri': 'cpe:2.3:a:djangoproject:django:-:*:*:*:*:*:*:*',
+                 'versionEndExcluding': '1.11.3'},
+            ]},
+            {'operator': 'OR', 'cpe': [
+                {'vulnerable': False,
+                 'cpe22Uri': 'cpe:/o:microsoft:windows:-',
+                 'cpe23Uri': 'cpe:2.3:o:microsoft:windows:-:*:*:*:*:*:*:*'}
+            ]}
+        ]},
+        {'operator': 'OR', 'cpe': [
+            {'vulnerable': True, 'cpe23Uri': 'cpe:2.3:a:python:django\\:core:1.10:*:*:*:*:*:*:*'}
+        ]}
+    ]},
+    'impact': {'baseMetricV2': {'cvssV2': {'baseScore': 4.3}}},
+    'lastModifiedDate': '2018-06-07T14:29Z'
+}
+
+
+def test_cve_record_from_dict():
+    """Test CveRecord.from_dict()."""
+    cve = CveRecord.from_dict(CVE_DICT)
+
+    assert cve.cve_id == 'CVE-2018-1000001'
+    assert cve.description == 'Django before 1.11.3 allows XSS.'
+    assert cve.references == (
+        'https://github.com/django/django/commit/abc', 'http://www.securityfocus.com/bid/100000'
+    )
+    assert cve.last_modified_date == datetime.datetime(2018, 6, 7, 14, 29)
+    assert cve.cvss_v2 == 4.3
+    assert cve.has_configurations
+
+    # application CPEs only, including the nested ones
+    assert [(x.vendor, x.product, x.version) for x in cve.cpes] == [
+        ('djangoproject', 'django', None), ('python', 'django:core', '1.10')
+    ]
+    assert cve.cpes[0].versions == ['1.11.3']
+    assert cve.get_vendor_product_pairs() == {
+        ('djangoproject', 'django'), ('python', 'django:core')
+    }
+
+
+def test_cve_record_under_analysis():
+    """Test CveRecord.from_dict() with CVE which is still under analysis."""
+    cve = CveRecord.from_dict({
+        'cve': {'CVE_data_meta': {'ID': 'CVE-2018-1000002'}},
+        'configurations': {'nodes': []}
+    })
+
+    assert not cve.has_configurations
+    assert cve.cpes == ()
+    assert cve.description == ''
+    assert cve.cvss_v2 is None
+
+
+def test_cve_record_is_compact():
+    """Test that CveRecord has no per-instance dict and survives pickling."""
+    cve = CveRecord.from_dict(CVE_DICT)
+    assert not hasattr(cve, '__dict__')
+    assert not hasattr(cve.cpes[0], '__dict__')
+
+    cve = pickle.loads(pickle.dumps(cve))
+    assert cve.cve_id == 'CVE-2018-1000001'
+    assert isinstance(cve.cpes[0], AffectedCpe)
@@ -0,0 +1,97 @@
+"""Test cvejob.pkglist module."""
+
+import os
+
+import pytest
+
+from cvejob.cpe2pkg.native import PackageNameIndex
+from cvejob.pkglist import (
+    PackageList, convert, get_package_list_path, load_package_list, normalize_name
+)
+
+
+PKGFILE = 'tests/data/python-packages'
+
+
+@pytest.fixture
+def pkgfile(tmpdir):
+    """Package list file fixture."""
+    path = str(tmpdir.join('python-packages'))
+    with open(path, 'w') as f:
+        f.write('python zope.interface\npython Django\npython django\n'
+                'python django-rest-framework\npython Flask_Login\n\npython flask\n')
+    return path
+
+
+def test_normalize_name():
+    """Test normalize_name()."""
+    assert normalize_name('Flask_Login') == 'flask-login'
+    assert normalize_name('zope.interface') == 'zope-interface'
+    assert normalize_name('a-_.b') == 'a-b'
+
+
+def test_package_list(pkgfile):
+    """Test lookups in binary package list."""
+    package_list = PackageList(convert(pkgfile))
+
+    assert package_list.ecosystem == 'python'
+    assert list(package_list) == [
+        'Django', 'Flask_Login', 'django', 'django-rest-framework', 'flask', 'zope.interface'
+    ]
+    assert len(package_list) == 6
+    assert package_list[2] == 'django'
+
+    assert 'django' in package_list
+    assert 'Flask' not in package_list
+    assert package_list.find('flask') == 4
+    assert package_list.find('zzz') is None
+
+    assert package_list.startswith('django') == ['django', 'django-rest-framework']
+    assert package_list.startswith('django', limit=1) == ['django']
+    assert package_list.startswith('x') == []
+
+    assert sorted(package_list.find_normalized('DJANGO')) == ['Django', 'django']
+    assert package_list.find_normalized('flask.login') == ['Flask_Login']
+    assert package_list.find_normalized('requests') == []
+    assert package_list.startswith_normalized('Flask') == ['flask', 'Flask_Login']
+
+    package_list.close()
+
+
+def test_load_package_list(pkgfile):
+    """Test that outdated binary package list is rebuilt."""
+    assert load_package_list(pkgfile, build=False) is None
+
+    package_list = load_package_list(pkgfile)
+    assert len(package_list) == 6
+    package_list.close()
+
+    with open(pkgfile, 'a') as f:
+        f.write('python requests\n')
+
+    assert load_package_list(pkgfile, build=False) is None
+    package_list = load_package_list(pkgfile)
+    assert 'requests' in package_list
+    package_list.close()
+
+
+def test_mixed_ecosystems(tmpdir):
+    """Test that package lists have to be for single ecosystem."""
+    path = str(tmpdir.join('packages'))
+    with open(path, 'w') as f:
+        f.write('python django\njavascript lodash\n')
+
+    with pytest.raises(ValueError):
+        convert(path)
+    assert not os.path.exists(get_package_list_path(path))
+
+
+def test_native_index_uses_package_list(tmpdir):
+    """Test that the native matcher gives the same results with binary package list."""
+    path = str(tmpdir.join('python-packages'))
+    with open(PKGFILE) as src, open(path, 'w') as dst:
+        dst.write(src.read())
+
+    expected = PackageNameIndex(path).search(['python'], ['django', 'rest'])
+    convert(path)
+    assert PackageNameIndex(path).search(['python'], ['django', 'rest']) == expected
@@ -0,0 +1,184 @@
+"""Test cvejob.pkgrefresh module."""
+
+import json
+import os
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from cvejob.pkgrefresh import MavenSource, NpmSource, PackageListRefresher, PyPISource
+
+
+PYPI_NAMES = ['package-{i}'.format(i=i) for i in range(300)] + ['café', 'a&amp;b']
+
+SIMPLE_INDEX = (
+    '<!DOCTYPE html>\n<html><head><title>Simple index</title></head><body>\n' +
+    ''.join('    <a href="/simple/{n}/">{n}</a>\n'.format(n=x) for x in PYPI_NAMES) +
+    '</body></html>\n'
+).encode('utf-8')
+
+NPM_NAMES = sorted(['lodash', 'express', '@babel/core', 'left-pad', 'react'])
+
+MAVEN_ARTIFACTS = [('org.apache.commons', 'commons-lang3'), ('junit', 'junit'),
+                   ('com.google.guava', 'guava')]
+
+
+class StubIndexHandler(BaseHTTPRequestHandler):
+    """Stub PyPI simple index, npm replica and Maven search request handler."""
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """Handle GET request."""
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.requests.append((url.path, dict(self.headers)))
+
+        if url.path == '/simple/':
+            etag = '"{v}"'.format(v=self.server.version)
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304)
+
+            range_header = self.headers.get('Range')
+            if range_header and self.headers.get('If-Range') == etag:
+                start = int(range_header[len('bytes='):].rstrip('-'))
+                return self._send(206, SIMPLE_INDEX[start:], {
+                    'ETag': etag,
+                    'Content-Range': 'bytes {s}-{e}/{t}'.format(
+                        s=start, e=len(SIMPLE_INDEX) - 1, t=len(SIMPLE_INDEX)
+                    )
+                })
+
+            return self._send(200, SIMPLE_INDEX, {'ETag': etag, 'Content-Type': 'text/html'})
+
+        if url.path == '/npm/':
+            return self._send(200, json.dumps({'update_seq': self.server.version}).encode())
+
+        if url.path == '/npm/_all_docs':
+            names = NPM_NAMES
+            if 'startkey' in query:
+                start = json.loads(query['startkey'][0])
+                names = [x for x in names if x >= start][int(query.get('skip', ['0'])[0]):]
+            names = names[:int(query['limit'][0])]
+            rows = [{'id': x, 'key': x, 'value': {'rev': '1-a'}} for x in names]
+            body = {'total_rows': len(NPM_NAMES), 'rows': rows}
+            return self._send(200, json.dumps(body).encode())
+
+        if url.path == '/maven/select':
+            start, rows = int(query['start'][0]), int(query['rows'][0])
+            docs = [{'g': g, 'a': a} for g, a in MAVEN_ARTIFACTS[start:start + rows]]
+            return self._send(200, json.dumps(
+                {'response': {'numFound': len(MAVEN_ARTIFACTS), 'docs': docs}}
+            ).encode())
+
+        self._send(404)
+
+    def log_message(self, *args):
+        """Be quiet."""
+
+
+@pytest.fixture
+def index_server(stub_server):
+    """Stub index server fixture."""
+    return stub_server(StubIndexHandler, version=1)
+
+
+class FlakyPyPISource(PyPISource):
+    """PyPI source which fails after given number of pages."""
+
+    fail_after = None
+
+    def iter_pages(self, session, cursor=None, fingerprint=None):
+        """Download package names, page by page, until the failure."""
+        pages = super().iter_pages(session, cursor=cursor, fingerprint=fingerprint)
+        for i, page in enumerate(pages):
+            if i == self.fail_after:
+                raise requests.ConnectionError('connection reset')
+            yield page
+
+
+def _read_names(pkgfile):
+    with open(pkgfile) as f:
+        return [line.split()[1] for line in f]
+
+
+def test_pypi_refresh(index_server, tmpdir, mocker):
+    """Test refresh of PyPI package list, including conditional requests."""
+    mocker.patch('cvejob.pkgrefresh._CHUNK_SIZE', 512)
+    pkgfile = str(tmpdir.join('python-packages'))
+    refresher = PackageListRefresher(
+        PyPISource(index_server.url + '/simple/'), pkgfile, session=requests.Session()
+    )
+
+    assert refresher.refresh() == len(PYPI_NAMES)
+    assert _read_names(pkgfile) == PYPI_NAMES[:-1] + ['a&b']
+    assert not os.path.exists(pkgfile + '.partial')
+
+    # nothing has changed
+    assert refresher.refresh() is None
+    assert index_server.requests[-1][1]['If-None-Match'] == '"1"'
+
+    index_server.version = 2
+    assert refresher.refresh() == len(PYPI_NAMES)
+
+
+def test_pypi_refresh_resumes(index_server, tmpdir, mocker):
+    """Test that interrupted refresh continues where it stopped."""
+    mocker.patch('cvejob.pkgrefresh._CHUNK_SIZE', 512)
+    pkgfile = str(tmpdir.join('python-packages'))
+    source = FlakyPyPISource(index_server.url + '/simple/')
+    refresher = PackageListRefresher(source, pkgfile, session=requests.Session())
+
+    source.fail_after = 3
+    with pytest.raises(requests.ConnectionError):
+        refresher.refresh()
+    assert not os.path.exists(pkgfile)
+
+    source.fail_after = None
+    assert refresher.refresh() == len(PYPI_NAMES)
+    assert _read_names(pkgfile) == PYPI_NAMES[:-1] + ['a&b']
+    assert index_server.requests[-1][1]['If-Range'] == '"1"'
+
+    # the list changes during the refresh, so the refresh starts over
+    index_server.version = 2
+    source.fail_after = 3
+    with pytest.raises(requests.ConnectionError):
+        refresher.refresh()
+    index_server.version = 3
+    source.fail_after = None
+    assert refresher.refresh() == len(PYPI_NAMES)
+    assert _read_names(pkgfile) == PYPI_NAMES[:-1] + ['a&b']
+
+
+def test_npm_refresh(index_server, tmpdir):
+    """Test refresh of npm package list."""
+    pkgfile = str(tmpdir.join('javascript-packages'))
+    refresher = PackageListRefresher(
+        NpmSource(index_server.url + '/npm', page_size=2), pkgfile, session=requests.Session()
+    )
+
+    assert refresher.refresh() == len(NPM_NAMES)
+    with open(pkgfile) as f:
+        assert f.read().splitlines() == ['javascript ' + x for x in NPM_NAMES]
+
+    assert refresher.refresh() is None
+
+
+def test_maven_refresh(index_server, tmpdir):
+    """Test refresh of Maven package list."""
+    pkgfile = str(tmpdir.join('java-packages'))
+    refresher = PackageListRefresher(
+        MavenSource(index_server.url + '/maven/select', page_size=2), pkgfile,
+        session=requests.Session()
+    )
+
+    assert refresher.refresh() == len(MAVEN_ARTIFACTS)
+    assert _read_names(pkgfile) == ['{g}:{a}'.format(g=g, a=a) for g, a in MAVEN_ARTIFACTS]
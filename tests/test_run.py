@@ -0,0 +1,98 @@
+"""Test run module."""
+
+import pytest
+
+import run
+from cvejob.config import Config
+from cvejob.filters.input import FilterResult
+from cvejob.metrics import get_metrics
+from cvejob.identifiers.basic import NaivePackageNameIdentifier
+
+
+class _BatchRecordingIdentifier(NaivePackageNameIdentifier):
+    """Identifier which only records batches of CVEs it was asked about, in a file.
+
+    File is shared with worker processes, which record their batches there too.
+    """
+
+    batches_file = None
+
+    @classmethod
+    def warm_up(cls):
+        """Nothing to prepare."""
+
+    @classmethod
+    def identify_many(cls, cves):
+        """Record the batch and identify nothing."""
+        with open(cls.batches_file, 'a') as f:
+            f.write(' '.join(cve.cve_id for cve in cves) + '\n')
+        return [[] for _ in cves]
+
+
+def _get_cve_dict(i):
+    return {'cve': {'CVE_data_meta': {'ID': 'CVE-2018-{i:04d}'.format(i=i)}}}
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_identify_in_batches(workers, mocker, tmpdir):
+    """Test that identifier is called once per batch of CVEs and ecosystem."""
+    batches_file = tmpdir.join('batches')
+    batches_file.write('')
+    mocker.patch.object(_BatchRecordingIdentifier, 'batches_file', str(batches_file))
+    mocker.patch('run.get_identifier_class', return_value=_BatchRecordingIdentifier)
+    mocker.patch('run.validate_cve')
+    mocker.patch('run._iter_items', return_value=(_get_cve_dict(i) for i in range(10)))
+    handle_result = mocker.patch('run._ResultHandler').return_value
+
+    with Config.override(identify_batch_size=4, ecosystems='python,javascript',
+                         state_path=None, metrics_path=None, metrics_textfile=None):
+        run._run(workers)
+
+    batches = [line.split() for line in batches_file.read().splitlines()]
+    assert sorted(len(x) for x in batches) == [2, 2, 4, 4, 4, 4]
+
+    # every CVE is still handled, in feed order, for both ecosystems
+    handled = [call[0][0] for call in handle_result.call_args_list]
+    assert handled == [_get_cve_dict(i) for i in range(10)]
+    results = handle_result.call_args_list[0][0][1]
+    assert [(e, r.verdict) for e, r in results] == [
+        ('python', 'no-candidates'), ('javascript', 'no-candidates')
+    ]
+
+
+def test_indefinite_checks_make_verdict_not_cacheable(mocker):
+    """Test that verdicts are not cacheable if checks passed only for lack of answers."""
+    def validate_cve(cve, ecosystem_specific=None):
+        result = FilterResult()
+        result.cacheable = not (ecosystem_specific and cve.cve_id == 'CVE-2018-0001')
+        return result
+
+    mocker.patch('run.validate_cve', side_effect=validate_cve)
+    mocker.patch('run.get_identifier_class', return_value=mocker.Mock(
+        identify_many=lambda cves: [[] for _ in cves]
+    ))
+
+    cves = [run._to_cve(_get_cve_dict(i)) for i in range(2)]
+    results = run.process_cves(cves, ['python'])
+
+    assert [r.cacheable for _, r in results[0]] == [True]
+    assert [r.cacheable for _, r in results[1]] == [False]
+
+
+def test_per_cve_latency(mocker):
+    """Test that latency is recorded for every CVE, as well as for the whole batch."""
+    mocker.patch('run.validate_cve')
+    mocker.patch('run.get_identifier_class', return_value=mocker.Mock(
+        identify_many=lambda cves: [[] for _ in cves]
+    ))
+    get_metrics().snapshot(reset=True)
+
+    cves = [run._to_cve(_get_cve_dict(i)) for i in range(3)]
+    run.process_cves(cves, ['python', 'javascript'])
+
+    timers = get_metrics().snapshot(reset=True)['timers']
+    assert timers['batch']['count'] == 1
+    assert timers['cve']['count'] == 3
+    assert timers['identify.batch']['count'] == 2
+    assert timers['identify']['count'] == 6
+    assert timers['cve']['total'] <= timers['batch']['total']
@@ -0,0 +1,91 @@
+"""Test cvejob.shard module."""
+
+import json
+
+import pytest
+
+from cvejob.metrics import Metrics
+from cvejob.shard import (
+    Shard,
+    get_shard_path,
+    in_shard,
+    merge_metrics,
+    merge_outputs,
+    parse_shard
+)
+
+
+def test_parse_shard():
+    """Test parse_shard()."""
+    assert parse_shard('2/4') == Shard(2, 4)
+    assert parse_shard(' 1 / 1 ') == Shard(1, 1)
+    assert parse_shard(None) is None
+
+    for value in ('0/4', '5/4', '2', 'a/b', '-1/4'):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_in_shard():
+    """Test that every CVE belongs to exactly one shard, and shards are balanced."""
+    cve_ids = ['CVE-2018-{n}'.format(n=n) for n in range(1000, 5000)]
+    shards = [Shard(i, 4) for i in range(1, 5)]
+
+    sizes = []
+    for shard in shards:
+        sizes.append(len([x for x in cve_ids if in_shard(x, shard)]))
+    assert sum(sizes) == len(cve_ids)
+    assert all(800 < x < 1200 for x in sizes)
+
+    # the hash is stable across processes and platforms
+    assert [in_shard('CVE-2018-3757', x) for x in shards] == [False, False, True, False]
+
+
+def test_get_shard_path():
+    """Test get_shard_path()."""
+    shard = Shard(2, 4)
+    assert get_shard_path('database/', shard) == 'database-shard-2-of-4/'
+    assert get_shard_path('state.sqlite', shard) == 'state-shard-2-of-4.sqlite'
+    assert get_shard_path('/tmp/out/metrics.json', shard) == '/tmp/out/metrics-shard-2-of-4.json'
+
+
+def _write(path, data):
+    path.write_binary(data.encode('utf-8'), ensure=True)
+
+
+def test_merge_outputs(tmpdir):
+    """Test merge_outputs()."""
+    first, second, target = tmpdir.join('first'), tmpdir.join('second'), tmpdir.join('database')
+    _write(first.join('python', '2018', '1000.yaml'), 'cve: 2018-1000\n')
+    _write(second.join('python', '2018', '1001.yaml'), 'cve: 2018-1001\n')
+    _write(second.join('java', '2017', '1002.yaml'), 'cve: 2017-1002\n')
+    _write(target.join('python', '2018', '1000.yaml'), 'cve: 2018-1000\n')
+
+    stats = merge_outputs([str(first), str(second)], str(target))
+    assert stats == {'written': 2, 'unchanged': 1}
+    assert target.join('python', '2018', '1001.yaml').read() == 'cve: 2018-1001\n'
+    assert target.join('java', '2017', '1002.yaml').read() == 'cve: 2017-1002\n'
+
+
+def test_merge_metrics(tmpdir):
+    """Test merge_metrics()."""
+    paths = []
+    for i, duration in enumerate([10.0, 30.0]):
+        metrics = Metrics()
+        metrics.incr('verdict.written', i + 1)
+        metrics.incr('cache.cpe2pkg.hit', 3)
+        metrics.incr('cache.cpe2pkg.miss', 1)
+        metrics.observe('cve', 0.5)
+        summary = metrics.summary()
+        summary['duration'] = duration
+
+        path = tmpdir.join('metrics-shard-{i}-of-2.json'.format(i=i + 1))
+        path.write(json.dumps(summary))
+        paths.append(str(path))
+
+    metrics, summary = merge_metrics(paths)
+    assert summary['counters']['verdict.written'] == 3
+    assert summary['timers']['cve']['count'] == 2
+    assert summary['hit_rates'] == {'cache.cpe2pkg': 0.75}
+    assert summary['duration'] == 30.0
+    assert summary['shards'] == 2
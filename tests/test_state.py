@@ -0,0 +1,86 @@
+"""Test cvejob.state module."""
+
+import copy
+
+from cvejob.state import RunState, get_content_hash
+
+
+CVE_DICT = {
+    'cve': {
+        'CVE_data_meta': {'ID': 'CVE-2018-3757'},
+        'description': {'description_data': [{'lang': 'en', 'value': 'Description.'}]}
+    },
+    'configurations': {'nodes': []},
+    'impact': {},
+    'publishedDate': '2018-06-01T10:00Z',
+    'lastModifiedDate': '2018-06-02T10:00Z'
+}
+
+
+def test_get_content_hash():
+    """Test get_content_hash()."""
+    modified = copy.deepcopy(CVE_DICT)
+    modified['publishedDate'] = '2018-06-03T10:00Z'
+    assert get_content_hash(CVE_DICT) == get_content_hash(modified)
+
+    modified['cve']['description']['description_data'][0]['value'] = 'Changed.'
+    assert get_content_hash(CVE_DICT) != get_content_hash(modified)
+
+
+def test_run_state(tmpdir):
+    """Test RunState()."""
+    path = str(tmpdir.join('state.sqlite'))
+
+    state = RunState(path, 'javascript')
+    assert not state.is_unchanged(CVE_DICT)
+    state.record(CVE_DICT, 'written', 'hoek')
+    assert state.is_unchanged(CVE_DICT)
+    state.close()
+
+    # other ecosystems are tracked separately
+    state = RunState(path, 'python')
+    assert not state.is_unchanged(CVE_DICT)
+    state.close()
+
+    state = RunState(path, 'javascript')
+    assert state.is_unchanged(CVE_DICT)
+    assert state.get_outcome('CVE-2018-3757') == ('written', 'hoek')
+
+    modified = copy.deepcopy(CVE_DICT)
+    modified['lastModifiedDate'] = '2018-06-04T10:00Z'
+    assert not state.is_unchanged(modified)
+    state.close()
+
+
+def test_run_state_config_change(tmpdir, mocker):
+    """Test that RunState() doesn't skip anything when the configuration changes."""
+    path = str(tmpdir.join('state.sqlite'))
+
+    state = RunState(path, 'javascript')
+    state.record(CVE_DICT, 'no-winner')
+    state.close()
+
+    config = {'pkgfile_dir': 'data/', 'cpe2pkg_backend': 'native'}
+    mocker.patch('cvejob.state.Config.get', side_effect=config.get)
+
+    state = RunState(path, 'javascript')
+    assert not state.is_unchanged(CVE_DICT)
+    state.close()
+
+
+def test_run_state_for_ecosystem(tmpdir):
+    """Test that states of several ecosystems can be recorded at the same time."""
+    path = str(tmpdir.join('state.sqlite'))
+
+    state = RunState(path, 'javascript')
+    other = state.for_ecosystem('python')
+    state.record(CVE_DICT, 'written', 'hoek')
+    other.record(CVE_DICT, 'no-winner')
+    other.commit()
+    other.close()
+    state.close()
+
+    state = RunState(path, 'python')
+    assert state.get_outcome('CVE-2018-3757') == ('no-winner', None)
+    assert state.for_ecosystem('javascript').get_outcome('CVE-2018-3757') == ('written', 'hoek')
+    state.close()
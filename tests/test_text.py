@@ -0,0 +1,75 @@
+"""Test cvejob.text module."""
+
+import pytest
+
+from cvejob import text
+
+
+def test_find_capitalized_words():
+    """Test find_capitalized_words()."""
+    assert text.find_capitalized_words('The Jackson-databind before 2.9.8 in Apache Struts') == [
+        'The', 'Jackson-databind', 'Apache', 'Struts'
+    ]
+
+
+def test_tokenization_is_memoized(mocker):
+    """Test that the same text is tokenized only once."""
+    sent_tokenize = mocker.patch('nltk.sent_tokenize', return_value=['A.', 'B.'])
+    text.sent_tokenize.cache_clear()
+
+    assert text.sent_tokenize('A. B.') == ('A.', 'B.')
+    assert text.sent_tokenize('A. B.') == ('A.', 'B.')
+    assert sent_tokenize.call_count == 1
+
+    text.sent_tokenize.cache_clear()
+
+
+def test_check_resources(mocker):
+    """Test check_resources()."""
+    mocker.patch('nltk.data.find')
+    text.check_resources()
+
+
+def test_check_resources_missing(mocker):
+    """Test that check_resources() fails when NLTK data are missing."""
+    def find(resource):
+        if resource != 'tokenizers/punkt_tab':
+            raise LookupError(resource)
+
+    mocker.patch('nltk.data.find', side_effect=find)
+
+    with pytest.raises(text.MissingResourceError) as e:
+        text.check_resources()
+    assert 'stopwords' in str(e.value)
+    assert 'punkt' not in str(e.value)
+
+
+def test_check_resources_legacy_punkt(mocker):
+    """Test that legacy punkt models are enough only for NLTK which loads them."""
+    def find(resource):
+        if resource == 'tokenizers/punkt_tab':
+            raise LookupError(resource)
+
+    mocker.patch('nltk.data.find', side_effect=find)
+
+    mocker.patch('nltk.__version__', '3.8.1')
+    text.check_resources()
+
+    mocker.patch('nltk.__version__', '3.9.1')
+    with pytest.raises(text.MissingResourceError) as e:
+        text.check_resources()
+    assert 'punkt_tab' in str(e.value)
+
+
+def test_warm_up_missing_tokenizer(mocker):
+    """Test that warm_up() fails early if tokenizers can't load their data."""
+    mocker.patch('nltk.data.find')
+    mocker.patch('cvejob.text.get_stopwords')
+    mocker.patch('nltk.sent_tokenize', side_effect=LookupError('Resource punkt_tab not found.'))
+    text.sent_tokenize.cache_clear()
+
+    with pytest.raises(text.MissingResourceError) as e:
+        text.warm_up()
+    assert 'punkt_tab' in str(e.value)
+
+    text.sent_tokenize.cache_clear()
@@ -0,0 +1,152 @@
+"""Test cvejob.versions module."""
+
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from cvejob.cache import DiskCache
+from cvejob.versions import VersionCache, fetch_versions
+
+
+class StubRegistryHandler(BaseHTTPRequestHandler):
+    """Stub PyPI/Maven request handler."""
+
+    def do_GET(self):
+        """Handle GET request."""
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+
+        if self.path == '/pypi/django/json':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps({'releases': {'2.0.1': [], '1.11.3': []}}).encode()
+            content_type = 'application/json'
+        elif self.path == '/maven2/org/jboss/resteasy/resteasy-core/maven-metadata.xml':
+            body = (b'<metadata><versioning><versions><version>4.0.0.Final</version>'
+                    b'<version>4.1.0.Final</version></versions></versioning></metadata>')
+            content_type = 'text/xml'
+        elif self.path == '/maven2/org/example/lib/maven-metadata.xml':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b'<metadata><version>1.0</version><version>1.1</version></metadata>'
+            content_type = 'text/xml'
+        elif self.path == '/maven2/org/example/lib/maven-metadata-local.xml':
+            # always modified
+            body = b'<metadata><version>2.0-SNAPSHOT</version></metadata>'
+            content_type = 'text/xml'
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Be quiet."""
+
+
+@pytest.fixture
+def registry(stub_server, mocker):
+    """Stub registry server fixture."""
+    server = stub_server(StubRegistryHandler)
+
+    config = {'pypi_url': server.url + '/pypi', 'maven_url': server.url + '/maven2'}
+    mocker.patch('cvejob.versions.Config.get', side_effect=config.get)
+    return server
+
+
+def test_fetch_versions(registry):
+    """Test fetch_versions()."""
+    result = fetch_versions('python', 'django')
+    assert result.versions == ['1.11.3', '2.0.1']
+    assert not result.not_modified
+
+    result = fetch_versions('java', 'org.jboss.resteasy:resteasy-core')
+    assert result.versions == ['4.0.0.Final', '4.1.0.Final']
+
+    result = fetch_versions('python', 'nonexistent')
+    assert result.versions is None
+    assert result.not_found
+
+
+def test_fetch_versions_not_modified(registry):
+    """Test that fetch_versions() makes conditional requests."""
+    validators = fetch_versions('python', 'django').validators
+    result = fetch_versions('python', 'django', validators=validators)
+    assert result.not_modified
+    assert registry.requests[-1] == ('/pypi/django/json', '"v1"')
+
+
+def test_fetch_versions_partially_modified(registry):
+    """Test that versions of unmodified URLs are kept when other URLs were modified."""
+    result = fetch_versions('java', 'org.example:lib')
+    assert result.versions == ['1.0', '1.1', '2.0-SNAPSHOT']
+
+    result = fetch_versions('java', 'org.example:lib', validators=result.validators,
+                            cached_versions=result.versions)
+    assert not result.not_modified
+    assert result.versions == ['1.0', '1.1', '2.0-SNAPSHOT']
+
+
+def test_version_cache(registry, tmpdir):
+    """Test VersionCache()."""
+    path = str(tmpdir.join('versions.sqlite'))
+
+    cache = VersionCache(disk=DiskCache(path))
+    assert cache.get('python', 'django') == ['1.11.3', '2.0.1']
+    assert cache.get('python', 'django') == ['1.11.3', '2.0.1']
+    assert len(registry.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # persistent store is shared across cache instances
+    cache = VersionCache(disk=DiskCache(path))
+    assert cache.get('python', 'django') == ['1.11.3', '2.0.1']
+    assert len(registry.requests) == 1
+
+    # stale entries are revalidated
+    cache = VersionCache(disk=DiskCache(path), ttl=-1)
+    assert cache.get('python', 'django') == ['1.11.3', '2.0.1']
+    assert registry.requests[-1] == ('/pypi/django/json', '"v1"')
+
+
+def test_version_cache_not_found(registry):
+    """Test that packages which don't exist are remembered for shorter time."""
+    cache = VersionCache(negative_ttl=3600)
+    assert cache.get('python', 'nonexistent') == []
+    assert cache.get('python', 'nonexistent') == []
+    assert len(registry.requests) == 1
+
+    cache = VersionCache(negative_ttl=-1)
+    assert cache.get('python', 'nonexistent') == []
+    assert cache.get('python', 'nonexistent') == []
+    assert len(registry.requests) == 3
+
+
+def test_version_cache_lru(registry):
+    """Test that VersionCache() keeps only limited number of entries in memory."""
+    cache = VersionCache(max_size=1)
+    cache.put('python', 'a', ['1.0'])
+    cache.put('python', 'b', ['2.0'])
+    assert list(cache._memory) == ['python:b']
+    assert cache.get('python', 'a') == ['1.0']
+    assert not registry.requests
+
+
+def test_version_cache_prewarm(registry):
+    """Test VersionCache.prewarm()."""
+    cache = VersionCache()
+    count = cache.prewarm('python', ['django', 'flask'], versions={'django': ['2.0', '1.0']})
+    assert count == 1
+    assert cache.get('python', 'django') == ['1.0', '2.0']
+    assert not registry.requests
+
+    assert cache.prewarm('python', ['django', 'nonexistent']) == 1